@@ -0,0 +1,119 @@
+# ----------------------------------------------------------------------
+# |
+# |  ResultsCompression_UnitTest.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 01:01:20
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for ResultsCompression"""
+
+import gzip
+
+import pytest
+
+from Common_PythonDevelopment import ResultsCompression
+
+
+# ----------------------------------------------------------------------
+def test_Extensions():
+    # gzip can always be written and is the first format
+    assert ResultsCompression.EXTENSIONS[0] == ResultsCompression.GZIP_EXTENSION
+    assert (ResultsCompression.ZSTD_EXTENSION in ResultsCompression.EXTENSIONS) == (ResultsCompression.zstandard is not None)
+
+
+# ----------------------------------------------------------------------
+def test_FindFile(tmp_path):
+    fullpath = tmp_path / "Results.txt"
+
+    assert ResultsCompression.FindFile(fullpath) is None
+    assert ResultsCompression.EnumFiles(fullpath) == []
+
+    (tmp_path / "Results.txt.gz").write_bytes(b"")
+
+    assert ResultsCompression.FindFile(fullpath) == tmp_path / "Results.txt.gz"
+
+    (tmp_path / "Results.txt.zst").write_bytes(b"")
+
+    assert ResultsCompression.FindFile(fullpath) == tmp_path / "Results.txt.zst"
+
+    # The uncompressed file is preferred
+    fullpath.write_text("", encoding="utf-8")
+
+    assert ResultsCompression.FindFile(fullpath) == fullpath
+    assert ResultsCompression.EnumFiles(fullpath) == [fullpath, tmp_path / "Results.txt.zst", tmp_path / "Results.txt.gz"]
+
+
+# ----------------------------------------------------------------------
+def test_GetExtension(tmp_path):
+    assert ResultsCompression.GetExtension(tmp_path / "Results.txt") is None
+    assert ResultsCompression.GetExtension(tmp_path / "Results.txt.gz") == ResultsCompression.GZIP_EXTENSION
+    assert ResultsCompression.GetExtension(tmp_path / "Results.txt.zst") == ResultsCompression.ZSTD_EXTENSION
+    assert ResultsCompression.GetExtension(tmp_path / "Results.gz.txt") is None
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("extension", [ResultsCompression.GZIP_EXTENSION, ResultsCompression.ZSTD_EXTENSION])
+def test_RoundTrip(extension, tmp_path):
+    if extension == ResultsCompression.ZSTD_EXTENSION:
+        pytest.importorskip("zstandard")
+
+    content = "Line 1\nLine 2 é中\n" * 100
+
+    fullpath = tmp_path / "Results.txt{}".format(extension)
+    fullpath.write_bytes(ResultsCompression.Compress(content, extension))
+
+    assert fullpath.stat().st_size < len(content)
+
+    with ResultsCompression.Open(fullpath) as f:
+        assert f.read() == content
+
+    # The same content always produces the same file
+    assert ResultsCompression.Compress(content, extension) == fullpath.read_bytes()
+
+
+# ----------------------------------------------------------------------
+def test_Uncompressed(tmp_path):
+    fullpath = tmp_path / "Results.txt"
+    fullpath.write_text("Content", encoding="utf-8")
+
+    with ResultsCompression.Open(fullpath) as f:
+        assert f.read() == "Content"
+
+
+# ----------------------------------------------------------------------
+def test_GzipCompatibility(tmp_path):
+    # Files compressed by other tools can be read
+    fullpath = tmp_path / "Results.txt.gz"
+
+    with gzip.open(fullpath, "wt", encoding="utf-8") as f:
+        f.write("Content")
+
+    with ResultsCompression.Open(fullpath) as f:
+        assert f.read() == "Content"
+
+
+# ----------------------------------------------------------------------
+def test_UnsupportedExtension():
+    with pytest.raises(Exception, match="'.bz2' is not a supported compression extension"):
+        ResultsCompression.Compress("Content", ".bz2")
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.skipif(ResultsCompression.zstandard is not None, reason="The 'zstandard' package is installed")
+def test_ZstdNotInstalled(tmp_path):
+    with pytest.raises(Exception, match="The 'zstandard' package is required"):
+        ResultsCompression.Compress("Content", ResultsCompression.ZSTD_EXTENSION)
+
+    fullpath = tmp_path / "Results.txt.zst"
+    fullpath.write_bytes(b"")
+
+    with pytest.raises(Exception, match="The 'zstandard' package is required"):
+        ResultsCompression.Open(fullpath)
@@ -0,0 +1,215 @@
+# ----------------------------------------------------------------------
+# |
+# |  ResultsPack_UnitTest.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:59:08
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for ResultsPack"""
+
+import hashlib
+import multiprocessing
+
+from pathlib import Path
+
+import pytest
+
+from Common_PythonDevelopment import ResultsCompression, ResultsPack
+
+
+# ----------------------------------------------------------------------
+def test_RoundTrip(tmp_path):
+    pack_path = tmp_path / ResultsPack.PACK_FILENAME
+
+    ResultsPack.WriteEntries(
+        pack_path,
+        {
+            "Two.txt": "Second\r\nentry\n",
+            "One.txt": "First entry",
+            "Empty.txt": "",
+            "Unicode.txt": "é中\n",
+        },
+    )
+
+    pack = ResultsPack.GetPack(pack_path)
+    assert pack is not None
+
+    assert len(pack) == 4
+    assert list(pack.EnumNames()) == ["Empty.txt", "One.txt", "Two.txt", "Unicode.txt"]
+    assert "One.txt" in pack
+    assert "Three.txt" not in pack
+
+    # Newlines are normalized
+    assert pack.GetContent("Two.txt") == "Second\nentry\n"
+    assert pack.GetContent("Empty.txt") == ""
+    assert pack.GetContent("Unicode.txt") == "é中\n"
+    assert pack.GetContent("Three.txt") is None
+
+    assert list(pack.EnumLines("Two.txt")) == ["Second\n", "entry\n"]
+    assert list(pack.EnumLines("One.txt")) == ["First entry"]
+
+    content = "é中\n".encode("utf-8")
+    assert pack.GetDigest("Unicode.txt") == (len(content), hashlib.sha256(content).digest())
+    assert pack.GetDigest("Three.txt") is None
+
+    # The cached pack is reused until the file is replaced
+    assert ResultsPack.GetPack(pack_path) is pack
+
+    ResultsPack.UpdateEntries(pack_path, {"One.txt": "Updated", "Three.txt": "Third"})
+
+    new_pack = ResultsPack.GetPack(pack_path)
+    assert new_pack is not pack
+    assert new_pack is not None
+
+    assert ResultsPack.ReadEntries(pack_path) == {
+        "Empty.txt": "",
+        "One.txt": "Updated",
+        "Three.txt": "Third",
+        "Two.txt": "Second\nentry\n",
+        "Unicode.txt": "é中\n",
+    }
+
+
+# ----------------------------------------------------------------------
+def test_Missing(tmp_path):
+    assert ResultsPack.GetPack(tmp_path / ResultsPack.PACK_FILENAME) is None
+    assert ResultsPack.ReadEntries(tmp_path / ResultsPack.PACK_FILENAME) == {}
+
+
+# ----------------------------------------------------------------------
+def test_Invalid(tmp_path):
+    pack_path = tmp_path / ResultsPack.PACK_FILENAME
+
+    pack_path.write_bytes(b"")
+
+    with pytest.raises(Exception, match="is not a valid pack file"):
+        ResultsPack.ResultsPack(pack_path)
+
+    pack_path.write_bytes(b"Not a pack file, but large enough to contain a header")
+
+    with pytest.raises(Exception, match="is not a valid pack file"):
+        ResultsPack.ResultsPack(pack_path)
+
+
+# ----------------------------------------------------------------------
+def test_ConcurrentUpdates(tmp_path):
+    pack_path = tmp_path / ResultsPack.PACK_FILENAME
+
+    num_processes = 4
+    num_updates = 25
+
+    processes = [
+        multiprocessing.Process(target=_UpdateEntries, args=(pack_path, process_index, num_updates))
+        for process_index in range(num_processes)
+    ]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    # No updates were lost
+    assert ResultsPack.ReadEntries(pack_path) == {
+        "{}-{}.txt".format(process_index, update_index): "Content"
+        for process_index in range(num_processes)
+        for update_index in range(num_updates)
+    }
+
+
+# ----------------------------------------------------------------------
+class TestPack(object):
+    # ----------------------------------------------------------------------
+    def test_Standard(self, tmp_path):
+        (tmp_path / "One.txt").write_text("One", encoding="utf-8")
+        (tmp_path / "Two.txt").write_text("Two", encoding="utf-8")
+
+        (tmp_path / "Three.txt.gz").write_bytes(ResultsCompression.Compress("Three", ResultsCompression.GZIP_EXTENSION))
+
+        # Files that aren't results files are left in place
+        (tmp_path / "README.md").write_text("Readme", encoding="utf-8")
+        (tmp_path / ".gitignore").write_text("*.tmp", encoding="utf-8")
+        (tmp_path / "Subdir").mkdir()
+
+        ResultsPack.UpdateEntries(tmp_path / ResultsPack.PACK_FILENAME, {"Existing.txt": "Existing", "One.txt": "Original"})
+
+        packed_files = ResultsPack.Pack(tmp_path)
+
+        assert [path.name for path in packed_files] == ["One.txt", "Three.txt.gz", "Two.txt"]
+        assert sorted(path.name for path in tmp_path.iterdir()) == [".gitignore", "README.md", ResultsPack.PACK_FILENAME, "Subdir"]
+
+        # Loose files replace the existing entries
+        assert ResultsPack.ReadEntries(tmp_path / ResultsPack.PACK_FILENAME) == {
+            "Existing.txt": "Existing",
+            "One.txt": "One",
+            "Three.txt": "Three",
+            "Two.txt": "Two",
+        }
+
+        # Nothing to pack
+        assert ResultsPack.Pack(tmp_path) == []
+
+    # ----------------------------------------------------------------------
+    def test_FileExtensions(self, tmp_path):
+        (tmp_path / "One.txt").write_text("One", encoding="utf-8")
+        (tmp_path / "Two.json").write_text("Two", encoding="utf-8")
+
+        packed_files = ResultsPack.Pack(tmp_path, file_extensions=[".json"], remove_loose_files=False)
+
+        assert [path.name for path in packed_files] == ["Two.json"]
+        assert (tmp_path / "Two.json").is_file()
+
+        assert ResultsPack.ReadEntries(tmp_path / ResultsPack.PACK_FILENAME) == {"Two.json": "Two"}
+
+    # ----------------------------------------------------------------------
+    def test_DuplicateNames(self, tmp_path):
+        (tmp_path / "One.txt").write_text("One", encoding="utf-8")
+
+        (tmp_path / "One.txt.gz").write_bytes(ResultsCompression.Compress("Compressed", ResultsCompression.GZIP_EXTENSION))
+
+        with pytest.raises(Exception, match="both contain the results for 'One.txt'"):
+            ResultsPack.Pack(tmp_path)
+
+        # Nothing was packed or removed
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["One.txt", "One.txt.gz"]
+
+
+# ----------------------------------------------------------------------
+def test_Unpack(tmp_path):
+    ResultsPack.WriteEntries(tmp_path / ResultsPack.PACK_FILENAME, {"One.txt": "One", "Two.txt": "Two\n"})
+
+    loose_files = ResultsPack.Unpack(tmp_path, remove_pack_file=False)
+
+    assert [path.name for path in loose_files] == ["One.txt", "Two.txt"]
+    assert (tmp_path / ResultsPack.PACK_FILENAME).is_file()
+
+    loose_files = ResultsPack.Unpack(tmp_path)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["One.txt", "Two.txt"]
+    assert (tmp_path / "Two.txt").read_text(encoding="utf-8") == "Two\n"
+
+    # Unpacked files can be packed again
+    ResultsPack.Pack(tmp_path)
+
+    assert ResultsPack.ReadEntries(tmp_path / ResultsPack.PACK_FILENAME) == {"One.txt": "One", "Two.txt": "Two\n"}
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _UpdateEntries(
+    pack_path: Path,
+    process_index: int,
+    num_updates: int,
+) -> None:
+    for update_index in range(num_updates):
+        ResultsPack.UpdateEntries(pack_path, {"{}-{}.txt".format(process_index, update_index): "Content"})
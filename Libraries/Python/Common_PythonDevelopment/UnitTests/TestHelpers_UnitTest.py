@@ -0,0 +1,194 @@
+# ----------------------------------------------------------------------
+# |
+# |  TestHelpers_UnitTest.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 01:01:20
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for TestHelpers"""
+
+import json
+import re
+import time
+
+import pytest
+
+from Common_PythonDevelopment import ResultsCompression
+from Common_PythonDevelopment import TestHelpers
+
+
+# ----------------------------------------------------------------------
+class TestCompression(object):
+    # ----------------------------------------------------------------------
+    def test_NotCompressedByDefault(self, tmp_path):
+        results = "Results\n" * 1000
+
+        TestHelpers.CompareResultsFromFile(results, subdir=str(tmp_path), overwrite_content_with_current_results=True)
+
+        assert [path.name for path in tmp_path.iterdir()] == ["TestHelpers_UnitTest.TestCompression.test_NotCompressedByDefault.txt"]
+        assert TestHelpers.ResultsFromFile(subdir=str(tmp_path)) == results
+
+    # ----------------------------------------------------------------------
+    def test_Threshold(self, tmp_path):
+        results = "Results\n" * 1000
+
+        # Smaller than the threshold
+        TestHelpers.CompareResultsFromFile(results, subdir=str(tmp_path), overwrite_content_with_current_results=True, compression_threshold=len(results) + 1)
+
+        assert [path.name for path in tmp_path.iterdir()] == ["TestHelpers_UnitTest.TestCompression.test_Threshold.txt"]
+
+        # gzip is used by default, and the uncompressed file is removed
+        TestHelpers.CompareResultsFromFile(results, subdir=str(tmp_path), overwrite_content_with_current_results=True, compression_threshold=len(results))
+
+        assert [path.name for path in tmp_path.iterdir()] == ["TestHelpers_UnitTest.TestCompression.test_Threshold.txt.gz"]
+
+        assert TestHelpers.ResultsFromFile(subdir=str(tmp_path)) == results
+        TestHelpers.CompareResultsFromFile(results, subdir=str(tmp_path))
+        TestHelpers.CompareResultsFromFile(results, subdir=str(tmp_path), hash_first=True)
+
+    # ----------------------------------------------------------------------
+    def test_Zstd(self, tmp_path):
+        pytest.importorskip("zstandard")
+
+        results = "Results\n" * 1000
+
+        TestHelpers.CompareResultsFromFile(results, subdir=str(tmp_path), overwrite_content_with_current_results=True, compression_threshold=0)
+        TestHelpers.CompareResultsFromFile(
+            results,
+            subdir=str(tmp_path),
+            overwrite_content_with_current_results=True,
+            compression_threshold=0,
+            compression_extension=ResultsCompression.ZSTD_EXTENSION,
+        )
+
+        assert [path.name for path in tmp_path.iterdir()] == ["TestHelpers_UnitTest.TestCompression.test_Zstd.txt.zst"]
+        assert TestHelpers.ResultsFromFile(subdir=str(tmp_path)) == results
+
+    # ----------------------------------------------------------------------
+    @pytest.mark.skipif(ResultsCompression.zstandard is not None, reason="The 'zstandard' package is installed")
+    def test_ZstdNotInstalled(self, tmp_path):
+        with pytest.raises(Exception, match="The 'zstandard' package is required"):
+            TestHelpers.CompareResultsFromFile(
+                "Results",
+                subdir=str(tmp_path),
+                overwrite_content_with_current_results=True,
+                compression_threshold=0,
+                compression_extension=ResultsCompression.ZSTD_EXTENSION,
+            )
+
+        assert list(tmp_path.iterdir()) == []
+
+
+# ----------------------------------------------------------------------
+class TestAssertWithinBudget(object):
+    # ----------------------------------------------------------------------
+    def test_WithinBudget(self, tmp_path):
+        TestHelpers.AssertWithinBudget(lambda: None, max_seconds=10.0, max_cpu_seconds=10.0, max_peak_bytes=1024 * 1024, subdir=str(tmp_path))
+
+    # ----------------------------------------------------------------------
+    def test_Exceeded(self, tmp_path):
+        with pytest.raises(AssertionError) as ex:
+            TestHelpers.AssertWithinBudget(lambda: time.sleep(0.01), max_seconds=0.001, max_cpu_seconds=10.0, rounds=3, subdir=str(tmp_path))
+
+        message = str(ex.value)
+
+        assert "The performance budget was exceeded (median of 3 rounds):" in message
+        assert "wall time:" in message and "EXCEEDED by" in message
+        assert "cpu time:" in message and " ok" in message
+        assert "peak memory:" not in message
+        assert "Budget: arguments" in message
+
+    # ----------------------------------------------------------------------
+    def test_MemoryExceeded(self, tmp_path):
+        with pytest.raises(AssertionError, match=r"peak memory: +[\d,]+ bytes +budget: +1,024 bytes +EXCEEDED"):
+            TestHelpers.AssertWithinBudget(lambda: bytearray(1024 * 1024), max_peak_bytes=1024, subdir=str(tmp_path))
+
+    # ----------------------------------------------------------------------
+    def test_Overwrite(self, tmp_path):
+        budget_filename = tmp_path / "TestHelpers_UnitTest.TestAssertWithinBudget.test_Overwrite.budget.json"
+
+        TestHelpers.AssertWithinBudget(
+            lambda: bytearray(1024 * 1024),
+            subdir=str(tmp_path),
+            overwrite_content_with_current_results=True,
+            headroom=10.0,
+        )
+
+        budget = json.loads(budget_filename.read_text(encoding="utf-8"))
+
+        assert sorted(budget.keys()) == ["max_cpu_seconds", "max_peak_bytes", "max_seconds"]
+        assert budget["max_peak_bytes"] >= 10 * 1024 * 1024
+
+        # The budget is read from the file
+        TestHelpers.AssertWithinBudget(lambda: bytearray(1024 * 1024), subdir=str(tmp_path))
+
+        # Arguments override the values in the file
+        with pytest.raises(AssertionError, match=re.escape("Budget: {} and arguments".format(budget_filename))):
+            TestHelpers.AssertWithinBudget(lambda: bytearray(1024 * 1024), max_peak_bytes=1024, subdir=str(tmp_path))
+
+    # ----------------------------------------------------------------------
+    def test_MissingBudget(self, tmp_path):
+        with pytest.raises(Exception, match="A budget was not provided and '.+' does not exist."):
+            TestHelpers.AssertWithinBudget(lambda: None, subdir=str(tmp_path))
+
+    # ----------------------------------------------------------------------
+    def test_InvalidBudget(self, tmp_path):
+        (tmp_path / "TestHelpers_UnitTest.TestAssertWithinBudget.test_InvalidBudget.budget.json").write_text("Not JSON", encoding="utf-8")
+
+        with pytest.raises(Exception, match="is not valid JSON"):
+            TestHelpers.AssertWithinBudget(lambda: None, subdir=str(tmp_path))
+
+        # The budget is replaced when it is overwritten
+        TestHelpers.AssertWithinBudget(lambda: None, subdir=str(tmp_path), overwrite_content_with_current_results=True)
+        TestHelpers.AssertWithinBudget(lambda: None, subdir=str(tmp_path))
+
+    # ----------------------------------------------------------------------
+    def test_InvalidRounds(self, tmp_path):
+        with pytest.raises(Exception, match="'rounds' must be greater than 0."):
+            TestHelpers.AssertWithinBudget(lambda: None, max_seconds=1.0, rounds=0, subdir=str(tmp_path))
+
+
+# ----------------------------------------------------------------------
+class TestWithinBudget(object):
+    # ----------------------------------------------------------------------
+    def test_WithinBudget(self, tmp_path):
+        with TestHelpers.WithinBudget(max_seconds=10.0, max_peak_bytes=10 * 1024 * 1024, subdir=str(tmp_path)):
+            bytearray(1024 * 1024)
+
+    # ----------------------------------------------------------------------
+    def test_Exceeded(self, tmp_path):
+        with pytest.raises(AssertionError, match=r"\(median of 1 round\)"):
+            with TestHelpers.WithinBudget(max_peak_bytes=1024, subdir=str(tmp_path)):
+                bytearray(1024 * 1024)
+
+    # ----------------------------------------------------------------------
+    def test_Exception(self, tmp_path):
+        # The exception raised within the block isn't hidden by the budget assertion
+        with pytest.raises(ValueError):
+            with TestHelpers.WithinBudget(max_seconds=0.0, subdir=str(tmp_path)):
+                time.sleep(0.01)
+                raise ValueError()
+
+    # ----------------------------------------------------------------------
+    def test_Overwrite(self, tmp_path):
+        budget_filename = tmp_path / "TestHelpers_UnitTest.TestWithinBudget.test_Overwrite.budget.json"
+
+        with TestHelpers.WithinBudget(subdir=str(tmp_path), overwrite_content_with_current_results=True, headroom=10.0):
+            time.sleep(0.01)
+
+        # Memory isn't measured when it isn't in the budget
+        budget = json.loads(budget_filename.read_text(encoding="utf-8"))
+
+        assert sorted(budget.keys()) == ["max_cpu_seconds", "max_seconds"]
+        assert budget["max_seconds"] >= 0.1
+
+        with TestHelpers.WithinBudget(subdir=str(tmp_path)):
+            time.sleep(0.01)
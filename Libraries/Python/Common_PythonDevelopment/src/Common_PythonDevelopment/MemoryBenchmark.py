@@ -0,0 +1,200 @@
+# ----------------------------------------------------------------------
+# |
+# |  MemoryBenchmark.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 23:39:04
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Measures the memory used by a callable with tracemalloc.
+
+The 'memory_benchmark' fixture provided by MemoryBenchmarkPytestPlugin wraps MemoryBenchmark:
+
+    def test_Build(memory_benchmark):
+        memory_benchmark(Build, 1000)
+"""
+
+import gc
+import statistics
+import tracemalloc
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class MemoryStats(object):
+    """Memory used during a single call"""
+
+    # Largest amount of memory allocated during the call (relative to the memory allocated before it)
+    peak_bytes: int
+
+    # Memory that is still allocated after the call has returned and its result has been released
+    retained_bytes: int
+
+    # Number of memory blocks allocated during the call that are still allocated when it returns
+    # (including its result); tracemalloc tracks allocated blocks rather than allocation events,
+    # so blocks allocated and released during the call aren't counted.
+    allocated_blocks: int
+
+
+# ----------------------------------------------------------------------
+class MemoryBenchmark(object):
+    """Calls a callable multiple times and records the memory used by each call"""
+
+    DEFAULT_ROUNDS                          = 5
+
+    # Names of the MemoryStats values, which are the metrics reported for each benchmark
+    METRICS                                 = ["peak_bytes", "retained_bytes", "allocated_blocks"]
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        rounds: int=DEFAULT_ROUNDS,
+    ):
+        if rounds < 1:
+            raise Exception("'rounds' must be greater than 0.")
+
+        self.rounds                         = rounds
+        self.stats: List[MemoryStats]       = []
+
+    # ----------------------------------------------------------------------
+    def __call__(
+        self,
+        func: Callable[..., Any],
+        *args,
+        **kwargs,
+    ) -> None:
+        """Calls `func` `rounds` times and records the memory used by each call; the results of the calls are not retained."""
+
+        for _ in range(self.rounds):
+            self.stats.append(Measure(func, *args, **kwargs))
+
+    # ----------------------------------------------------------------------
+    def GetStatistics(self) -> Dict[str, Dict[str, float]]:
+        """\
+        Returns the statistics of each metric across all rounds, in the format used by pytest-benchmark's
+        JSON content (min, max, mean, stddev, median, iqr, rounds, and iterations).
+        """
+
+        if not self.stats:
+            raise Exception("The benchmark has not been run.")
+
+        results: Dict[str, Dict[str, float]] = {}
+
+        for metric in self.__class__.METRICS:
+            values = [getattr(stats, metric) for stats in self.stats]
+
+            if len(values) > 1:
+                quartiles = statistics.quantiles(values, n=4)
+                stddev = statistics.stdev(values)
+            else:
+                quartiles = [values[0], values[0], values[0]]
+                stddev = 0.0
+
+            results[metric] = {
+                "min": min(values),
+                "max": max(values),
+                "mean": statistics.mean(values),
+                "stddev": stddev,
+                "median": statistics.median(values),
+                "iqr": quartiles[2] - quartiles[0],
+                "rounds": len(values),
+                "iterations": 1,
+            }
+
+        return results
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def Measure(
+    func: Callable[..., Any],
+    *args,
+    **kwargs,
+) -> MemoryStats:
+    """Calls `func` once and returns the memory that it used"""
+
+    global _measurement_overhead  # pylint: disable=global-statement
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+
+    try:
+        # The measurement itself allocates memory; measure it once so that it can be removed from
+        # the results.
+        if _measurement_overhead is None:
+            _measurement_overhead = _Measure(lambda: None, (), {})
+
+        stats = _Measure(func, args, kwargs)
+
+        return MemoryStats(
+            max(0, stats.peak_bytes - _measurement_overhead.peak_bytes),
+            max(0, stats.retained_bytes - _measurement_overhead.retained_bytes),
+            max(0, stats.allocated_blocks - _measurement_overhead.allocated_blocks),
+        )
+
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_measurement_overhead: Optional[MemoryStats]            = None
+
+
+# ----------------------------------------------------------------------
+def _Measure(
+    func: Callable[..., Any],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+) -> MemoryStats:
+    # Release garbage created before the call so that it isn't attributed to the call
+    gc.collect()
+
+    initial_blocks = _GetNumTracedBlocks()
+    initial_bytes, _ = tracemalloc.get_traced_memory()
+
+    tracemalloc.reset_peak()
+
+    result = func(*args, **kwargs)
+
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    allocated_blocks = _GetNumTracedBlocks() - initial_blocks
+
+    del result
+    gc.collect()
+
+    retained_bytes, _ = tracemalloc.get_traced_memory()
+
+    return MemoryStats(
+        peak_bytes - initial_bytes,
+        retained_bytes - initial_bytes,
+        allocated_blocks,
+    )
+
+
+# ----------------------------------------------------------------------
+def _GetNumTracedBlocks() -> int:
+    # The snapshot is released before this function returns, so it isn't included in the values
+    # measured by the caller.
+    return len(tracemalloc.take_snapshot().traces)
@@ -0,0 +1,62 @@
+# ----------------------------------------------------------------------
+# |
+# |  MemoryBenchmarkPytestPlugin.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:32:51
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+pytest plugin that provides the 'memory_benchmark' fixture (see MemoryBenchmark.py).
+
+The plugin is registered as a 'pytest11' entry point, so pytest loads it automatically when
+Common_PythonDevelopment is installed (and TesterPytestPlugin loads it when pytest is invoked by
+Tester). When plugins aren't loaded automatically (PYTEST_DISABLE_PLUGIN_AUTOLOAD), load it with:
+
+    pytest -p Common_PythonDevelopment.MemoryBenchmarkPytestPlugin ...
+
+or, in conftest.py:
+
+    pytest_plugins = ["Common_PythonDevelopment.MemoryBenchmarkPytestPlugin"]
+
+The statistics of each benchmark are written by TesterPytestPlugin when pytest is invoked by Tester.
+"""
+
+import pytest
+
+from Common_PythonDevelopment.MemoryBenchmark import MemoryBenchmark
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+# Name of the plugin that records the statistics of each benchmark (registered by TesterPytestPlugin)
+MEMORY_BENCHMARKS_WRITER_NAME               = "tester_memory_benchmarks_writer"
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+@pytest.fixture
+def memory_benchmark(request):
+    """Measures the memory used by a callable (see MemoryBenchmark.py)"""
+
+    benchmark = MemoryBenchmark()
+
+    yield benchmark
+
+    if benchmark.stats:
+        writer = request.config.pluginmanager.get_plugin(MEMORY_BENCHMARKS_WRITER_NAME)
+        if writer is not None:
+            writer.Write(request.node, benchmark)
@@ -0,0 +1,146 @@
+# ----------------------------------------------------------------------
+# |
+# |  ResultsCompression.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 23:55:09
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Reads and writes compressed results files (see TestHelpers.CompareResultsFromFile).
+
+The name of a compressed results file is the name of the results file followed by an extension
+that identifies the compression format:
+
+    Results/MyTests.test_MyFunction.txt.zst
+    Results/MyTests.test_MyFunction.txt.gz
+
+gzip is used by default. zstd is faster and produces smaller files, but it must be requested
+explicitly and requires the 'zstandard' package (which is an optional dependency) to read and write
+the files.
+"""
+
+import gzip
+
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+ZSTD_EXTENSION                              = ".zst"
+GZIP_EXTENSION                              = ".gz"
+
+# Extensions of the formats that can be written in this environment
+EXTENSIONS: List[str]                       = [GZIP_EXTENSION] + ([ZSTD_EXTENSION] if zstandard is not None else [])
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def FindFile(
+    fullpath: Path,
+) -> Optional[Path]:
+    """Returns the results file, the compressed results file, or None if neither exist"""
+
+    if fullpath.is_file():
+        return fullpath
+
+    for extension in _ALL_EXTENSIONS:
+        compressed_fullpath = fullpath.with_name(fullpath.name + extension)
+        if compressed_fullpath.is_file():
+            return compressed_fullpath
+
+    return None
+
+
+# ----------------------------------------------------------------------
+def EnumFiles(
+    fullpath: Path,
+) -> List[Path]:
+    """Returns the results file and all of the compressed results files that exist"""
+
+    return [
+        item for item in [fullpath] + [fullpath.with_name(fullpath.name + extension) for extension in _ALL_EXTENSIONS]
+        if item.is_file()
+    ]
+
+
+# ----------------------------------------------------------------------
+def GetExtension(
+    fullpath: Path,
+) -> Optional[str]:
+    """Returns the compression extension of the file or None if the file isn't compressed"""
+
+    return fullpath.suffix if fullpath.suffix in _ALL_EXTENSIONS else None
+
+
+# ----------------------------------------------------------------------
+def Open(
+    fullpath: Path,
+) -> TextIO:
+    """Opens a results file (that may be compressed) for reading in text mode"""
+
+    extension = GetExtension(fullpath)
+
+    if extension is None:
+        return fullpath.open()
+
+    if extension == GZIP_EXTENSION:
+        return gzip.open(fullpath, "rt", encoding="utf-8")
+
+    if extension == ZSTD_EXTENSION:
+        if zstandard is None:
+            raise Exception("The 'zstandard' package is required to read '{}'.".format(fullpath))
+
+        return zstandard.open(fullpath, "rt", encoding="utf-8")
+
+    assert False, extension  # pragma: no cover
+
+
+# ----------------------------------------------------------------------
+def Compress(
+    content: str,
+    extension: str,
+) -> bytes:
+    data = content.encode("utf-8")
+
+    if extension == GZIP_EXTENSION:
+        # Don't include the time in the header so that the same content always produces the same file
+        return gzip.compress(data, compresslevel=_GZIP_COMPRESSION_LEVEL, mtime=0)
+
+    if extension == ZSTD_EXTENSION:
+        if zstandard is None:
+            raise Exception("The 'zstandard' package is required to write '{}' files.".format(extension))
+
+        return zstandard.ZstdCompressor(level=_ZSTD_COMPRESSION_LEVEL).compress(data)
+
+    raise Exception("'{}' is not a supported compression extension.".format(extension))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# Extensions of the formats that can be read (a zstd file can be found without the 'zstandard'
+# package, but it can't be read).
+_ALL_EXTENSIONS                             = [ZSTD_EXTENSION, GZIP_EXTENSION]
+
+_GZIP_COMPRESSION_LEVEL                     = 6
+_ZSTD_COMPRESSION_LEVEL                     = 3
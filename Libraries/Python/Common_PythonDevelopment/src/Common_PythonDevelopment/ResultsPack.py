@@ -0,0 +1,492 @@
+# ----------------------------------------------------------------------
+# |
+# |  ResultsPack.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 23:45:58
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Stores the content of many results files in a single pack file.
+
+A pack file replaces the loose files in a results directory (see TestHelpers.ResultsFromFile); each
+entry is named by the filename of the loose file that it replaces.
+
+Format (all integers are little-endian):
+
+    Header:     <MAGIC> <version: u32> <index offset: u64> <num entries: u32>
+    Data:       The utf-8 encoded content of each entry, with newlines normalized to '\\n'
+    Index:      [<name length: u16> <name: utf-8> <offset: u64> <length: u64> <sha256: 32 bytes>]*
+
+The file is memory-mapped; the index is read the first time that an entry is requested and the
+content of an entry is only read when it is requested. The index contains the digest of each
+entry so that content can be compared without reading the entry.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from Common_PythonDevelopment import ResultsCompression
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+PACK_FILENAME                               = "Results.pack"
+
+# Extensions of the loose files packed by Pack (see TestHelpers.DEFAULT_FILE_EXTENSION)
+DEFAULT_RESULTS_FILE_EXTENSIONS             = [".txt"]
+
+
+# ----------------------------------------------------------------------
+class ResultsPack(object):
+    """Read-only access to the entries in a pack file"""
+
+    MAGIC                                   = b"CPDRPACK"
+    VERSION                                 = 2
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        path: Path,
+    ):
+        self.path                           = path
+
+        with path.open("rb") as f:
+            stat = os.fstat(f.fileno())
+
+            # The inode changes whenever the file is replaced (see WriteEntries), even if the
+            # modification time and size do not.
+            self._stat_key                  = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+            # mmap raises on empty files
+            if stat.st_size < _HEADER.size:
+                raise Exception("'{}' is not a valid pack file.".format(path))
+
+            self._mmap                      = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._index_offset, self._num_entries = _HEADER.unpack_from(self._mmap, 0)
+
+        if magic != self.__class__.MAGIC:
+            self.Close()
+            raise Exception("'{}' is not a valid pack file.".format(path))
+
+        if version != self.__class__.VERSION:
+            self.Close()
+            raise Exception("'{}' was created with an unsupported version ({}).".format(path, version))
+
+        self._index: Optional[Dict[str, Tuple[int, int, bytes]]]    = None
+
+    # ----------------------------------------------------------------------
+    def Close(self) -> None:
+        self._mmap.close()
+
+    # ----------------------------------------------------------------------
+    def IsCurrent(self) -> bool:
+        """Returns True if the pack file hasn't been modified since it was opened"""
+
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return False
+
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._stat_key
+
+    # ----------------------------------------------------------------------
+    def __contains__(
+        self,
+        name: str,
+    ) -> bool:
+        return name in self._GetIndex()
+
+    # ----------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._num_entries
+
+    # ----------------------------------------------------------------------
+    def EnumNames(self) -> Iterator[str]:
+        yield from self._GetIndex().keys()
+
+    # ----------------------------------------------------------------------
+    def GetContent(
+        self,
+        name: str,
+    ) -> Optional[str]:
+        """Returns the content of the entry or None if the entry doesn't exist"""
+
+        location = self._GetIndex().get(name, None)
+        if location is None:
+            return None
+
+        offset, length, _ = location
+
+        return self._mmap[offset:offset + length].decode("utf-8")
+
+    # ----------------------------------------------------------------------
+    def GetDigest(
+        self,
+        name: str,
+    ) -> Optional[Tuple[int, bytes]]:
+        """Returns the length and sha256 digest of the entry's utf-8 encoded content or None if the entry doesn't exist"""
+
+        location = self._GetIndex().get(name, None)
+        if location is None:
+            return None
+
+        _, length, digest = location
+
+        return length, digest
+
+    # ----------------------------------------------------------------------
+    def EnumLines(
+        self,
+        name: str,
+    ) -> Iterator[str]:
+        """Yields the lines of the entry's content (including newlines) without reading the entire entry"""
+
+        offset, length, _ = self._GetIndex()[name]
+        end = offset + length
+
+        while offset < end:
+            newline_offset = self._mmap.find(b"\n", offset, end)
+            next_offset = end if newline_offset == -1 else newline_offset + 1
+
+            yield self._mmap[offset:next_offset].decode("utf-8")
+
+            offset = next_offset
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _GetIndex(self) -> Dict[str, Tuple[int, int, bytes]]:
+        if self._index is None:
+            index: Dict[str, Tuple[int, int, bytes]] = {}
+
+            offset = self._index_offset
+
+            for _ in range(self._num_entries):
+                (name_length, ) = _NAME_LENGTH.unpack_from(self._mmap, offset)
+                offset += _NAME_LENGTH.size
+
+                name = self._mmap[offset:offset + name_length].decode("utf-8")
+                offset += name_length
+
+                index[name] = _LOCATION.unpack_from(self._mmap, offset)
+                offset += _LOCATION.size
+
+            self._index = index
+
+        return self._index
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def GetPack(
+    path: Path,
+) -> Optional[ResultsPack]:
+    """Returns the (cached) pack at the path or None if the pack file doesn't exist"""
+
+    with _packs_lock:
+        pack = _packs.get(path, None)
+
+        if pack is not None:
+            if pack.IsCurrent():
+                return pack
+
+            pack.Close()
+            del _packs[path]
+
+        if not path.is_file():
+            return None
+
+        pack = ResultsPack(path)
+        _packs[path] = pack
+
+        return pack
+
+
+# ----------------------------------------------------------------------
+def ReadEntries(
+    path: Path,
+) -> Dict[str, str]:
+    """Returns the content of all entries in the pack file (or an empty dict if the pack file doesn't exist)"""
+
+    pack = GetPack(path)
+    if pack is None:
+        return {}
+
+    results: Dict[str, str] = {}
+
+    for name in pack.EnumNames():
+        content = pack.GetContent(name)
+        assert content is not None
+
+        results[name] = content
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def WriteEntries(
+    path: Path,
+    entries: Dict[str, str],
+) -> None:
+    """Atomically replaces the pack file with one that contains the provided entries"""
+
+    names = sorted(entries.keys())
+
+    data: List[bytes] = []
+    index: List[bytes] = []
+
+    offset = _HEADER.size
+
+    for name in names:
+        content = _NormalizeNewlines(entries[name]).encode("utf-8")
+        encoded_name = name.encode("utf-8")
+
+        data.append(content)
+        index += [
+            _NAME_LENGTH.pack(len(encoded_name)),
+            encoded_name,
+            _LOCATION.pack(offset, len(content), hashlib.sha256(content).digest()),
+        ]
+
+        offset += len(content)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    temp_path = path.with_name("{}.{}.tmp".format(path.name, os.getpid()))
+
+    with temp_path.open("wb") as f:
+        f.write(_HEADER.pack(ResultsPack.MAGIC, ResultsPack.VERSION, offset, len(names)))
+
+        for content in data:
+            f.write(content)
+
+        for item in index:
+            f.write(item)
+
+    # The file can't be replaced while it is mapped on Windows
+    _ReleasePack(path)
+
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink()
+        raise
+
+
+# ----------------------------------------------------------------------
+def UpdateEntries(
+    path: Path,
+    entries: Dict[str, str],
+) -> None:
+    """\
+    Adds or replaces the provided entries in the pack file, creating the file if necessary. The
+    pack file is locked while it is read and replaced, so processes updating the same pack file
+    don't lose each other's entries.
+    """
+
+    with _LockPack(path):
+        all_entries = ReadEntries(path)
+        all_entries.update(entries)
+
+        WriteEntries(path, all_entries)
+
+
+# ----------------------------------------------------------------------
+def Pack(
+    directory: Path,
+    *,
+    file_extensions: Optional[List[str]]=None,
+    remove_loose_files: bool=True,
+) -> List[Path]:
+    """\
+    Moves the loose results files in a directory into its pack file (merging with the entries that
+    are already there); returns the loose files that were packed. Only files with one of the
+    `file_extensions` (DEFAULT_RESULTS_FILE_EXTENSIONS by default) are results files; other files
+    (for example, README files) are left in place. Compressed results files are decompressed (see
+    ResultsCompression.py).
+    """
+
+    if file_extensions is None:
+        file_extensions = DEFAULT_RESULTS_FILE_EXTENSIONS
+
+    loose_files: List[Path] = []
+    entry_files: Dict[str, Path] = {}
+
+    for item in sorted(directory.iterdir()):
+        if not item.is_file() or item.name == PACK_FILENAME or _IsTempFilename(item.name):
+            continue
+
+        name = item.name
+
+        compression_extension = ResultsCompression.GetExtension(item)
+        if compression_extension is not None:
+            name = name[:-len(compression_extension)]
+
+        if not any(name.endswith(file_extension) for file_extension in file_extensions):
+            continue
+
+        # Compressed and uncompressed versions of the same results can't both be packed
+        existing_file = entry_files.get(name, None)
+        if existing_file is not None:
+            raise Exception(
+                "'{}' and '{}' both contain the results for '{}'; remove one of them before packing.".format(
+                    existing_file,
+                    item,
+                    name,
+                ),
+            )
+
+        entry_files[name] = item
+        loose_files.append(item)
+
+    if not loose_files:
+        return []
+
+    entries: Dict[str, str] = {}
+
+    for name, loose_file in entry_files.items():
+        with ResultsCompression.Open(loose_file) as f:
+            entries[name] = f.read()
+
+    UpdateEntries(directory / PACK_FILENAME, entries)
+
+    if remove_loose_files:
+        for loose_file in loose_files:
+            loose_file.unlink()
+
+    return loose_files
+
+
+# ----------------------------------------------------------------------
+def Unpack(
+    directory: Path,
+    *,
+    remove_pack_file: bool=True,
+) -> List[Path]:
+    """Writes each entry in a directory's pack file as a loose results file; returns the loose files that were written"""
+
+    pack_path = directory / PACK_FILENAME
+
+    with _LockPack(pack_path):
+        entries = ReadEntries(pack_path)
+
+        loose_files: List[Path] = []
+
+        for name, content in entries.items():
+            loose_file = directory / name
+
+            with loose_file.open("w", encoding="utf-8") as f:
+                f.write(content)
+
+            loose_files.append(loose_file)
+
+        if remove_pack_file and pack_path.is_file():
+            _ReleasePack(pack_path)
+            pack_path.unlink()
+
+    return loose_files
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_HEADER                                     = struct.Struct("<8sIQI")
+_NAME_LENGTH                                = struct.Struct("<H")
+_LOCATION                                   = struct.Struct("<QQ32s")
+
+_packs_lock                                 = threading.Lock()
+_packs: Dict[Path, ResultsPack]             = {}
+
+
+# ----------------------------------------------------------------------
+def _ReleasePack(
+    path: Path,
+) -> None:
+    with _packs_lock:
+        pack = _packs.pop(path, None)
+        if pack is not None:
+            pack.Close()
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def _LockPack(
+    path: Path,
+) -> Iterator[None]:
+    """Waits for an exclusive lock associated with the pack file, which is held until the block exits"""
+
+    # The lock file is created in the temp directory rather than next to the pack file, so that it
+    # doesn't appear in results directories (which are usually under source control). The pack file
+    # itself can't be locked, as it is replaced when it is written.
+    lock_path = Path(tempfile.gettempdir()) / "ResultsPack_{}.lock".format(
+        hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:16],
+    )
+
+    with lock_path.open("a+b") as f:
+        if os.name == "nt":
+            import msvcrt  # pylint: disable=import-error,import-outside-toplevel
+
+            while True:
+                f.seek(0)
+
+                try:
+                    # Raises after attempting to acquire the lock for 10 seconds
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # type: ignore
+                    break
+                except OSError:
+                    continue
+
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)  # type: ignore
+
+        else:
+            import fcntl  # pylint: disable=import-error,import-outside-toplevel
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # pylint: disable=no-member
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)  # pylint: disable=no-member
+
+
+# ----------------------------------------------------------------------
+def _NormalizeNewlines(
+    content: str,
+) -> str:
+    # Match the content read from a loose file opened in text mode (universal newlines)
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+    return content
+
+
+# ----------------------------------------------------------------------
+def _IsTempFilename(
+    name: str,
+) -> bool:
+    return name.startswith(PACK_FILENAME + ".") and name.endswith(".tmp")
@@ -15,12 +15,25 @@
 # ----------------------------------------------------------------------
 """Functionality that is helpful when writing automated tests"""
 
-import inspect
+import hashlib
+import itertools
+import json
+import math
+import os
+import statistics
+import sys
 import textwrap
+import time
+import tracemalloc
 
+from difflib import SequenceMatcher
 from enum import auto, Enum
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from Common_PythonDevelopment.MemoryBenchmark import Measure as MeasureMemory
+from Common_PythonDevelopment import ResultsCompression
+from Common_PythonDevelopment import ResultsPack
 
 
 # ----------------------------------------------------------------------
@@ -32,6 +45,13 @@ DEFAULT_SUFFIX                              = None
 DEFAULT_SUBDIR                              = "Results"
 DEFAULT_FILE_EXTENSION                      = ".txt"
 DEFAULT_CALL_STACK_OFFSET                   = 0
+DEFAULT_MAX_DIFF_HUNKS                      = 5
+DEFAULT_COMPRESSION_THRESHOLD               = None
+DEFAULT_COMPRESSION_EXTENSION               = ResultsCompression.GZIP_EXTENSION
+
+DEFAULT_BUDGET_FILE_EXTENSION               = ".budget.json"
+DEFAULT_BUDGET_ROUNDS                       = 5
+DEFAULT_BUDGET_HEADROOM                     = 1.5
 
 
 # ----------------------------------------------------------------------
@@ -43,10 +63,152 @@ class ResultsFilenameFormat(Enum):
     Version2                                = auto()
 
 
+# ----------------------------------------------------------------------
+class ResultsStore(Enum):
+    # Packed if the results directory contains a pack file, Loose if it does not
+    Auto                                    = auto()
+
+    # One file for each result
+    Loose                                   = auto()
+
+    # One entry for each result in the results directory's pack file (see ResultsPack.py)
+    Packed                                  = auto()
+
+
+# ----------------------------------------------------------------------
+class ResultsUpdates(object):
+    """\
+    Results written by CompareResultsFromFile (when `overwrite_content_with_current_results` is
+    True) that are collected and written at once; see SetResultsUpdates.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        # Results and compression extension (see ResultsCompression.py) of each results file
+        self.loose: Dict[Path, Tuple[str, Optional[str]]]   = {}
+
+        self.packed: Dict[Path, Dict[str, str]]             = {}
+
+        # Results that were updated multiple times with different content; the last update is written
+        self.conflicts: Set[str]                            = set()
+
+    # ----------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.loose) + sum(len(entries) for entries in self.packed.values())
+
+    # ----------------------------------------------------------------------
+    def Add(
+        self,
+        fullpath: Path,
+        store: ResultsStore,
+        results: str,
+        compression_threshold: Optional[int]=None,
+        compression_extension: str=DEFAULT_COMPRESSION_EXTENSION,
+    ) -> None:
+        if _GetPack(fullpath, store) is not None or store == ResultsStore.Packed:
+            self._Add(
+                self.packed.setdefault(fullpath.parent / ResultsPack.PACK_FILENAME, {}),
+                fullpath.name,
+                results,
+                "{} [{}]".format(fullpath.parent / ResultsPack.PACK_FILENAME, fullpath.name),
+            )
+        else:
+            self._Add(
+                self.loose,
+                fullpath,
+                (results, _GetCompressionExtension(results, compression_threshold, compression_extension)),
+                str(fullpath),
+            )
+
+    # ----------------------------------------------------------------------
+    def Merge(
+        self,
+        other: "ResultsUpdates",
+    ) -> None:
+        for fullpath, value in other.loose.items():
+            self._Add(self.loose, fullpath, value, str(fullpath))
+
+        for pack_path, entries in other.packed.items():
+            these_entries = self.packed.setdefault(pack_path, {})
+
+            for name, results in entries.items():
+                self._Add(these_entries, name, results, "{} [{}]".format(pack_path, name))
+
+        self.conflicts |= other.conflicts
+
+    # ----------------------------------------------------------------------
+    def Write(self) -> List[Path]:
+        """Atomically writes each results file and pack file; returns the files written"""
+
+        written: List[Path] = []
+
+        for fullpath, (results, compression_extension) in self.loose.items():
+            written.append(_WriteLooseResults(fullpath, results, compression_extension))
+
+        for pack_path, entries in self.packed.items():
+            ResultsPack.UpdateEntries(pack_path, entries)
+            written.append(pack_path)
+
+        return written
+
+    # ----------------------------------------------------------------------
+    def ToDict(self) -> Dict[str, Any]:
+        """Returns the updates as a dict that only contains strings (so that it can be sent between processes)"""
+
+        return {
+            "loose": {str(fullpath): list(value) for fullpath, value in self.loose.items()},
+            "packed": {str(pack_path): entries for pack_path, entries in self.packed.items()},
+            "conflicts": sorted(self.conflicts),
+        }
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def FromDict(
+        cls,
+        values: Dict[str, Any],
+    ) -> "ResultsUpdates":
+        result = cls()
+
+        result.loose = {Path(fullpath): (value[0], value[1]) for fullpath, value in values["loose"].items()}
+        result.packed = {Path(pack_path): dict(entries) for pack_path, entries in values["packed"].items()}
+        result.conflicts = set(values["conflicts"])
+
+        return result
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _Add(
+        self,
+        container: Dict[Any, Any],
+        key: Any,
+        value: Any,
+        desc: str,
+    ) -> None:
+        existing_value = container.get(key, None)
+        if existing_value is not None and existing_value != value:
+            self.conflicts.add(desc)
+
+        container[key] = value
+
+
 # ----------------------------------------------------------------------
 # |
 # |  Public Functions
 # |
+# ----------------------------------------------------------------------
+def SetResultsUpdates(
+    updates: Optional[ResultsUpdates],
+) -> None:
+    """\
+    When `updates` is not None, results overwritten by CompareResultsFromFile are added to it rather
+    than written immediately (the caller is responsible for writing them). TestHelpersPytestPlugin
+    uses this functionality to write all of the results at the end of a pytest session.
+    """
+
+    global _results_updates  # pylint: disable=global-statement
+    _results_updates = updates
+
+
 # ----------------------------------------------------------------------
 def ResultsFromFile(
     suffix: Optional[str]=DEFAULT_SUFFIX,
@@ -57,6 +219,7 @@ def ResultsFromFile(
     decorate_stem_func: Optional[Callable[[str], str]]=None,
     *,
     results_filename_format: ResultsFilenameFormat=ResultsFilenameFormat.Version1,
+    store: ResultsStore=ResultsStore.Auto,
 ) -> str:
     """\
     Returns results saved from a file, where the filename is dynamically created based on the
@@ -80,6 +243,11 @@ def ResultsFromFile(
         class MyClass(object):
             def test_MyMethod(self):
                 assert ResultsFromFile() == "bar"  # Results/MyTests.MyClass.test_MyMethod.txt
+
+    Results can also be stored as entries in a single pack file within the results directory
+    (Results/Results.pack), where each entry is named by the filename above. `store` controls where
+    the results are read from; by default, the pack file is used if it exists. Use
+    Scripts/ResultsPackConverter.py to convert between the loose files and the pack file.
     """
 
     fullpath = _GetResultsFilename(
@@ -92,26 +260,7 @@ def ResultsFromFile(
         results_filename_format=results_filename_format,
     )
 
-    if not fullpath.is_file():
-        return textwrap.dedent(
-            """\
-            ********************************************************************************
-            ********************************************************************************
-            ********************************************************************************
-
-            WARNING:
-                The filename does not exist:
-
-                    {}
-
-            ********************************************************************************
-            ********************************************************************************
-            ********************************************************************************
-            """,
-        ).format(fullpath)
-
-    with fullpath.open() as f:
-        return f.read()
+    return _ReadResults(fullpath, store)
 
 
 # ----------------------------------------------------------------------
@@ -126,6 +275,11 @@ def CompareResultsFromFile(
     decorate_stem_func: Optional[Callable[[str], str]]=None,
     overwrite_content_with_current_results: bool=False,
     results_filename_format: ResultsFilenameFormat=ResultsFilenameFormat.Version1,
+    store: ResultsStore=ResultsStore.Auto,
+    hash_first: bool=False,
+    max_diff_hunks: int=DEFAULT_MAX_DIFF_HUNKS,
+    compression_threshold: Optional[int]=DEFAULT_COMPRESSION_THRESHOLD,
+    compression_extension: str=DEFAULT_COMPRESSION_EXTENSION,
 ) -> None:
     """\
     Compares the results provided with the results from a file on the filesystem (whose name is
@@ -139,9 +293,21 @@ def CompareResultsFromFile(
 
         from Common_PythonDevelopment.TestHelpers import CompareResultsFromFile
 
+    Use `hash_first` when the results are large; the length and digest of the results are compared
+    to those of the saved results and, if they are different, the assertion contains a unified diff
+    of (at most) the first `max_diff_hunks` differences rather than the diff generated by pytest
+    (which can be very slow for large content). The saved results are streamed rather than read
+    in their entirety.
+
+    Results files are not compressed by default. When `compression_threshold` is provided and
+    results are overwritten, results files that are at least `compression_threshold` bytes are
+    compressed in the `compression_extension` format (gzip by default; use
+    ResultsCompression.ZSTD_EXTENSION for zstd, which requires the 'zstandard' package). See
+    ResultsCompression.py. ResultsFromFile reads compressed results files when the uncompressed
+    results file doesn't exist. Entries in pack files are not compressed.
     """
 
-    if overwrite_content_with_current_results:
+    if overwrite_content_with_current_results or hash_first:
         filename = _GetResultsFilename(
             suffix,
             subdir,
@@ -152,27 +318,14 @@ def CompareResultsFromFile(
             results_filename_format=results_filename_format,
         )
 
-        print(
-            textwrap.dedent(
-                """\
-                ********************************************************************************
-                ********************************************************************************
-                ********************************************************************************
-
-                WARNING:
-                    File contents are being overwritten for:
-
-                        {}
-
-                ********************************************************************************
-                ********************************************************************************
-                ********************************************************************************
-                """,
-            ).format(filename),
-        )
+    if overwrite_content_with_current_results:
+        if not _OverwriteResults(filename, store, results, compression_threshold, compression_extension):
+            # The results will be written later, so there is nothing to compare them to
+            return
 
-        with filename.open("w") as f:
-            f.write(results)
+    if hash_first:
+        _CompareDigestFirst(results, filename, store, max_diff_hunks)
+        return
 
     assert results == ResultsFromFile(
         suffix,
@@ -182,11 +335,706 @@ def CompareResultsFromFile(
         decorate_test_name_func,
         decorate_stem_func,
         results_filename_format=results_filename_format,
+        store=store,
+    )
+
+
+# ----------------------------------------------------------------------
+def AssertWithinBudget(
+    func: Callable[[], Any],
+    *,
+    max_seconds: Optional[float]=None,
+    max_cpu_seconds: Optional[float]=None,
+    max_peak_bytes: Optional[int]=None,
+    rounds: int=DEFAULT_BUDGET_ROUNDS,
+    suffix: Optional[str]=DEFAULT_SUFFIX,
+    subdir: str=DEFAULT_SUBDIR,
+    file_extension: str=DEFAULT_BUDGET_FILE_EXTENSION,
+    call_stack_offset: int=DEFAULT_CALL_STACK_OFFSET,
+    decorate_test_name_func: Optional[Callable[[str], str]]=None,
+    decorate_stem_func: Optional[Callable[[str], str]]=None,
+    overwrite_content_with_current_results: bool=False,
+    results_filename_format: ResultsFilenameFormat=ResultsFilenameFormat.Version1,
+    store: ResultsStore=ResultsStore.Auto,
+    headroom: float=DEFAULT_BUDGET_HEADROOM,
+) -> None:
+    """\
+    Calls `func` `rounds` times (after an initial call that isn't measured) and asserts that the
+    median wall time, CPU time, and peak memory allocated (measured with tracemalloc) are within the
+    budget.
+
+    The budget is read from a file whose name is calculated like the name used by ResultsFromFile:
+
+        Results/<basename>.<test_name>.budget.json
+
+            {"max_seconds": 0.25, "max_cpu_seconds": 0.25, "max_peak_bytes": 1048576}
+
+    Values provided as arguments override the values in the file. When
+    `overwrite_content_with_current_results` is True, the file is written with the current
+    measurements multiplied by `headroom` rather than compared to the budget.
+
+    Memory is measured in rounds that are separate from the rounds that measure time (tracemalloc
+    slows the code being measured), and only when there is a memory budget.
+
+    Examples:
+
+        def test_Parse():
+            AssertWithinBudget(lambda: Parse(content), max_seconds=0.1)
+
+        def test_Render():
+            AssertWithinBudget(lambda: Render(content))     # Budget read from Results/MyTests.test_Render.budget.json
+    """
+
+    if rounds < 1:
+        raise Exception("'rounds' must be greater than 0.")
+
+    validator = _BudgetValidator(
+        _GetResultsFilename(
+            suffix,
+            subdir,
+            file_extension,
+            call_stack_offset + 1,
+            decorate_test_name_func,
+            decorate_stem_func,
+            results_filename_format=results_filename_format,
+        ),
+        store,
+        {
+            "max_seconds": max_seconds,
+            "max_cpu_seconds": max_cpu_seconds,
+            "max_peak_bytes": max_peak_bytes,
+        },
+        overwrite_content_with_current_results,
+        headroom,
+        always_measure_memory_on_overwrite=True,
+    )
+
+    # Warm up
+    func()
+
+    seconds: List[float] = []
+    cpu_seconds: List[float] = []
+
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+
+        func()
+
+        cpu_seconds.append(time.process_time() - start_cpu_time)
+        seconds.append(time.perf_counter() - start_time)
+
+    if validator.measure_memory:
+        peak_bytes: Optional[List[float]] = [MeasureMemory(func).peak_bytes for _ in range(rounds)]
+    else:
+        peak_bytes = None
+
+    validator.Validate(seconds, cpu_seconds, peak_bytes)
+
+
+# ----------------------------------------------------------------------
+class WithinBudget(object):
+    """\
+    Context manager that asserts that the code within the block is within the budget when the block
+    exits; see AssertWithinBudget for information on the budget.
+
+    The block is only run once. Time is measured while tracemalloc is tracing when there is a memory
+    budget, so budget time and memory separately (or use AssertWithinBudget) when both are important.
+    For the same reason, the budget written when `overwrite_content_with_current_results` is True
+    only includes memory when the current budget (or `max_peak_bytes`) does.
+
+    Example:
+
+        def test_Parse():
+            with WithinBudget(max_seconds=0.1):
+                Parse(content)
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        *,
+        max_seconds: Optional[float]=None,
+        max_cpu_seconds: Optional[float]=None,
+        max_peak_bytes: Optional[int]=None,
+        suffix: Optional[str]=DEFAULT_SUFFIX,
+        subdir: str=DEFAULT_SUBDIR,
+        file_extension: str=DEFAULT_BUDGET_FILE_EXTENSION,
+        call_stack_offset: int=DEFAULT_CALL_STACK_OFFSET,
+        decorate_test_name_func: Optional[Callable[[str], str]]=None,
+        decorate_stem_func: Optional[Callable[[str], str]]=None,
+        overwrite_content_with_current_results: bool=False,
+        results_filename_format: ResultsFilenameFormat=ResultsFilenameFormat.Version1,
+        store: ResultsStore=ResultsStore.Auto,
+        headroom: float=DEFAULT_BUDGET_HEADROOM,
+    ):
+        # The filename is calculated here because the test function is the caller of this method
+        self._validator                     = _BudgetValidator(
+            _GetResultsFilename(
+                suffix,
+                subdir,
+                file_extension,
+                call_stack_offset + 1,
+                decorate_test_name_func,
+                decorate_stem_func,
+                results_filename_format=results_filename_format,
+            ),
+            store,
+            {
+                "max_seconds": max_seconds,
+                "max_cpu_seconds": max_cpu_seconds,
+                "max_peak_bytes": max_peak_bytes,
+            },
+            overwrite_content_with_current_results,
+            headroom,
+            always_measure_memory_on_overwrite=False,
+        )
+
+        self._was_tracing                   = False
+        self._initial_bytes                 = 0
+        self._start_time                    = 0.0
+        self._start_cpu_time                = 0.0
+
+    # ----------------------------------------------------------------------
+    def __enter__(self) -> "WithinBudget":
+        if self._validator.measure_memory:
+            self._was_tracing = tracemalloc.is_tracing()
+            if not self._was_tracing:
+                tracemalloc.start()
+
+            self._initial_bytes, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+        self._start_time = time.perf_counter()
+        self._start_cpu_time = time.process_time()
+
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, exc_type, exc_value, exc_tb) -> None:
+        cpu_seconds = time.process_time() - self._start_cpu_time
+        seconds = time.perf_counter() - self._start_time
+
+        if self._validator.measure_memory:
+            _, peak_bytes = tracemalloc.get_traced_memory()
+
+            if not self._was_tracing:
+                tracemalloc.stop()
+
+            peak_bytes_values: Optional[List[float]] = [max(0, peak_bytes - self._initial_bytes)]
+        else:
+            peak_bytes_values = None
+
+        # Don't hide the exception raised within the block
+        if exc_type is not None:
+            return
+
+        self._validator.Validate([seconds], [cpu_seconds], peak_bytes_values)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_DIFF_CONTEXT_LINES                         = 3
+
+# Maximum number of lines (after the first difference) read from the saved and current results when
+# creating a diff.
+_MAX_DIFF_WINDOW_LINES                      = 2000
+
+_DIGEST_CHUNK_SIZE                          = 1024 * 1024
+
+# Timing noise is larger than the headroom for code that runs very quickly
+_MIN_BUDGET_SECONDS_HEADROOM                = 0.001
+
+_results_updates: Optional[ResultsUpdates]  = None
+
+
+# ----------------------------------------------------------------------
+class _BudgetValidator(object):
+    """Compares measurements to a budget (or writes the budget)"""
+
+    # Budget name, measurement name, and function that formats a value
+    METRICS                                 = [
+        ("max_seconds", "wall time", lambda value: "{:.6f}s".format(value)),
+        ("max_cpu_seconds", "cpu time", lambda value: "{:.6f}s".format(value)),
+        ("max_peak_bytes", "peak memory", lambda value: "{:,.0f} bytes".format(value)),
+    ]
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        fullpath: Path,
+        store: ResultsStore,
+        budget_args: Dict[str, Optional[float]],
+        overwrite: bool,
+        headroom: float,
+        *,
+        always_measure_memory_on_overwrite: bool,
+    ):
+        budget: Dict[str, float] = {}
+
+        content = _TryReadResults(fullpath, store)
+        if content is not None:
+            try:
+                budget.update(json.loads(content))
+            except json.JSONDecodeError as ex:
+                if not overwrite:
+                    raise Exception("The budget in '{}' is not valid JSON ({}).".format(fullpath, ex)) from ex
+
+        budget_sources: List[str] = []
+
+        if budget:
+            budget_sources.append(str(fullpath))
+
+        budget_args = {key: value for key, value in budget_args.items() if value is not None}
+        if budget_args:
+            budget.update(budget_args)
+            budget_sources.append("arguments")
+
+        if not budget and not overwrite:
+            raise Exception("A budget was not provided and '{}' does not exist.".format(fullpath))
+
+        self.fullpath                       = fullpath
+        self.store                          = store
+        self.budget                         = budget
+        self.budget_desc                    = " and ".join(budget_sources)
+        self.overwrite                      = overwrite
+        self.headroom                       = headroom
+
+        self.measure_memory                 = "max_peak_bytes" in budget or (overwrite and always_measure_memory_on_overwrite)
+
+    # ----------------------------------------------------------------------
+    def Validate(
+        self,
+        seconds: List[float],
+        cpu_seconds: List[float],
+        peak_bytes: Optional[List[float]],
+    ) -> None:
+        measurements: Dict[str, float] = {
+            "max_seconds": statistics.median(seconds),
+            "max_cpu_seconds": statistics.median(cpu_seconds),
+        }
+
+        if peak_bytes is not None:
+            measurements["max_peak_bytes"] = statistics.median(peak_bytes)
+
+        if self.overwrite:
+            budget: Dict[str, Any] = {}
+
+            for key, value in measurements.items():
+                if key == "max_peak_bytes":
+                    budget[key] = int(math.ceil(value * self.headroom))
+                else:
+                    budget[key] = round(max(value * self.headroom, value + _MIN_BUDGET_SECONDS_HEADROOM), 6)
+
+            _OverwriteResults(self.fullpath, self.store, "{}\n".format(json.dumps(budget, indent=4)), None, DEFAULT_COMPRESSION_EXTENSION)
+            return
+
+        lines: List[str] = []
+        is_exceeded = False
+
+        for key, desc, format_func in self.__class__.METRICS:
+            budget_value = self.budget.get(key, None)
+            if budget_value is None:
+                continue
+
+            value = measurements[key]
+
+            if value > budget_value:
+                is_exceeded = True
+                status = "EXCEEDED by {:.1f}%".format(100.0 * (value - budget_value) / budget_value) if budget_value else "EXCEEDED"
+            else:
+                status = "ok"
+
+            lines.append(
+                "    {:<12} {:>18}    budget: {:>18}    {}".format(
+                    desc + ":",
+                    format_func(value),
+                    format_func(budget_value),
+                    status,
+                ),
+            )
+
+        if is_exceeded:
+            raise AssertionError(
+                textwrap.dedent(
+                    """\
+                    The performance budget was exceeded (median of {} round{}):
+
+                    {}
+
+                    Budget: {}
+                    """,
+                ).format(
+                    len(seconds),
+                    "" if len(seconds) == 1 else "s",
+                    "\n".join(lines),
+                    self.budget_desc,
+                ),
+            )
+
+
+# ----------------------------------------------------------------------
+def _OverwriteResults(
+    fullpath: Path,
+    store: ResultsStore,
+    results: str,
+    compression_threshold: Optional[int],
+    compression_extension: str,
+) -> bool:
+    """Returns True if the results were written or False if they will be written later (see SetResultsUpdates)"""
+
+    if _results_updates is not None:
+        _results_updates.Add(fullpath, store, results, compression_threshold, compression_extension)
+        return False
+
+    print(
+        textwrap.dedent(
+            """\
+            ********************************************************************************
+            ********************************************************************************
+            ********************************************************************************
+
+            WARNING:
+                File contents are being overwritten for:
+
+                    {}
+
+            ********************************************************************************
+            ********************************************************************************
+            ********************************************************************************
+            """,
+        ).format(fullpath),
     )
 
+    updates = ResultsUpdates()
+
+    updates.Add(fullpath, store, results, compression_threshold, compression_extension)
+    updates.Write()
+
+    return True
+
+
+# ----------------------------------------------------------------------
+def _TryReadResults(
+    fullpath: Path,
+    store: ResultsStore,
+) -> Optional[str]:
+    pack = _GetPack(fullpath, store)
+
+    if pack is not None:
+        return pack.GetContent(fullpath.name)
+
+    if store == ResultsStore.Packed:
+        return None
+
+    loose_fullpath = ResultsCompression.FindFile(fullpath)
+    if loose_fullpath is None:
+        return None
+
+    with ResultsCompression.Open(loose_fullpath) as f:
+        return f.read()
+
 
 # ----------------------------------------------------------------------
+def _ReadResults(
+    fullpath: Path,
+    store: ResultsStore,
+) -> str:
+    content = _TryReadResults(fullpath, store)
+    if content is not None:
+        return content
+
+    pack = _GetPack(fullpath, store)
+
+    if pack is not None:
+        missing_desc = "The entry '{}' does not exist in:\n\n    {}".format(fullpath.name, pack.path)
+
+    elif store == ResultsStore.Packed:
+        missing_desc = "The filename does not exist:\n\n    {}".format(fullpath.parent / ResultsPack.PACK_FILENAME)
+
+    else:
+        missing_desc = "The filename does not exist:\n\n    {}".format(fullpath)
+
+    return textwrap.dedent(
+        """\
+        ********************************************************************************
+        ********************************************************************************
+        ********************************************************************************
+
+        WARNING:
+            {}
+
+        ********************************************************************************
+        ********************************************************************************
+        ********************************************************************************
+        """,
+    ).format(textwrap.indent(missing_desc, "    ").lstrip())
+
+
 # ----------------------------------------------------------------------
+def _CompareDigestFirst(
+    results: str,
+    fullpath: Path,
+    store: ResultsStore,
+    max_diff_hunks: int,
+) -> None:
+    pack = _GetPack(fullpath, store)
+
+    if pack is not None or store == ResultsStore.Packed:
+        loose_fullpath = None
+    else:
+        loose_fullpath = ResultsCompression.FindFile(fullpath)
+
+    if pack is not None and fullpath.name in pack:
+        baseline_desc = "{} [{}]".format(pack.path, fullpath.name)
+
+        baseline_digest = pack.GetDigest(fullpath.name)
+        assert baseline_digest is not None
+
+        enum_baseline_lines_func = lambda: pack.EnumLines(fullpath.name)
+
+    elif loose_fullpath is not None:
+        baseline_desc = str(loose_fullpath)
+
+        baseline_digest = _CalculateFileDigest(loose_fullpath)
+
+        # ----------------------------------------------------------------------
+        def EnumFileLines() -> Iterator[str]:
+            assert loose_fullpath is not None
+
+            with ResultsCompression.Open(loose_fullpath) as f:
+                yield from f
+
+        # ----------------------------------------------------------------------
+
+        enum_baseline_lines_func = EnumFileLines
+
+    else:
+        raise AssertionError(_ReadResults(fullpath, store))
+
+    encoded_results = results.encode("utf-8")
+
+    if (
+        len(encoded_results) == baseline_digest[0]
+        and hashlib.sha256(encoded_results).digest() == baseline_digest[1]
+    ):
+        return
+
+    raise AssertionError(
+        "The results do not match the saved results.\n\n{}".format(
+            _CreateDiff(
+                enum_baseline_lines_func(),
+                results,
+                baseline_desc,
+                max_diff_hunks,
+            ),
+        ),
+    )
+
+
+# ----------------------------------------------------------------------
+def _CalculateFileDigest(
+    fullpath: Path,
+) -> Tuple[int, bytes]:
+    # Read the file in text mode so that the digest is calculated from the same content returned by
+    # ResultsFromFile (newlines are normalized).
+    length = 0
+    hasher = hashlib.sha256()
+
+    with ResultsCompression.Open(fullpath) as f:
+        while True:
+            chunk = f.read(_DIGEST_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            encoded_chunk = chunk.encode("utf-8")
+
+            length += len(encoded_chunk)
+            hasher.update(encoded_chunk)
+
+    return length, hasher.digest()
+
+
+# ----------------------------------------------------------------------
+def _CreateDiff(
+    baseline_lines: Iterator[str],
+    results: str,
+    baseline_desc: str,
+    max_diff_hunks: int,
+) -> str:
+    results_lines = _SplitLines(results)
+
+    # Skip the lines that are the same
+    first_diff_index = 0
+    first_diff_baseline_lines: List[str] = []
+
+    for baseline_line in baseline_lines:
+        if first_diff_index == len(results_lines) or baseline_line != results_lines[first_diff_index]:
+            first_diff_baseline_lines.append(baseline_line)
+            break
+
+        first_diff_index += 1
+
+    window_start = max(0, first_diff_index - _DIFF_CONTEXT_LINES)
+    window_end = first_diff_index + _MAX_DIFF_WINDOW_LINES
+
+    baseline_window = (
+        results_lines[window_start:first_diff_index]
+        + first_diff_baseline_lines
+        + list(itertools.islice(baseline_lines, window_end - first_diff_index - len(first_diff_baseline_lines)))
+    )
+    results_window = results_lines[window_start:window_end]
+
+    is_truncated = next(baseline_lines, None) is not None or len(results_lines) > window_end
+
+    output: List[str] = [
+        "--- {}\n".format(baseline_desc),
+        "+++ <results>\n",
+    ]
+
+    num_hunks = 0
+
+    for group in SequenceMatcher(None, baseline_window, results_window, autojunk=False).get_grouped_opcodes(_DIFF_CONTEXT_LINES):
+        if num_hunks == max_diff_hunks:
+            is_truncated = True
+            break
+
+        num_hunks += 1
+
+        first = group[0]
+        last = group[-1]
+
+        output.append(
+            "@@ -{} +{} @@\n".format(
+                _FormatRange(window_start + first[1], last[2] - first[1]),
+                _FormatRange(window_start + first[3], last[4] - first[3]),
+            ),
+        )
+
+        for tag, baseline_start, baseline_end, results_start, results_end in group:
+            if tag == "equal":
+                output += (" " + line for line in baseline_window[baseline_start:baseline_end])
+                continue
+
+            if tag in ["replace", "delete"]:
+                output += ("-" + line for line in baseline_window[baseline_start:baseline_end])
+            if tag in ["replace", "insert"]:
+                output += ("+" + line for line in results_window[results_start:results_end])
+
+    # Lines without a newline would otherwise be joined with the line that follows
+    output = [line if line.endswith("\n") else line + "\n\\ No newline at end of file\n" for line in output]
+
+    if is_truncated:
+        output.append(
+            "\n[The diff has been truncated; it contains at most {} hunks within the {} lines that follow the first difference]\n".format(
+                max_diff_hunks,
+                _MAX_DIFF_WINDOW_LINES,
+            ),
+        )
+
+    return "".join(output)
+
+
+# ----------------------------------------------------------------------
+def _SplitLines(
+    content: str,
+) -> List[str]:
+    # Split on newlines only (str.splitlines also splits on other line boundaries), which matches the
+    # lines read from a file.
+    lines = [line + "\n" for line in content.split("\n")]
+
+    last_line = lines.pop()
+    if last_line != "\n":
+        lines.append(last_line[:-1])
+
+    return lines
+
+
+# ----------------------------------------------------------------------
+def _FormatRange(
+    start: int,
+    length: int,
+) -> str:
+    # Unified diff ranges are 1-based; empty ranges refer to the line before the range
+    if length == 0:
+        return "{},0".format(start)
+
+    if length == 1:
+        return str(start + 1)
+
+    return "{},{}".format(start + 1, length)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetCompressionExtension(
+    results: str,
+    compression_threshold: Optional[int],
+    compression_extension: str,
+) -> Optional[str]:
+    if compression_threshold is None or len(results.encode("utf-8")) < compression_threshold:
+        return None
+
+    if compression_extension not in ResultsCompression.EXTENSIONS:
+        if compression_extension == ResultsCompression.ZSTD_EXTENSION:
+            raise Exception("The 'zstandard' package is required to write '{}' files.".format(compression_extension))
+
+        raise Exception("'{}' is not a supported compression extension.".format(compression_extension))
+
+    return compression_extension
+
+
+# ----------------------------------------------------------------------
+def _WriteLooseResults(
+    fullpath: Path,
+    results: str,
+    compression_extension: Optional[str],
+) -> Path:
+    if compression_extension is not None:
+        output_fullpath = fullpath.with_name(fullpath.name + compression_extension)
+    else:
+        output_fullpath = fullpath
+
+    # Write to a temporary file and then replace the results file so that readers never see
+    # partially written content.
+    output_fullpath.parent.mkdir(parents=True, exist_ok=True)
+
+    temp_fullpath = output_fullpath.with_name("{}.{}.tmp".format(output_fullpath.name, os.getpid()))
+
+    if compression_extension is not None:
+        with temp_fullpath.open("wb") as f:
+            f.write(ResultsCompression.Compress(results, compression_extension))
+    else:
+        with temp_fullpath.open("w") as f:
+            f.write(results)
+
+    try:
+        os.replace(temp_fullpath, output_fullpath)
+    except BaseException:
+        temp_fullpath.unlink()
+        raise
+
+    # Remove the results file written in a different format
+    for existing_fullpath in ResultsCompression.EnumFiles(fullpath):
+        if existing_fullpath != output_fullpath:
+            existing_fullpath.unlink()
+
+    return output_fullpath
+
+
+# ----------------------------------------------------------------------
+def _GetPack(
+    fullpath: Path,
+    store: ResultsStore,
+) -> Optional[ResultsPack.ResultsPack]:
+    if store == ResultsStore.Loose:
+        return None
+
+    return ResultsPack.GetPack(fullpath.parent / ResultsPack.PACK_FILENAME)
+
+
 # ----------------------------------------------------------------------
 def _GetResultsFilename(
     suffix: Optional[str],
@@ -198,13 +1046,15 @@ def _GetResultsFilename(
     *,
     results_filename_format: ResultsFilenameFormat,
 ) -> Path:
-    caller = inspect.getouterframes(inspect.currentframe(), 2)[1 + call_stack_offset]
+    # Look up the caller's frame directly; inspect.getouterframes creates a FrameInfo object (including
+    # lines of source context) for every frame on the stack.
+    caller = sys._getframe(1 + call_stack_offset)  # pylint: disable=protected-access
 
-    test_name = caller.function
+    test_name = caller.f_code.co_name
     if decorate_test_name_func is not None:
         test_name = decorate_test_name_func(test_name)
 
-    self_value = caller.frame.f_locals.get("self", None)
+    self_value = caller.f_locals.get("self", None)
     if self_value is not None:
         if results_filename_format == ResultsFilenameFormat.Version1:
             if self_value.__class__.__name__ != self_value.__class__.__qualname__:
@@ -216,7 +1066,7 @@ def _GetResultsFilename(
         else:
             assert False, results_filename_format  # pragma: no cover
 
-    filename = Path(caller.filename)
+    filename = Path(caller.f_code.co_filename)
 
     return filename.parent / subdir / "{}.{}{}{}".format(
         decorate_stem_func(filename.stem) if decorate_stem_func is not None else filename.stem,
@@ -0,0 +1,124 @@
+# ----------------------------------------------------------------------
+# |
+# |  TestHelpersPytestPlugin.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 23:51:32
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+pytest plugin that writes the results overwritten by TestHelpers.CompareResultsFromFile (when
+`overwrite_content_with_current_results` is True) at the end of the session rather than during
+each test.
+
+Each results file (or pack file) is written once and atomically, updates made by pytest-xdist
+workers are written by the controller, and a single summary is displayed rather than a banner for
+each result. Load the plugin with:
+
+    pytest -p Common_PythonDevelopment.TestHelpersPytestPlugin ...
+
+or, in conftest.py:
+
+    pytest_plugins = ["Common_PythonDevelopment.TestHelpersPytestPlugin"]
+"""
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from Common_PythonDevelopment.TestHelpers import ResultsUpdates, SetResultsUpdates
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+# Key within the pytest-xdist worker output used to send the updates made by a worker to the controller
+WORKER_OUTPUT_KEY                           = "testhelpers_results_updates"
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def pytest_configure(config):
+    updates = ResultsUpdates()
+
+    SetResultsUpdates(updates)
+    config.pluginmanager.register(_ResultsUpdatesWriter(updates), "testhelpers_results_updates_writer")
+
+
+# ----------------------------------------------------------------------
+def pytest_unconfigure(config):  # pylint: disable=unused-argument
+    SetResultsUpdates(None)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+class _ResultsUpdatesWriter(object):
+    """Writes the collected updates at the end of the session (or sends them to the controller when running within a pytest-xdist worker)."""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        updates: ResultsUpdates,
+    ):
+        self._updates                       = updates
+
+        self._num_updates                   = 0
+        self._written: List[Path]           = []
+
+    # ----------------------------------------------------------------------
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):  # pylint: disable=unused-argument
+        values = getattr(node, "workeroutput", {}).get(WORKER_OUTPUT_KEY, None)
+        if values is not None:
+            self._updates.Merge(ResultsUpdates.FromDict(values))
+
+    # ----------------------------------------------------------------------
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        if hasattr(session.config, "workerinput"):
+            session.config.workeroutput[WORKER_OUTPUT_KEY] = self._updates.ToDict()
+            return
+
+        self._num_updates = len(self._updates)
+        self._written = self._updates.Write()
+
+    # ----------------------------------------------------------------------
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self._num_updates:
+            return
+
+        terminalreporter.section("updated results")
+
+        terminalreporter.write_line(
+            "{} result{} written to {} file{}".format(
+                self._num_updates,
+                "" if self._num_updates == 1 else "s",
+                len(self._written),
+                "" if len(self._written) == 1 else "s",
+            ),
+            yellow=True,
+        )
+
+        if terminalreporter.verbosity > 0:
+            for filename in self._written:
+                terminalreporter.write_line("    {}".format(filename))
+
+        for desc in sorted(self._updates.conflicts):
+            terminalreporter.write_line(
+                "WARNING: different results were provided for '{}'; the last results were written".format(desc),
+                red=True,
+            )
@@ -0,0 +1,852 @@
+# ----------------------------------------------------------------------
+# |
+# |  TesterPytestPlugin.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 22:58:54
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+pytest plugin that provides functionality used when pytest is invoked by Tester (via
+PytestTestParser).
+
+Load the plugin with:
+
+    pytest -p Common_PythonDevelopment.TesterPytestPlugin ...
+
+The plugin loads MemoryBenchmarkPytestPlugin, which provides the 'memory_benchmark' fixture, and
+writes the statistics of each memory benchmark when '--tester-memory-benchmarks' is provided.
+"""
+
+import cProfile
+import faulthandler
+import heapq
+import inspect
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import threading
+import time
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import pytest
+
+from Common_PythonDevelopment.MemoryBenchmark import MemoryBenchmark
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+# Prefix of the pytest-xdist group names used when tests are sharded. pytest-xdist appends
+# '@<group name>' to the node ids of grouped tests.
+SHARD_GROUP_PREFIX                          = "tester_shard_"
+
+# Key within pytest's cache used to store the durations of the tests in a file (the file's
+# relative path is appended).
+DURATIONS_CACHE_KEY_PREFIX                  = "tester/durations/"
+
+# Outcome written to the results file for tests that were collected but not run
+NOT_RUN_OUTCOME                             = "not run"
+
+# Suffixes of the files written for each test profiled with '--tester-profile-slower-than'
+PROFILE_STATS_SUFFIX                        = ".pstats"
+PROFILE_COLLAPSED_STACKS_SUFFIX             = ".collapsed.txt"
+
+# Written to stderr before and after a test is run again while it is profiled, so that a timeout
+# during the profiled run can be distinguished from a timeout of the test itself.
+PROFILE_START_MARKER_TEMPLATE               = "\n<<<<<<<<<< Profiling '{nodeid}' >>>>>>>>>>\n"
+PROFILE_END_MARKER_TEMPLATE                 = "\n<<<<<<<<<< Profiled '{nodeid}' >>>>>>>>>>\n"
+
+# Key within each benchmark of pytest-benchmark's JSON content used to store the noise level of the
+# benchmark (the interquartile range of its rounds as a percentage of their median) when running
+# with '--tester-benchmark-stable'.
+NOISE_PERCENTAGE_JSON_KEY                   = "tester_noise_percentage"
+
+# Key within the 'machine_info' of pytest-benchmark's JSON content that is set to True when running
+# with '--tester-benchmark-stable'.
+STABLE_JSON_KEY                             = "tester_stable"
+
+# The fixture is available even when plugins aren't loaded automatically (see 'pytest_lean' in PytestTestParser)
+pytest_plugins                              = ["Common_PythonDevelopment.MemoryBenchmarkPytestPlugin"]
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("tester", "Tester integration")
+
+    group.addoption(
+        "--tester-test-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Write the stacks of all threads and exit if a single test takes longer than this value.",
+    )
+
+    group.addoption(
+        "--tester-results",
+        default=None,
+        metavar="FILENAME",
+        help="Write the result of each test to this file as a JSON line (nodeid, outcome, duration in seconds, and pytest-xdist worker); tests that were collected but not run (for example, because of '--maxfail') have the outcome 'not run'.",
+    )
+
+    group.addoption(
+        "--tester-shards",
+        type=int,
+        default=None,
+        metavar="NUM_SHARDS",
+        help="Assign tests to this number of pytest-xdist groups (run with '--dist=loadgroup') so that each group's expected duration (based on previous runs) is balanced.",
+    )
+
+    group.addoption(
+        "--tester-profile-slower-than",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Run tests that take longer than this value (not including the setup and teardown of their fixtures) and passed again while profiling them, and write the profile ('{}') and collapsed stacks for flame graphs ('{}') to the directory provided by '--tester-profile-dir'.".format(PROFILE_STATS_SUFFIX, PROFILE_COLLAPSED_STACKS_SUFFIX),
+    )
+
+    group.addoption(
+        "--tester-profile-dir",
+        default="pytest_profiles",
+        metavar="DIRECTORY",
+        help="Directory for the files written by '--tester-profile-slower-than'.",
+    )
+
+    group.addoption(
+        "--tester-benchmarks",
+        default=None,
+        metavar="FILENAME",
+        help="Write pytest-benchmark's JSON content to this file (ignored when pytest-benchmark isn't installed).",
+    )
+
+    group.addoption(
+        "--tester-memory-benchmarks",
+        default=None,
+        metavar="FILENAME",
+        help="Write the statistics of each 'memory_benchmark' metric to this file as a JSON line.",
+    )
+
+    group.addoption(
+        "--tester-benchmark-stable",
+        action="store_true",
+        default=False,
+        help="Reduce the variance of benchmarks: pin the process to isolated CPUs (or a single CPU) and record the noise level of each benchmark's rounds. pytest-benchmark disables GC during each round and runs warmup rounds. Hash randomization impacts the layout of dicts and sets, so set PYTHONHASHSEED to a fixed value in the environment that invokes pytest as well.",
+    )
+
+
+# ----------------------------------------------------------------------
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if config.getoption("tester_benchmark_stable") and not hasattr(config, "workerinput"):
+        config.pluginmanager.register(_BenchmarkStabilizer(_PinToStableCpus()), "tester_benchmark_stabilizer")
+
+    # pytest-benchmark's options are only available when it is installed in the test environment (it
+    # reads them when it is configured, after this plugin).
+    if hasattr(config.option, "benchmark_json"):
+        benchmarks_filename = config.getoption("tester_benchmarks")
+        if benchmarks_filename:
+            config.option.benchmark_json = Path(benchmarks_filename)
+
+        if config.getoption("tester_benchmark_stable"):
+            # Warmup rounds are based on the calibrated number of iterations
+            config.option.benchmark_disable_gc = True
+            config.option.benchmark_warmup = True
+
+    results_filename = config.getoption("tester_results")
+
+    num_shards = config.getoption("tester_shards")
+
+    # Results are written by the controlling process when tests are distributed across workers
+    if not hasattr(config, "workerinput"):
+        if results_filename:
+            config.pluginmanager.register(_ResultsWriter(Path(results_filename), bool(num_shards)), "tester_results_writer")
+
+        config.pluginmanager.register(_DurationsRecorder(bool(num_shards)), "tester_durations_recorder")
+
+    # Items are collected by each worker when tests are distributed, so each one must create the
+    # same shards.
+    if num_shards:
+        config.pluginmanager.register(_Sharder(num_shards), "tester_sharder")
+
+    # `benchmark_json` is only available when pytest-benchmark is installed
+    if config.getoption("benchmark_json", None):
+        config.pluginmanager.register(_BenchmarkSourceLines(), "tester_benchmark_source_lines")
+
+    # Tests are run (and profiled) by pytest-xdist workers when tests are distributed
+    profile_threshold = config.getoption("tester_profile_slower_than")
+    if profile_threshold is not None:
+        config.pluginmanager.register(_SlowTestProfiler(profile_threshold, Path(config.getoption("tester_profile_dir"))), "tester_slow_test_profiler")
+
+    # Memory benchmarks are run (and written) by pytest-xdist workers when tests are distributed
+    memory_benchmarks_filename = config.getoption("tester_memory_benchmarks")
+    if memory_benchmarks_filename:
+        # Imported here rather than at the top of this file, as pytest can only rewrite the asserts
+        # in plugins that it imports itself (via 'pytest_plugins').
+        from Common_PythonDevelopment.MemoryBenchmarkPytestPlugin import MEMORY_BENCHMARKS_WRITER_NAME  # pylint: disable=import-outside-toplevel
+
+        config.pluginmanager.register(_MemoryBenchmarksWriter(Path(memory_benchmarks_filename)), MEMORY_BENCHMARKS_WRITER_NAME)
+
+    # `numprocesses` is only available when pytest-xdist is installed
+    if config.getoption("numprocesses", None) and not hasattr(config, "workerinput"):
+        config.pluginmanager.register(_WorkerUtilizationReporter(), "tester_worker_utilization")
+
+
+# ----------------------------------------------------------------------
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):  # pylint: disable=unused-argument
+    timeout = item.config.getoption("tester_test_timeout")
+
+    if timeout:
+        # faulthandler's watchdog is implemented in C, so it fires even if the test is deadlocked
+        # while holding the GIL.
+        faulthandler.dump_traceback_later(timeout, exit=True, file=sys.__stderr__)
+
+    try:
+        yield
+    finally:
+        if timeout:
+            faulthandler.cancel_dump_traceback_later()
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+class _ResultsWriter(object):
+    """Writes a JSON line for each test once all of its phases (setup, call, teardown) have completed."""
+
+    # Higher values take precedence when combining the outcomes of a test's phases
+    _OUTCOME_PRECEDENCE                     = {
+        "passed": 0,
+        "skipped": 1,
+        "failed": 2,
+        "error": 3,
+    }
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        filename: Path,
+        is_sharded: bool,
+    ):
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        self._is_sharded                    = is_sharded
+
+        self._file                          = filename.open("w", encoding="utf-8")
+        self._pending: Dict[str, Tuple[str, float]]     = {}
+
+        # Node ids of the collected tests (in order) that haven't been written
+        self._not_run: Dict[str, None]      = {}
+
+    # ----------------------------------------------------------------------
+    def pytest_collection_finish(self, session):
+        for item in session.items:
+            self._not_run[_GetNodeId(item.nodeid, self._is_sharded)] = None
+
+    # ----------------------------------------------------------------------
+    # The controlling process doesn't collect items when tests are distributed by pytest-xdist
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node, ids):  # pylint: disable=unused-argument
+        for nodeid in ids:
+            self._not_run[_GetNodeId(nodeid, self._is_sharded)] = None
+
+    # ----------------------------------------------------------------------
+    def pytest_runtest_logreport(self, report):
+        nodeid = _GetNodeId(report.nodeid, self._is_sharded)
+
+        outcome, duration = self._pending.pop(nodeid, ("passed", 0.0))
+
+        duration += report.duration
+
+        if report.failed:
+            this_outcome = "failed" if report.when == "call" else "error"
+        elif report.skipped:
+            this_outcome = "skipped"
+        else:
+            this_outcome = "passed"
+
+        if self.__class__._OUTCOME_PRECEDENCE[this_outcome] > self.__class__._OUTCOME_PRECEDENCE[outcome]:  # pylint: disable=protected-access
+            outcome = this_outcome
+
+        if report.when != "teardown":
+            self._pending[nodeid] = (outcome, duration)
+            return
+
+        self._not_run.pop(nodeid, None)
+        self._Write(nodeid, outcome, duration, getattr(report, "worker_id", None))
+
+    # ----------------------------------------------------------------------
+    def pytest_sessionfinish(self, session):  # pylint: disable=unused-argument
+        # Tests that were collected but not run because the session stopped early ('--exitfirst',
+        # '--maxfail', or an interruption); a test that started but didn't complete isn't included.
+        for nodeid in self._not_run:
+            if nodeid not in self._pending:
+                self._Write(nodeid, NOT_RUN_OUTCOME, 0.0, None)
+
+        self._not_run.clear()
+
+    # ----------------------------------------------------------------------
+    def pytest_unconfigure(self, config):  # pylint: disable=unused-argument
+        self._file.close()
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _Write(
+        self,
+        nodeid: str,
+        outcome: str,
+        duration: float,
+        worker_id: Optional[str],
+    ) -> None:
+        self._file.write(
+            "{}\n".format(
+                json.dumps(
+                    {
+                        "nodeid": nodeid,
+                        "outcome": outcome,
+                        "duration": duration,
+                        "worker": worker_id,
+                    },
+                ),
+            ),
+        )
+
+        # Flush so that the results are available even if the process is terminated
+        self._file.flush()
+
+
+# ----------------------------------------------------------------------
+class _BenchmarkSourceLines(object):
+    """Adds the line number of each benchmark's test function to pytest-benchmark's JSON content (as 'source_line')."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self._source_lines: Dict[str, int]  = {}
+
+    # ----------------------------------------------------------------------
+    def pytest_collection_modifyitems(self, items):
+        for item in items:
+            function = getattr(item, "function", None)
+            if function is None:
+                continue
+
+            code = getattr(inspect.unwrap(function), "__code__", None)
+            if code is None:
+                continue
+
+            self._source_lines[item.nodeid] = code.co_firstlineno
+
+    # ----------------------------------------------------------------------
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_benchmark_update_json(self, output_json):
+        for benchmark in output_json["benchmarks"]:
+            source_line = self._source_lines.get(benchmark["fullname"], None)
+            if source_line is not None:
+                benchmark["source_line"] = source_line
+
+
+# ----------------------------------------------------------------------
+class _BenchmarkStabilizer(object):
+    """Adds the noise level of each benchmark's rounds and the stabilization settings to pytest-benchmark's JSON content."""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        cpus: Optional[List[int]],
+    ):
+        self._cpus                          = cpus
+        self._noise_percentages: Dict[str, float]       = {}
+
+    # ----------------------------------------------------------------------
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_benchmark_update_json(self, output_json):
+        for benchmark in output_json["benchmarks"]:
+            stats = benchmark["stats"]
+
+            # The rounds were run in the same process with the same settings, so their spread is the
+            # noise that this benchmark is subject to (unlike a separate reference workload, whose
+            # noise may be very different).
+            if stats["median"] > 0:
+                noise_percentage = 100.0 * stats["iqr"] / stats["median"]
+
+                benchmark[NOISE_PERCENTAGE_JSON_KEY] = noise_percentage
+                self._noise_percentages[benchmark["name"]] = noise_percentage
+
+        output_json["machine_info"][STABLE_JSON_KEY] = True
+        output_json["machine_info"]["tester_cpus"] = self._cpus
+        output_json["machine_info"]["tester_hash_seed"] = os.environ.get("PYTHONHASHSEED")
+
+    # ----------------------------------------------------------------------
+    def pytest_terminal_summary(self, terminalreporter):
+        if terminalreporter.verbosity <= 0:
+            return
+
+        hash_seed = os.environ.get("PYTHONHASHSEED")
+
+        terminalreporter.section("benchmark stability")
+
+        for name, noise_percentage in self._noise_percentages.items():
+            terminalreporter.write_line("noise: {:.1f}% ({})".format(noise_percentage, name))
+
+        terminalreporter.write_line("cpus: {}".format("not pinned" if self._cpus is None else ", ".join(str(cpu) for cpu in self._cpus)))
+        terminalreporter.write_line(
+            "PYTHONHASHSEED: {}".format(
+                hash_seed if hash_seed and hash_seed != "random" else "random (set PYTHONHASHSEED to a fixed value to make the layout of dicts and sets consistent across runs)",
+            ),
+        )
+
+
+# ----------------------------------------------------------------------
+class _MemoryBenchmarksWriter(object):
+    """Writes a JSON line for each metric of each memory benchmark."""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        filename: Path,
+    ):
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        self._filename                      = filename
+        self._results: List[Tuple[str, Dict[str, Dict[str, float]]]]    = []
+
+    # ----------------------------------------------------------------------
+    def Write(
+        self,
+        item,
+        benchmark: MemoryBenchmark,
+    ) -> None:
+        statistics_by_metric = benchmark.GetStatistics()
+
+        source_line = 1
+
+        function = getattr(item, "function", None)
+        if function is not None:
+            code = getattr(inspect.unwrap(function), "__code__", None)
+            if code is not None:
+                source_line = code.co_firstlineno
+
+        # pytest-xdist workers append to the same file, so write each benchmark with a single call
+        content = "".join(
+            "{}\n".format(
+                json.dumps(
+                    {
+                        "name": item.name,
+                        "fullname": item.nodeid,
+                        "metric": metric,
+                        "source_line": source_line,
+                        "python_version": platform.python_version(),
+                        "stats": stats,
+                    },
+                ),
+            )
+            for metric, stats in statistics_by_metric.items()
+        )
+
+        with self._filename.open("a", encoding="utf-8") as f:
+            f.write(content)
+
+        self._results.append((item.name, statistics_by_metric))
+
+    # ----------------------------------------------------------------------
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self._results or terminalreporter.verbosity <= 0:
+            return
+
+        terminalreporter.section("memory benchmarks (median)")
+
+        for name, statistics_by_metric in self._results:
+            terminalreporter.write_line(
+                "{}: {:,.0f} bytes peak, {:,.0f} bytes retained, {:,.0f} blocks".format(
+                    name,
+                    statistics_by_metric["peak_bytes"]["median"],
+                    statistics_by_metric["retained_bytes"]["median"],
+                    statistics_by_metric["allocated_blocks"]["median"],
+                ),
+            )
+
+
+# ----------------------------------------------------------------------
+class _SlowTestProfiler(object):
+    """\
+    Runs tests that are slower than the threshold again while profiling them with cProfile and a
+    sampling profiler. A test is run again immediately after it has passed, before its fixtures are
+    torn down; the time spent profiling isn't included in the duration reported for the test.
+    """
+
+    # Tests that record the results of their measurements would record them again
+    _UNPROFILED_FIXTURES                    = set(["benchmark", "memory_benchmark"])
+
+    _SAMPLE_INTERVAL                        = 0.001     # Seconds
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        threshold: float,
+        output_dir: Path,
+    ):
+        self._threshold                     = threshold
+        self._output_dir                    = output_dir
+
+        # Time spent profiling each test, which is removed from the duration of its call phase
+        self._profile_durations: Dict[str, float]       = {}
+
+    # ----------------------------------------------------------------------
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        start_time = time.perf_counter()
+
+        outcome = yield
+
+        # The results of a test that failed (or was skipped while running) don't represent its
+        # typical performance.
+        if (
+            outcome.excinfo is not None
+            or time.perf_counter() - start_time < self._threshold
+            or item.session.shouldfail
+            or item.session.shouldstop
+            or self.__class__._UNPROFILED_FIXTURES.intersection(getattr(item, "fixturenames", []))  # pylint: disable=protected-access
+        ):
+            return
+
+        start_time = time.perf_counter()
+
+        self._Profile(item)
+
+        self._profile_durations[item.nodeid] = time.perf_counter() - start_time
+
+    # ----------------------------------------------------------------------
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+
+        if call.when != "call":
+            return
+
+        profile_duration = self._profile_durations.pop(item.nodeid, None)
+        if profile_duration is not None:
+            report = outcome.get_result()
+            report.duration = max(0.0, report.duration - profile_duration)
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _Profile(self, item) -> None:
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+
+        base_filename = self._output_dir / re.sub(r"[^\w\-.]+", "_", item.nodeid.partition("::")[2] or item.name).strip("_")
+
+        # Restart the timeout (if any) so that the profiled run has as much time as the test itself
+        timeout = item.config.getoption("tester_test_timeout")
+        if timeout:
+            faulthandler.dump_traceback_later(timeout, exit=True, file=sys.__stderr__)
+
+        samples: Counter = Counter()
+        sampler = _StackSampler(threading.get_ident(), self.__class__._SAMPLE_INTERVAL, samples)  # pylint: disable=protected-access
+
+        profile = cProfile.Profile()
+
+        _WriteMarker(PROFILE_START_MARKER_TEMPLATE.format(nodeid=item.nodeid))
+
+        sampler.start()
+        try:
+            profile.enable()
+            try:
+                item.runtest()
+            except Exception:  # pylint: disable=broad-except
+                # The test's original results are reported
+                pass
+            finally:
+                profile.disable()
+        finally:
+            sampler.Stop()
+
+            # The teardown of the test is covered by the timeout as well
+            if timeout:
+                faulthandler.dump_traceback_later(timeout, exit=True, file=sys.__stderr__)
+
+        _WriteMarker(PROFILE_END_MARKER_TEMPLATE.format(nodeid=item.nodeid))
+
+        profile.dump_stats(str(base_filename) + PROFILE_STATS_SUFFIX)
+
+        with open(str(base_filename) + PROFILE_COLLAPSED_STACKS_SUFFIX, "w", encoding="utf-8") as f:
+            for stack, count in sorted(samples.items()):
+                f.write("{} {}\n".format(";".join(stack), count))
+
+
+# ----------------------------------------------------------------------
+class _StackSampler(threading.Thread):
+    """Periodically records the stack of a thread as collapsed stacks ('outer;...;inner')."""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        thread_id: int,
+        interval: float,
+        samples: Counter,
+    ):
+        super(_StackSampler, self).__init__(daemon=True)
+
+        self._thread_id                     = thread_id
+        self._interval                      = interval
+        self._samples                       = samples
+
+        self._stop_event                    = threading.Event()
+
+    # ----------------------------------------------------------------------
+    def Stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    # ----------------------------------------------------------------------
+    def run(self):
+        while not self._stop_event.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id, None)  # pylint: disable=protected-access
+
+            stack: List[str] = []
+
+            while frame is not None:
+                code = frame.f_code
+
+                stack.append("{} ({}:{})".format(code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+                frame = frame.f_back
+
+            if stack:
+                self._samples[tuple(reversed(stack))] += 1
+
+
+# ----------------------------------------------------------------------
+class _DurationsRecorder(object):
+    """Records the duration of each test in pytest's cache so that it is available to future runs."""
+
+    # Weight given to the latest duration when combining it with the recorded duration
+    _LATEST_WEIGHT                          = 0.5
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        is_sharded: bool,
+    ):
+        self._is_sharded                    = is_sharded
+        self._durations: Dict[str, float]   = {}
+
+    # ----------------------------------------------------------------------
+    def pytest_runtest_logreport(self, report):
+        nodeid = _GetNodeId(report.nodeid, self._is_sharded)
+
+        self._durations[nodeid] = self._durations.get(nodeid, 0.0) + report.duration
+
+    # ----------------------------------------------------------------------
+    def pytest_sessionfinish(self, session):
+        # The cache isn't available when the cacheprovider plugin has been disabled
+        cache = getattr(session.config, "cache", None)
+        if cache is None or not self._durations:
+            return
+
+        durations_by_file: Dict[str, Dict[str, float]] = {}
+
+        for nodeid, duration in self._durations.items():
+            durations_by_file.setdefault(nodeid.partition("::")[0], {})[nodeid] = duration
+
+        for relative_filename, durations in durations_by_file.items():
+            key = DURATIONS_CACHE_KEY_PREFIX + relative_filename
+
+            recorded_durations = cache.get(key, {})
+
+            for nodeid, duration in durations.items():
+                recorded_duration = recorded_durations.get(nodeid, None)
+                if recorded_duration is not None:
+                    duration = self.__class__._LATEST_WEIGHT * duration + (1.0 - self.__class__._LATEST_WEIGHT) * recorded_duration  # pylint: disable=protected-access
+
+                recorded_durations[nodeid] = duration
+
+            cache.set(key, recorded_durations)
+
+
+# ----------------------------------------------------------------------
+class _Sharder(object):
+    """\
+    Assigns each test to one of `num_shards` pytest-xdist groups, longest expected duration first,
+    always choosing the group with the smallest total expected duration.
+    """
+
+    # Expected duration of a test when no tests have recorded durations
+    _DEFAULT_DURATION                       = 1.0
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        num_shards: int,
+    ):
+        self._num_shards                    = num_shards
+
+    # ----------------------------------------------------------------------
+    # This must run before pytest-xdist adds the group names to the node ids
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, config, items):
+        cache = getattr(config, "cache", None)
+
+        recorded_durations: Dict[str, float] = {}
+
+        if cache is not None:
+            for relative_filename in set(item.nodeid.partition("::")[0] for item in items):
+                recorded_durations.update(cache.get(DURATIONS_CACHE_KEY_PREFIX + relative_filename, {}))
+
+        durations: List[Tuple[float, int]] = []
+
+        for index, item in enumerate(items):
+            duration = recorded_durations.get(item.nodeid, None)
+            if duration is not None:
+                durations.append((duration, index))
+
+        # Tests without recorded durations (new tests) are expected to take as long as the average test
+        default_duration = (
+            statistics.mean(duration for duration, _ in durations)
+            if durations
+            else self.__class__._DEFAULT_DURATION  # pylint: disable=protected-access
+        )
+
+        durations_lookup = dict((index, duration) for duration, index in durations)
+
+        # Sort by duration (longest first), using the index as the tie breaker so that every
+        # worker creates the same shards.
+        ordered_items = sorted(
+            ((durations_lookup.get(index, default_duration), index) for index in range(len(items))),
+            key=lambda value: (-value[0], value[1]),
+        )
+
+        shards: List[Tuple[float, int]] = [(0.0, shard_index) for shard_index in range(self._num_shards)]
+
+        for duration, index in ordered_items:
+            total_duration, shard_index = heapq.heappop(shards)
+
+            items[index].add_marker(pytest.mark.xdist_group(name="{}{}".format(SHARD_GROUP_PREFIX, shard_index)))
+
+            heapq.heappush(shards, (total_duration + duration, shard_index))
+
+
+# ----------------------------------------------------------------------
+class _WorkerUtilizationReporter(object):
+    """Writes the number of tests run by each pytest-xdist worker and the time that it spent running them."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self._start_time                    = time.perf_counter()
+        self._workers: Dict[str, Tuple[int, float]]     = {}
+
+    # ----------------------------------------------------------------------
+    def pytest_runtest_logreport(self, report):
+        worker_id = getattr(report, "worker_id", None)
+        if worker_id is None:
+            return
+
+        num_tests, busy_seconds = self._workers.get(worker_id, (0, 0.0))
+
+        if report.when == "teardown":
+            num_tests += 1
+
+        self._workers[worker_id] = (num_tests, busy_seconds + report.duration)
+
+    # ----------------------------------------------------------------------
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self._workers or terminalreporter.verbosity <= 0:
+            return
+
+        elapsed_seconds = time.perf_counter() - self._start_time
+
+        terminalreporter.section("worker utilization")
+
+        # Sort so that "gw10" comes after "gw9"
+        for worker_id in sorted(self._workers, key=lambda value: (len(value), value)):
+            num_tests, busy_seconds = self._workers[worker_id]
+
+            terminalreporter.write_line(
+                "{}: {} test{}, {:.2f}s busy ({:.1f}%)".format(
+                    worker_id,
+                    num_tests,
+                    "" if num_tests == 1 else "s",
+                    busy_seconds,
+                    100.0 * busy_seconds / elapsed_seconds if elapsed_seconds else 0.0,
+                ),
+            )
+
+
+# ----------------------------------------------------------------------
+def _PinToStableCpus() -> Optional[List[int]]:
+    """Pins the process to the isolated CPUs (or the last available CPU if no CPUs are isolated); returns the CPUs or None if the process can't be pinned."""
+
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+
+    available_cpus = os.sched_getaffinity(0)
+
+    isolated_cpus: Set[int] = set()
+
+    try:
+        with open("/sys/devices/system/cpu/isolated") as f:
+            for cpu_range in f.read().strip().split(","):
+                if not cpu_range:
+                    continue
+
+                first, _, last = cpu_range.partition("-")
+                isolated_cpus.update(range(int(first), int(last or first) + 1))
+    except OSError:
+        pass
+
+    # CPU 0 typically handles the most interrupts, so prefer the last CPU
+    cpus = sorted(isolated_cpus & available_cpus) or [max(available_cpus), ]
+
+    try:
+        os.sched_setaffinity(0, cpus)
+    except OSError:
+        return None
+
+    return cpus
+
+
+# ----------------------------------------------------------------------
+def _GetNodeId(
+    nodeid: str,
+    is_sharded: bool,
+) -> str:
+    if not is_sharded:
+        return nodeid
+
+    # Remove the group name added by pytest-xdist
+    result, sep, _ = nodeid.rpartition("@")
+    if not sep:
+        return nodeid
+
+    return result
+
+
+# ----------------------------------------------------------------------
+def _WriteMarker(
+    marker: str,
+) -> None:
+    """Writes a marker to the stream used by faulthandler, after any pending output"""
+
+    sys.stdout.flush()
+
+    sys.__stderr__.write(marker)
+    sys.__stderr__.flush()
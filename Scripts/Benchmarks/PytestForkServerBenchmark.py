@@ -0,0 +1,189 @@
+# ----------------------------------------------------------------------
+# |
+# |  PytestForkServerBenchmark.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:21:22
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Compares the time required to run a test file with:
+
+    pytest:             pytest invoked normally
+    fork server:        pytest run by PytestForkServer
+    fork server +       pytest run by PytestForkServer, where the server has preloaded the modules
+      preloading        imported by the test file
+
+The first run of each fork server mode starts the server and is displayed separately; the servers
+are started in a temporary directory and stopped once the benchmark is complete.
+"""
+
+import os
+import signal
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "TesterPlugins" / "Impl"))
+try:
+    import PytestForkServer  # pylint: disable=import-error
+finally:
+    sys.path.pop(0)
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    no_args_is_help=False,
+    pretty_exceptions_show_locals=False,
+)
+
+
+# ----------------------------------------------------------------------
+@app.command()
+def Execute(
+    runs: int=typer.Option(15, "--runs", min=2, help="Number of times that the test file is run in each mode."),
+    modules: List[str]=typer.Option(
+        ["asyncio", "decimal", "email.mime.multipart", "http.server", "sqlite3", "unittest.mock", "xml.dom.minidom"],
+        "--module",
+        help="Module imported by the test file (and preloaded by the server).",
+    ),
+) -> None:
+    """Displays the time required to run a test file with pytest and with the fork server."""
+
+    if sys.platform == "darwin" or not hasattr(os, "fork"):
+        print("The fork server isn't used on this platform.")
+        raise typer.Exit(-1)
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        temp_path = Path(temp_directory)
+
+        test_filename = temp_path / "test_Benchmark.py"
+
+        with test_filename.open("w") as f:
+            f.write(
+                textwrap.dedent(
+                    """\
+                    {}
+
+
+                    def test_Value():
+                        assert True
+                    """,
+                ).format("\n".join("import {}".format(module) for module in modules)),
+            )
+
+        # Start new servers in a private directory rather than using servers that are already running
+        runtime_dir = temp_path / "runtime"
+        runtime_dir.mkdir(mode=0o700)
+
+        env = dict(os.environ)
+        env["XDG_RUNTIME_DIR"] = str(runtime_dir)
+
+        pytest_command_line = 'pytest -q "{}"'.format(test_filename)
+
+        try:
+            print("{:<26} {:>10} {:>10} {:>10}".format("mode", "first", "median", "min"))
+
+            for desc, command_line in [
+                ("pytest", pytest_command_line),
+                ("fork server", PytestForkServer.CreateCommandLine(pytest_command_line, [])),
+                ("fork server + preloading", PytestForkServer.CreateCommandLine(pytest_command_line, modules)),
+            ]:
+                times = [_Run(command_line, env, temp_path) for _ in range(runs)]
+
+                # The median and minimum don't include the first run, which starts the server
+                print(
+                    "{:<26} {:>9.3f}s {:>9.3f}s {:>9.3f}s".format(
+                        desc,
+                        times[0],
+                        statistics.median(times[1:]),
+                        min(times[1:]),
+                    ),
+                )
+
+        finally:
+            _StopServers(runtime_dir)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Run(
+    command_line: str,
+    env: dict,
+    cwd: Path,
+) -> float:
+    start = time.perf_counter()
+
+    result = subprocess.run(
+        command_line,
+        shell=True,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        check=False,
+    )
+
+    elapsed = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise Exception("'{}' failed:\n\n{}".format(command_line, result.stdout.decode("utf-8", errors="replace")))
+
+    return elapsed
+
+
+# ----------------------------------------------------------------------
+def _StopServers(
+    runtime_dir: Path,
+) -> None:
+    for socket_filename in runtime_dir.rglob("*.sock"):
+        pid = _GetServerPid(socket_filename)
+        if pid is not None:
+            os.kill(pid, signal.SIGTERM)
+
+
+# ----------------------------------------------------------------------
+def _GetServerPid(
+    socket_filename: Path,
+) -> Optional[int]:
+    peer_cred = getattr(socket, "SO_PEERCRED", None)
+    if peer_cred is None:
+        print("The server listening on '{}' can't be stopped on this platform.".format(socket_filename))
+        return None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:  # pylint: disable=no-member
+        try:
+            connection.connect(str(socket_filename))
+        except OSError:
+            return None
+
+        credentials = struct.Struct("3i")
+
+        pid, _, _ = credentials.unpack(connection.getsockopt(socket.SOL_SOCKET, peer_cred, credentials.size))
+
+        return pid
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
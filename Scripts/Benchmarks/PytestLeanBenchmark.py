@@ -0,0 +1,129 @@
+# ----------------------------------------------------------------------
+# |
+# |  PytestLeanBenchmark.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:53:16
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Compares the time required to run a test file with:
+
+    pytest:             pytest invoked normally, loading every plugin registered by the installed
+                        distributions
+    lean:               pytest invoked with '--disable-plugin-autoload', loading only the plugins
+                        provided on the command line (as with 'pytest_lean' in PytestTestParser)
+
+The difference is the cost of importing and registering the plugins that aren't used by the tests,
+which is paid by every test file.
+"""
+
+import importlib.metadata
+import importlib.util
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+from pathlib import Path
+from typing import List
+
+import typer
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    no_args_is_help=False,
+    pretty_exceptions_show_locals=False,
+)
+
+
+# ----------------------------------------------------------------------
+@app.command()
+def Execute(
+    runs: int=typer.Option(15, "--runs", min=1, help="Number of times that the test file is run in each mode."),
+    plugins: List[str]=typer.Option(
+        ["pytest_asyncio.plugin", "pytest_benchmark.plugin", "pytest_cov.plugin", "pyfakefs.pytest_plugin"],
+        "--plugin",
+        help="Plugin module loaded in the lean mode (when installed).",
+    ),
+) -> None:
+    """Displays the time required to run a test file with and without the plugins registered by installed distributions."""
+
+    registered_plugins = sorted(
+        set(entry_point.value.partition(":")[0] for entry_point in importlib.metadata.entry_points(group="pytest11")),
+    )
+
+    plugins = [plugin for plugin in plugins if importlib.util.find_spec(plugin.partition(".")[0]) is not None]
+
+    print("Registered plugins: {}".format(", ".join(registered_plugins) or "<none>"))
+    print("Lean plugins:       {}".format(", ".join(plugins) or "<none>"))
+    print("")
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        temp_path = Path(temp_directory)
+
+        test_filename = temp_path / "test_Benchmark.py"
+
+        with test_filename.open("w") as f:
+            f.write(
+                textwrap.dedent(
+                    """\
+                    def test_Value():
+                        assert True
+                    """,
+                ),
+            )
+
+        pytest_args = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", str(test_filename)]
+
+        print("{:<10} {:>10} {:>10}".format("mode", "median", "min"))
+
+        for desc, args in [
+            ("pytest", pytest_args),
+            ("lean", pytest_args[:3] + ["--disable-plugin-autoload"] + [arg for plugin in plugins for arg in ["-p", plugin]] + pytest_args[3:]),
+        ]:
+            times = [_Run(args, temp_path) for _ in range(runs)]
+
+            print("{:<10} {:>9.3f}s {:>9.3f}s".format(desc, statistics.median(times), min(times)))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Run(
+    args: List[str],
+    cwd: Path,
+) -> float:
+    start = time.perf_counter()
+
+    result = subprocess.run(
+        args,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        check=False,
+    )
+
+    elapsed = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise Exception("'{}' failed:\n\n{}".format(" ".join(args), result.stdout.decode("utf-8", errors="replace")))
+
+    return elapsed
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,255 @@
+# ----------------------------------------------------------------------
+# |
+# |  PytestOutputBenchmark.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:20:42
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Compares the time required to extract test results from verbose pytest output using:
+
+    regex:      The multi-line regex used before PytestOutput.VerboseOutputParser
+    lines:      VerboseOutputParser.ProcessLine, invoked for each line
+    parse:      VerboseOutputParser.Parse
+
+for output where every test passes, output where some tests fail (pytest lists the failed tests at
+the end of the output), and output where a test never reports a result (an interrupted run). Output
+with test names that aren't followed by a result is quadratic for the regex. The results of each
+approach are compared for every generated log.
+"""
+
+import io
+import mmap
+import random
+import re
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import typer
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "TesterPlugins" / "Impl"))
+try:
+    import PytestOutput  # pylint: disable=import-error
+finally:
+    sys.path.pop(0)
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    no_args_is_help=False,
+    pretty_exceptions_show_locals=False,
+)
+
+
+# ----------------------------------------------------------------------
+@app.command()
+def Execute(
+    sizes: List[int]=typer.Option([1000, 10000, 100000], "--size", min=1, help="Number of tests in the generated output."),
+    iterations: int=typer.Option(3, "--iterations", min=1, help="Number of times that each approach is run; the fastest time is displayed."),
+    max_regex_tests: int=typer.Option(10000, "--max-regex-tests", min=0, help="Largest failing or interrupted output parsed with the regex (which is quadratic for that output)."),
+    seed: int=typer.Option(0, "--seed", help="Random seed used to generate the output."),
+) -> None:
+    """Displays the time required to parse generated verbose pytest output."""
+
+    print("{:<12} {:>8} {:>10}   {:>9} {:>9} {:>9} {:>9}".format("output", "tests", "lines", "regex", "lines", "parse", "parse mm"))
+
+    for scenario in ["passing", "failing", "interrupted"]:
+        for size in sizes:
+            content = _GenerateOutput(random.Random(seed), size, scenario)
+
+            expected: Optional[Dict[str, str]] = None
+            times: List[Optional[float]] = []
+
+            for func, use_mmap in [
+                (_ParseWithRegex, False),
+                (_ParseWithLines, False),
+                (PytestOutput.VerboseOutputParser.Parse, False),
+                (PytestOutput.VerboseOutputParser.Parse, True),
+            ]:
+                if func is _ParseWithRegex and scenario != "passing" and size > max_regex_tests:
+                    times.append(None)
+                    continue
+
+                elapsed, results = _Measure(func, content, iterations, use_mmap=use_mmap)
+
+                if expected is None:
+                    expected = results
+                elif results != expected:
+                    raise Exception("The results of '{}' don't match.".format(func.__qualname__))
+
+                times.append(elapsed)
+
+            print(
+                "{:<12} {:>8} {:>10}   {}".format(
+                    scenario,
+                    size,
+                    content.count("\n"),
+                    " ".join("{:>8.3f}s".format(value) if value is not None else "{:>9}".format("-") for value in times),
+                ),
+            )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# The regex replaced by VerboseOutputParser
+_regex                                      = re.compile(
+    r"""(?#
+    Start of line                           )^(?#
+    Filename                                )(?P<filename>.+\.py)(?#
+    Sep                                     )::(?#
+    Test                                    )(?P<test>\S+) +(?#
+    Potential multiline output              )(?:[^\n]*\n)*?(?#
+    Result                                  )(?P<result>[A-Z]+)(?#
+    "Clearing the cache"                    )(:?Clearing the cache)?(?#
+    End of line                             )$(?#
+    )""",
+    re.MULTILINE,
+)
+
+
+# ----------------------------------------------------------------------
+def _ParseWithRegex(
+    content: str,
+) -> List[Tuple[str, str]]:
+    return [(match.group("test"), match.group("result")) for match in _regex.finditer(content)]
+
+
+# ----------------------------------------------------------------------
+def _ParseWithLines(
+    content: str,
+) -> List[Tuple[str, str]]:
+    parser = PytestOutput.VerboseOutputParser()
+    results: List[Tuple[str, str]] = []
+
+    for line in io.StringIO(content):
+        results += parser.ProcessLine(line)
+
+    results += parser.Finalize()
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def _Measure(
+    func: Callable[[Union[str, mmap.mmap]], List[Tuple[str, str]]],
+    content: str,
+    iterations: int,
+    *,
+    use_mmap: bool,
+) -> Tuple[float, Dict[str, str]]:
+    best: Optional[float] = None
+    results: List[Tuple[str, str]] = []
+
+    with tempfile.TemporaryFile() as f:
+        if use_mmap:
+            f.write(content.encode("utf-8"))
+            f.flush()
+
+            input_content: Union[str, mmap.mmap] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            input_content = content
+
+        try:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                results = func(input_content)
+                elapsed = time.perf_counter() - start
+
+                if best is None or elapsed < best:
+                    best = elapsed
+        finally:
+            if isinstance(input_content, mmap.mmap):
+                input_content.close()
+
+    assert best is not None
+
+    # Later results for the same test replace earlier ones, as when they are stored by the parser
+    return best, dict(results)
+
+
+# ----------------------------------------------------------------------
+def _GenerateOutput(
+    random_generator: random.Random,
+    num_tests: int,
+    scenario: str,
+) -> str:
+    """Generates output in the form written by 'pytest --verbose -vv --capture=no'."""
+
+    sink = io.StringIO()
+
+    sink.write("============================= test session starts ==============================\n")
+    sink.write("platform linux -- Python 3.11.7, pytest-7.1.2, pluggy-1.0.0 -- /usr/bin/python\n")
+    sink.write("collecting ... collected {} items\n\n".format(num_tests))
+
+    failures: List[str] = []
+
+    for index in range(num_tests):
+        test_name = "test_Function{}[param{}]".format(index, index % 7)
+
+        # Most tests don't write any output
+        num_output_lines = 0 if random_generator.random() < 0.8 else random_generator.randint(1, 5)
+
+        # The last test in interrupted output never completes; it writes the names of the items that
+        # it is processing (without results) until the process is terminated.
+        if scenario == "interrupted" and index == num_tests // 2:
+            sink.write("src/Package/UnitTests/Module_UnitTest.py::{} \n".format(test_name))
+
+            for output_index in range(num_tests - index):
+                sink.write("src/Package/Items/Item{}.py::Process started\n".format(output_index))
+
+            break
+
+        if scenario == "passing":
+            result = "PASSED"
+        else:
+            result = random_generator.choice(["PASSED"] * 17 + ["FAILED", "SKIPPED", "XFAIL"])
+
+        sink.write("src/Package/UnitTests/Module_UnitTest.py::{} ".format(test_name))
+
+        if num_output_lines:
+            sink.write("\n")
+
+            for output_index in range(num_output_lines):
+                sink.write("output line {} written by the test with some additional content\n".format(output_index))
+
+        sink.write("{}\n".format(result))
+
+        if result == "FAILED":
+            failures.append(test_name)
+
+    if scenario != "interrupted":
+        sink.write("\n=================================== FAILURES ===================================\n")
+
+        for failure in failures:
+            sink.write("____________________________________ {} ____________________________________\n\n".format(failure))
+            sink.write("    def {}():\n>       assert 0\nE       assert 0\n\n".format(failure))
+            sink.write("src/Package/UnitTests/Module_UnitTest.py:42: AssertionError\n")
+
+        sink.write("=========================== short test summary info ============================\n")
+
+        for failure in failures:
+            sink.write("FAILED src/Package/UnitTests/Module_UnitTest.py::{} - assert 0\n".format(failure))
+
+        sink.write("======================== {} failed, {} passed in 1.23s =========================\n".format(len(failures), num_tests - len(failures)))
+
+    return sink.getvalue()
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
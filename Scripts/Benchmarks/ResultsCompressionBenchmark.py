@@ -0,0 +1,182 @@
+# ----------------------------------------------------------------------
+# |
+# |  ResultsCompressionBenchmark.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:28:05
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Compares the size of a large results file and the time required to write and read it when it is:
+
+    plain:      not compressed
+    gzip:       compressed with gzip
+    zstd:       compressed with zstd (when the 'zstandard' package is installed)
+
+The file is written with TestHelpers._WriteLooseResults (as when results are overwritten) and read
+with ResultsFromFile and CompareResultsFromFile (with and without `hash_first`) from a test function
+in a generated test file. Reads are measured with a warm page cache.
+"""
+
+import random
+import tempfile
+import textwrap
+import time
+
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import typer
+
+from Common_PythonDevelopment import ResultsCompression
+from Common_PythonDevelopment import TestHelpers
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    no_args_is_help=False,
+    pretty_exceptions_show_locals=False,
+)
+
+
+# ----------------------------------------------------------------------
+@app.command()
+def Execute(
+    lines: int=typer.Option(250000, "--lines", min=1, help="Number of lines in the generated results."),
+    iterations: int=typer.Option(5, "--iterations", min=1, help="Number of times that each operation is run; the fastest time is displayed."),
+    seed: int=typer.Option(0, "--seed", help="Random seed used to generate the results."),
+) -> None:
+    """Displays the size of a compressed results file and the time required to write and read it."""
+
+    results = _GenerateResults(random.Random(seed), lines)
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        temp_path = Path(temp_directory)
+
+        test_filename = temp_path / "Benchmark_UnitTest.py"
+
+        with test_filename.open("w") as f:
+            f.write(
+                textwrap.dedent(
+                    """\
+                    def test_Results(func):
+                        return func()
+                    """,
+                ),
+            )
+
+        test_module: dict = {}
+        exec(compile(test_filename.read_text(), str(test_filename), "exec"), test_module)  # pylint: disable=exec-used
+
+        test_func = test_module["test_Results"]
+
+        results_filename = temp_path / TestHelpers.DEFAULT_SUBDIR / "Benchmark_UnitTest.test_Results.txt"
+
+        print("{} bytes, {} lines\n".format(len(results.encode("utf-8")), lines))
+        print("{:<8} {:>12} {:>9}   {:>9} {:>16} {:>9} {:>11}".format("format", "size", "ratio", "write", "ResultsFromFile", "compare", "hash_first"))
+
+        plain_size: Optional[int] = None
+
+        for desc, extension in [
+            ("plain", None),
+            ("gzip", ResultsCompression.GZIP_EXTENSION),
+            ("zstd", ResultsCompression.ZSTD_EXTENSION),
+        ]:
+            if extension is not None and extension not in ResultsCompression.EXTENSIONS:
+                print("{:<8} (the '{}' format can't be written in this environment)".format(desc, extension))
+                continue
+
+            # The call stack offset is 1 (the lambda invoked by the test function)
+            write_time = _Measure(
+                lambda: TestHelpers._WriteLooseResults(results_filename, results, extension),  # pylint: disable=protected-access, cell-var-from-loop
+                iterations,
+            )
+
+            output_filename = ResultsCompression.FindFile(results_filename)
+            assert output_filename is not None
+            assert ResultsCompression.GetExtension(output_filename) == extension, output_filename
+
+            if test_func(lambda: TestHelpers.ResultsFromFile(call_stack_offset=1)) != results:
+                raise Exception("The results read from '{}' don't match.".format(output_filename))
+
+            size = output_filename.stat().st_size
+
+            if plain_size is None:
+                plain_size = size
+
+            print(
+                "{:<8} {:>12,} {:>8.1f}x   {:>8.3f}s {:>15.3f}s {:>8.3f}s {:>10.3f}s".format(
+                    desc,
+                    size,
+                    plain_size / size,
+                    write_time,
+                    _Measure(lambda: test_func(lambda: TestHelpers.ResultsFromFile(call_stack_offset=1)), iterations),
+                    _Measure(lambda: test_func(lambda: TestHelpers.CompareResultsFromFile(results, call_stack_offset=1)), iterations),
+                    _Measure(lambda: test_func(lambda: TestHelpers.CompareResultsFromFile(results, call_stack_offset=1, hash_first=True)), iterations),
+                ),
+            )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Measure(
+    func: Callable[[], object],
+    iterations: int,
+) -> float:
+    best: Optional[float] = None
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    assert best is not None
+    return best
+
+
+# ----------------------------------------------------------------------
+def _GenerateResults(
+    random_generator: random.Random,
+    num_lines: int,
+) -> str:
+    """Generates rendered output in the form of indented JSON-like content"""
+
+    names = ["id", "name", "description", "value", "children", "timestamp", "enabled", "path"]
+    words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa"]
+
+    output: List[str] = []
+
+    for _ in range(num_lines):
+        name = random_generator.choice(names)
+        indent = "    " * random_generator.randint(1, 6)
+
+        if name in ["id", "value", "timestamp"]:
+            value = str(random_generator.randint(0, 10000000))
+        elif name == "enabled":
+            value = random_generator.choice(["true", "false"])
+        elif name == "path":
+            value = '"/src/{}.py"'.format("/".join(random_generator.choices(words, k=3)))
+        else:
+            value = '"{}"'.format(" ".join(random_generator.choices(words, k=random_generator.randint(1, 8))))
+
+        output.append('{}"{}": {},\n'.format(indent, name, value))
+
+    return "".join(output)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,214 @@
+# ----------------------------------------------------------------------
+# |
+# |  ResultsFilenameBenchmark.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:28:04
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Compares the time required to create a results filename (see TestHelpers.ResultsFromFile) using:
+
+    inspect:    inspect.getouterframes, as used before TestHelpers looked up the caller's frame directly
+    getframe:   TestHelpers._GetResultsFilename, which uses sys._getframe
+
+The functions are called from a test function in a generated test file, where the test function
+is invoked at different stack depths (getouterframes creates a FrameInfo object for every frame on
+the stack). ResultsFromFile is also measured with a results file that exists. The filenames and
+results created by each approach are compared.
+"""
+
+import inspect
+import tempfile
+import textwrap
+import time
+
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import typer
+
+from Common_PythonDevelopment import TestHelpers
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    no_args_is_help=False,
+    pretty_exceptions_show_locals=False,
+)
+
+
+# ----------------------------------------------------------------------
+@app.command()
+def Execute(
+    depths: List[int]=typer.Option([0, 40], "--depth", min=0, help="Number of frames on the stack below the test function."),
+    calls: int=typer.Option(2000, "--calls", min=1, help="Number of calls in each measurement."),
+    iterations: int=typer.Option(5, "--iterations", min=1, help="Number of measurements; the fastest is displayed."),
+) -> None:
+    """Displays the time required to create results filenames."""
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        temp_path = Path(temp_directory)
+
+        test_filename = temp_path / "Benchmark_UnitTest.py"
+
+        with test_filename.open("w") as f:
+            f.write(
+                textwrap.dedent(
+                    """\
+                    def Invoke(depth, test_func, func):
+                        if depth == 0:
+                            return test_func(func)
+
+                        return Invoke(depth - 1, test_func, func)
+
+
+                    def test_Function(func):
+                        return func()
+
+
+                    class TestClass(object):
+                        def test_Method(self, func):
+                            return func()
+                    """,
+                ),
+            )
+
+        test_module: dict = {}
+        exec(compile(test_filename.read_text(), str(test_filename), "exec"), test_module)  # pylint: disable=exec-used
+
+        results_filename = temp_path / TestHelpers.DEFAULT_SUBDIR / "Benchmark_UnitTest.test_Function.txt"
+
+        results_filename.parent.mkdir()
+        results_filename.write_text("The expected results\n")
+
+        # Each approach is invoked by the test function, so the call stack offset is 1 (the lambda)
+        approaches = [
+            (
+                "_GetResultsFilename",
+                test_module["test_Function"],
+                lambda: _GetResultsFilenameWithInspect(1),
+                lambda: _GetResultsFilename(1),
+            ),
+            (
+                "_GetResultsFilename (method)",
+                test_module["TestClass"]().test_Method,
+                lambda: _GetResultsFilenameWithInspect(1),
+                lambda: _GetResultsFilename(1),
+            ),
+            (
+                "ResultsFromFile",
+                test_module["test_Function"],
+                lambda: _ResultsFromFileWithInspect(1),
+                lambda: TestHelpers.ResultsFromFile(call_stack_offset=1),
+            ),
+        ]
+
+        print("{:<30} {:>6}   {:>10} {:>10}".format("function", "depth", "inspect", "getframe"))
+
+        for desc, test_func, inspect_func, getframe_func in approaches:
+            for depth in depths:
+                expected = test_module["Invoke"](depth, test_func, inspect_func)
+
+                if test_module["Invoke"](depth, test_func, getframe_func) != expected:
+                    raise Exception("The results of '{}' don't match.".format(desc))
+
+                print(
+                    "{:<30} {:>6}   {:>8.1f}us {:>8.1f}us".format(
+                        desc,
+                        depth,
+                        _Measure(lambda: test_module["Invoke"](depth, test_func, inspect_func), calls, iterations),  # pylint: disable=cell-var-from-loop
+                        _Measure(lambda: test_module["Invoke"](depth, test_func, getframe_func), calls, iterations),  # pylint: disable=cell-var-from-loop
+                    ),
+                )
+
+        if not results_filename.is_file():
+            raise Exception("'{}' was removed.".format(results_filename))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetResultsFilename(
+    call_stack_offset: int,
+) -> Path:
+    return TestHelpers._GetResultsFilename(  # pylint: disable=protected-access
+        TestHelpers.DEFAULT_SUFFIX,
+        TestHelpers.DEFAULT_SUBDIR,
+        TestHelpers.DEFAULT_FILE_EXTENSION,
+        call_stack_offset + 1,
+        None,
+        None,
+        results_filename_format=TestHelpers.ResultsFilenameFormat.Version1,
+    )
+
+
+# ----------------------------------------------------------------------
+def _GetResultsFilenameWithInspect(
+    call_stack_offset: int,
+) -> Path:
+    # The implementation replaced by sys._getframe (without the decorate functions)
+    caller = inspect.getouterframes(inspect.currentframe(), 2)[1 + call_stack_offset]
+
+    test_name = caller.function
+
+    self_value = caller.frame.f_locals.get("self", None)
+    if self_value is not None:
+        test_name = "{}.{}".format(self_value.__class__.__name__, test_name)
+
+    filename = Path(caller.filename)
+
+    return filename.parent / TestHelpers.DEFAULT_SUBDIR / "{}.{}{}".format(
+        filename.stem,
+        test_name,
+        TestHelpers.DEFAULT_FILE_EXTENSION,
+    )
+
+
+# ----------------------------------------------------------------------
+def _ResultsFromFileWithInspect(
+    call_stack_offset: int,
+) -> str:
+    return TestHelpers._ReadResults(  # pylint: disable=protected-access
+        _GetResultsFilenameWithInspect(call_stack_offset + 1),
+        TestHelpers.ResultsStore.Auto,
+    )
+
+
+# ----------------------------------------------------------------------
+def _Measure(
+    func: Callable[[], object],
+    calls: int,
+    iterations: int,
+) -> float:
+    """Returns the fastest time per call, in microseconds"""
+
+    best: Optional[float] = None
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+
+        for _ in range(calls):
+            func()
+
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    assert best is not None
+    return best / calls * 1000000
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,144 @@
+# ----------------------------------------------------------------------
+# |
+# |  ResultsPackConverter.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 23:45:58
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Converts TestHelpers results directories between loose results files and pack files."""
+
+import os
+
+from pathlib import Path
+from typing import Callable, List
+
+import typer
+
+from typer.core import TyperGroup
+
+from Common_Foundation.Streams.DoneManager import DoneManager, DoneManagerFlags
+
+from Common_PythonDevelopment import ResultsPack
+from Common_PythonDevelopment.TestHelpers import DEFAULT_SUBDIR
+
+
+# ----------------------------------------------------------------------
+class NaturalOrderGrouper(TyperGroup):
+    # ----------------------------------------------------------------------
+    def list_commands(self, *args, **kwargs):  # pylint: disable=unused-argument
+        return self.commands.keys()
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    cls=NaturalOrderGrouper,
+    no_args_is_help=True,
+    pretty_exceptions_show_locals=False,
+)
+
+
+# ----------------------------------------------------------------------
+@app.command("Pack", no_args_is_help=True)
+def Pack(
+    root: Path=typer.Argument(..., exists=True, file_okay=False, resolve_path=True, help="Directory searched for results directories."),
+    subdir: str=typer.Option(DEFAULT_SUBDIR, "--subdir", help="Name of the results directories."),
+    file_extensions: List[str]=typer.Option(ResultsPack.DEFAULT_RESULTS_FILE_EXTENSIONS, "--file-extension", help="Extension of the results files to pack; other files are left in place."),
+    keep_loose_files: bool=typer.Option(False, "--keep-loose-files", help="Do not remove the loose files once they have been packed."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write additional debug information to the terminal."),
+) -> None:
+    """Moves the loose results files in each results directory into the directory's pack file."""
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm:
+        _Execute(
+            dm,
+            root,
+            subdir,
+            "Packing",
+            lambda directory: ResultsPack.Pack(
+                directory,
+                file_extensions=file_extensions,
+                remove_loose_files=not keep_loose_files,
+            ),
+        )
+
+
+# ----------------------------------------------------------------------
+@app.command("Unpack", no_args_is_help=True)
+def Unpack(
+    root: Path=typer.Argument(..., exists=True, file_okay=False, resolve_path=True, help="Directory searched for results directories."),
+    subdir: str=typer.Option(DEFAULT_SUBDIR, "--subdir", help="Name of the results directories."),
+    keep_pack_files: bool=typer.Option(False, "--keep-pack-files", help="Do not remove the pack files once they have been unpacked."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write additional debug information to the terminal."),
+) -> None:
+    """Writes the entries in each results directory's pack file as loose results files."""
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm:
+        _Execute(
+            dm,
+            root,
+            subdir,
+            "Unpacking",
+            lambda directory: ResultsPack.Unpack(directory, remove_pack_file=not keep_pack_files),
+        )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Execute(
+    dm: DoneManager,
+    root: Path,
+    subdir: str,
+    desc: str,
+    convert_func: Callable[[Path], List[Path]],
+) -> None:
+    directories: List[Path] = []
+
+    with dm.Nested(
+        "Searching for '{}' directories in '{}'...".format(subdir, root),
+        lambda: "{} found".format(len(directories)),
+    ):
+        if root.name == subdir:
+            directories.append(root)
+
+        for this_root, these_dirs, _ in os.walk(root):
+            for this_dir in these_dirs:
+                if this_dir == subdir:
+                    directories.append(Path(this_root) / this_dir)
+
+    if not directories:
+        return
+
+    num_files = 0
+
+    with dm.Nested(
+        "{} {} directories...".format(desc, len(directories)),
+        lambda: "{} files".format(num_files),
+    ) as convert_dm:
+        for directory in directories:
+            with convert_dm.VerboseNested(str(directory)) as this_dm:
+                files = convert_func(directory)
+
+                this_dm.WriteVerbose("{} files\n".format(len(files)))
+                num_files += len(files)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
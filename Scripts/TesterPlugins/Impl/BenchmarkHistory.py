@@ -0,0 +1,195 @@
+# ----------------------------------------------------------------------
+# |
+# |  BenchmarkHistory.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 23:11:15
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Append-only store of benchmark results used to detect performance regressions."""
+
+import sqlite3
+import statistics
+import time
+
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+DEFAULT_THRESHOLD_PERCENTAGE                = 10.0
+
+# Number of previous results used to calculate the baseline
+DEFAULT_BASELINE_SIZE                       = 10
+
+# Regressions aren't reported until there are at least this many previous results, as a baseline
+# calculated from fewer results is too noisy.
+MIN_BASELINE_SIZE                           = 3
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class Regression(object):
+    name: str
+    baseline_median: float                  # Seconds (or the units of a memory benchmark's metric)
+    median: float                           # Seconds (or the units of a memory benchmark's metric)
+
+    # ----------------------------------------------------------------------
+    @property
+    def percentage(self) -> float:
+        return 100.0 * (self.median - self.baseline_median) / self.baseline_median
+
+    # ----------------------------------------------------------------------
+    def ToString(self) -> str:
+        return "{} (+{:.1f}%)".format(self.name, self.percentage)
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def Update(
+    history_filename: Path,
+    filename: Path,
+    version_info: str,
+    commit_id: Optional[str],
+    benchmarks: List[Dict[str, Any]],       # Benchmarks as written by 'pytest --benchmark-json'
+    threshold_percentage: float=DEFAULT_THRESHOLD_PERCENTAGE,
+    baseline_size: int=DEFAULT_BASELINE_SIZE,
+    noise_percentages: Optional[Dict[str, float]]=None,    # Benchmark name -> noise level (percentage)
+) -> List[Regression]:
+    """\
+    Compares the benchmarks to the baseline established by previous results with the same name, file,
+    and version info, and then adds them to the history.
+
+    A benchmark has regressed when its median is more than `threshold_percentage` slower than the
+    median of the baseline medians AND the difference is larger than the baseline's interquartile
+    range (so that noisy benchmarks aren't reported) AND the difference is larger than the noise
+    level of the benchmark's rounds (its value in `noise_percentages` or the noise recorded with the
+    baseline, whichever is larger) when it is known.
+    """
+
+    history_filename.parent.mkdir(parents=True, exist_ok=True)
+
+    regressions: List[Regression] = []
+
+    # Multiple tests may be updating the history at the same time, so wait for the lock
+    with closing(sqlite3.connect(history_filename, timeout=60.0)) as connection:
+        with connection:
+            connection.execute(_CREATE_TABLE_STATEMENT)
+            connection.execute(_CREATE_INDEX_STATEMENT)
+
+            # The noise column was added after the table was introduced
+            if not any(row[1] == "noise" for row in connection.execute("PRAGMA table_info(benchmarks)")):
+                connection.execute(_ADD_NOISE_COLUMN_STATEMENT)
+
+            now = time.time()
+
+            for benchmark in benchmarks:
+                stats = benchmark["stats"]
+                noise_percentage = (noise_percentages or {}).get(benchmark["name"], None)
+
+                baseline = connection.execute(
+                    _SELECT_BASELINE_STATEMENT,
+                    (benchmark["name"], str(filename), version_info, baseline_size),
+                ).fetchall()
+
+                if len(baseline) >= MIN_BASELINE_SIZE:
+                    baseline_median = statistics.median(row[0] for row in baseline)
+                    baseline_iqr = statistics.median(row[1] for row in baseline)
+
+                    all_noise_percentages = [row[2] for row in baseline if row[2] is not None]
+                    if noise_percentage is not None:
+                        all_noise_percentages.append(noise_percentage)
+
+                    noise = baseline_median * max(all_noise_percentages, default=0.0) / 100.0
+
+                    if (
+                        stats["median"] > baseline_median * (1.0 + threshold_percentage / 100.0)
+                        and stats["median"] - baseline_median > baseline_iqr
+                        and stats["median"] - baseline_median > noise
+                    ):
+                        regressions.append(Regression(benchmark["name"], baseline_median, stats["median"]))
+
+                connection.execute(
+                    _INSERT_STATEMENT,
+                    (
+                        benchmark["name"],
+                        str(filename),
+                        version_info,
+                        commit_id,
+                        now,
+                        stats["min"],
+                        stats["max"],
+                        stats["mean"],
+                        stats["stddev"],
+                        stats["median"],
+                        stats["iqr"],
+                        stats["rounds"],
+                        stats["iterations"],
+                        noise_percentage,
+                    ),
+                )
+
+    return regressions
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# All values are in seconds (or the units of a memory benchmark's metric), except for noise (which
+# is a percentage)
+_CREATE_TABLE_STATEMENT                     = """
+    CREATE TABLE IF NOT EXISTS benchmarks (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        version_info TEXT NOT NULL,
+        commit_id TEXT,
+        timestamp REAL NOT NULL,
+        min REAL NOT NULL,
+        max REAL NOT NULL,
+        mean REAL NOT NULL,
+        stddev REAL NOT NULL,
+        median REAL NOT NULL,
+        iqr REAL NOT NULL,
+        rounds INTEGER NOT NULL,
+        iterations INTEGER NOT NULL,
+        noise REAL
+    )
+"""
+
+_ADD_NOISE_COLUMN_STATEMENT                 = """
+    ALTER TABLE benchmarks ADD COLUMN noise REAL
+"""
+
+_CREATE_INDEX_STATEMENT                     = """
+    CREATE INDEX IF NOT EXISTS benchmarks_key ON benchmarks (name, filename, version_info, id)
+"""
+
+_SELECT_BASELINE_STATEMENT                  = """
+    SELECT median, iqr, noise FROM benchmarks
+    WHERE name = ? AND filename = ? AND version_info = ?
+    ORDER BY id DESC
+    LIMIT ?
+"""
+
+_INSERT_STATEMENT                           = """
+    INSERT INTO benchmarks (
+        name, filename, version_info, commit_id, timestamp, min, max, mean, stddev, median, iqr, rounds, iterations, noise
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
@@ -0,0 +1,495 @@
+# ----------------------------------------------------------------------
+# |
+# |  CapturedProcess.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 22:54:31
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Runs processes whose output is written to disk, with only a bounded amount retained in memory."""
+
+import mmap
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+DEFAULT_HEAD_SIZE                           = 1024 * 1024
+DEFAULT_TAIL_SIZE                           = 1024 * 1024
+
+# Time given to processes to write stack traces after a timeout, before they are killed
+DEFAULT_TIMEOUT_GRACE_PERIOD                = 5.0
+
+# Written to the output before the process tree is signaled because the process did not complete
+# within the timeout, so that it precedes the stacks written by faulthandler.
+TIMEOUT_MARKER_TEMPLATE                     = "\n<<<<<<<<<< Timeout after {timeout} seconds; terminating the process >>>>>>>>>>\n"
+
+TIMEOUT_MARKER_REGEX                        = re.compile(
+    r"""(?#
+    Prefix                                  )^<<<<<<<<<< Timeout after (?#
+    Timeout                                 )(?P<timeout>[\d\.]+)(?#
+    Suffix                                  ) seconds; terminating the process >>>>>>>>>>\r?$(?#
+    )""",
+    re.MULTILINE,
+)
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class ResourceUsage(object):
+    """Resources consumed by a process (and the descendants that it waited on)."""
+
+    max_rss_bytes: int
+    user_seconds: float
+    system_seconds: float
+    voluntary_context_switches: int
+    involuntary_context_switches: int
+    block_input_operations: int
+    block_output_operations: int
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def FromRUsage(
+        cls,
+        rusage,                             # resource.struct_rusage
+    ) -> "ResourceUsage":
+        return cls(
+            # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+            rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024,
+            rusage.ru_utime,
+            rusage.ru_stime,
+            rusage.ru_nvcsw,
+            rusage.ru_nivcsw,
+            rusage.ru_inblock,
+            rusage.ru_oublock,
+        )
+
+    # ----------------------------------------------------------------------
+    def __add__(
+        self,
+        other: "ResourceUsage",
+    ) -> "ResourceUsage":
+        return ResourceUsage(
+            max(self.max_rss_bytes, other.max_rss_bytes),
+            self.user_seconds + other.user_seconds,
+            self.system_seconds + other.system_seconds,
+            self.voluntary_context_switches + other.voluntary_context_switches,
+            self.involuntary_context_switches + other.involuntary_context_switches,
+            self.block_input_operations + other.block_input_operations,
+            self.block_output_operations + other.block_output_operations,
+        )
+
+    # ----------------------------------------------------------------------
+    def ToShortString(self) -> str:
+        return "{:.1f} MiB peak, {:.2f}s user, {:.2f}s sys".format(
+            self.max_rss_bytes / (1024 * 1024),
+            self.user_seconds,
+            self.system_seconds,
+        )
+
+    # ----------------------------------------------------------------------
+    def ToString(self) -> str:
+        return "{}, {} / {} context switches (voluntary / involuntary), {} / {} block operations (input / output)".format(
+            self.ToShortString(),
+            self.voluntary_context_switches,
+            self.involuntary_context_switches,
+            self.block_input_operations,
+            self.block_output_operations,
+        )
+
+
+# ----------------------------------------------------------------------
+@dataclass
+class RunResult(object):
+    returncode: int
+    output: Optional[str]                   # None if the output was sent to `on_output`
+    resource_usage: Optional[ResourceUsage] # None on platforms without os.wait4
+    timed_out: bool                         = False
+    canceled: bool                          = False     # True if `on_output` requested termination
+
+
+# ----------------------------------------------------------------------
+class OutputCapture(object):
+    """\
+    Writes all output to a file, while retaining only the first `head_size` and last `tail_size`
+    bytes in memory.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        filename: Path,
+        head_size: int=DEFAULT_HEAD_SIZE,
+        tail_size: int=DEFAULT_TAIL_SIZE,
+    ):
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        self.filename                       = filename
+        self.head_size                      = head_size
+        self.tail_size                      = tail_size
+
+        self.total_size                     = 0
+
+        self._file                          = filename.open("wb")
+
+        self._head                          = bytearray()
+        self._tail                          = bytearray()
+
+    # ----------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, *args):
+        self.Close()
+
+    # ----------------------------------------------------------------------
+    def Close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    # ----------------------------------------------------------------------
+    def Write(
+        self,
+        content: bytes,
+    ) -> None:
+        self._file.write(content)
+        self.total_size += len(content)
+
+        if len(self._head) < self.head_size:
+            num_head_bytes = self.head_size - len(self._head)
+
+            self._head += content[:num_head_bytes]
+            content = content[num_head_bytes:]
+
+        if content and self.tail_size:
+            self._tail += content
+
+            if len(self._tail) > self.tail_size:
+                del self._tail[:len(self._tail) - self.tail_size]
+
+    # ----------------------------------------------------------------------
+    @property
+    def is_truncated(self) -> bool:
+        return self.total_size > len(self._head) + len(self._tail)
+
+    # ----------------------------------------------------------------------
+    def GetOutput(self) -> str:
+        """Returns the output retained in memory, noting the location of the complete output if it was truncated."""
+
+        if not self.is_truncated:
+            return _Decode(self._head + self._tail)
+
+        return "{}{}{}".format(
+            _Decode(self._head),
+            _OMITTED_TEMPLATE.format(
+                num_bytes=self.total_size - len(self._head) - len(self._tail),
+                filename=self.filename,
+            ),
+            _Decode(self._tail),
+        )
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def Run(
+    command_line: str,
+    on_output: Optional[Callable[[bytes], Optional[bool]]]=None,
+    *,
+    cwd: Optional[Path]=None,
+    env: Optional[Dict[str, str]]=None,
+    timeout: Optional[float]=None,
+    timeout_grace_period: float=DEFAULT_TIMEOUT_GRACE_PERIOD,
+) -> RunResult:
+    """\
+    Runs the command line, streaming its output to `on_output` (or collecting it in the result if
+    `on_output` is None) and measuring the resources consumed by the process.
+
+    If the process does not complete within `timeout` seconds, TIMEOUT_MARKER_TEMPLATE and the
+    stacks of all threads in all python processes within the process tree are written to the output
+    (via faulthandler) and the process tree is killed.
+
+    If `on_output` returns False, the process is interrupted (as if Ctrl+C was pressed) so that it
+    has the opportunity to write a summary of the work completed before it exits.
+    """
+
+    output_chunks: Optional[List[bytes]] = None
+
+    if on_output is None:
+        output_chunks = []
+        on_output = output_chunks.append
+
+    if timeout is not None:
+        # faulthandler writes the stacks of all threads when the process receives SIGABRT
+        env = dict(os.environ if env is None else env)
+        env.setdefault("PYTHONFAULTHANDLER", "1")
+
+    with subprocess.Popen(
+        command_line,
+        shell=True,
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        # Run in a new process group so that the entire process tree can be signaled on timeout or
+        # when it is canceled.
+        start_new_session=os.name != "nt",
+    ) as process:
+        assert process.stdout is not None
+        fd = process.stdout.fileno()
+
+        canceled = False
+
+        # The timeout marker is written by the timeout monitor's thread
+        output_lock = threading.Lock()
+
+        # ----------------------------------------------------------------------
+        def ReadOutput():
+            nonlocal canceled
+
+            while True:
+                content = os.read(fd, _READ_CHUNK_SIZE)
+                if not content:
+                    break
+
+                with output_lock:
+                    should_continue = on_output(content)
+
+                # Continue to read the output after the process is interrupted, as the process
+                # will block if the pipe is full.
+                if should_continue is False and not canceled:
+                    canceled = True
+                    _Interrupt(process)
+
+        # ----------------------------------------------------------------------
+        def OnTimeout():
+            with output_lock:
+                on_output(TIMEOUT_MARKER_TEMPLATE.format(timeout=timeout).encode("utf-8"))
+
+        # ----------------------------------------------------------------------
+
+        reader = threading.Thread(target=ReadOutput, daemon=True)
+        reader.start()
+
+        timeout_monitor: Optional[_TimeoutMonitor] = None
+
+        if timeout is not None:
+            timeout_monitor = _TimeoutMonitor(process, timeout, timeout_grace_period, OnTimeout)
+
+        resource_usage: Optional[ResourceUsage] = None
+
+        try:
+            if hasattr(os, "wait4"):
+                _, status, rusage = os.wait4(process.pid, 0)  # pylint: disable=no-member
+
+                # Let Popen know that the process has been reaped
+                process.returncode = os.waitstatus_to_exitcode(status)
+                resource_usage = ResourceUsage.FromRUsage(rusage)
+
+            returncode = process.wait()
+
+        except KeyboardInterrupt:
+            # The process is in its own process group and will not see the Ctrl+C from the terminal
+            _Interrupt(process)
+            raise
+
+        if timeout_monitor is not None:
+            timeout_monitor.OnProcessExit()
+
+        reader.join()
+
+    return RunResult(
+        returncode,
+        None if output_chunks is None else _Decode(b"".join(output_chunks)),
+        resource_usage,
+        timed_out=timeout_monitor is not None and timeout_monitor.timed_out,
+        canceled=canceled,
+    )
+
+
+# ----------------------------------------------------------------------
+def GetOutputFilename(
+    output: str,
+) -> Optional[Path]:
+    """Returns the name of the file that contains the complete output if `output` was truncated by OutputCapture."""
+
+    match = _OMITTED_REGEX.search(output)
+    if match is None:
+        return None
+
+    return Path(match.group("filename"))
+
+
+# ----------------------------------------------------------------------
+def LoadOutput(
+    output: str,
+) -> Union[str, mmap.mmap]:
+    """\
+    Returns `output` if it is complete, or a read-only memory map of the file containing the complete
+    output if it was truncated by OutputCapture. The memory map is released when it is no longer
+    referenced.
+    """
+
+    filename = GetOutputFilename(output)
+
+    if filename is None or not filename.is_file() or filename.stat().st_size == 0:
+        return output
+
+    with filename.open("rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_READ_CHUNK_SIZE                            = 64 * 1024
+
+_OMITTED_TEMPLATE                           = "\n\n<<<<<<<<<< {num_bytes} bytes omitted; the complete output is in '{filename}' >>>>>>>>>>\n\n"
+
+_OMITTED_REGEX                              = re.compile(
+    r"""(?#
+    Prefix                                  )^<<<<<<<<<< \d+ bytes omitted; the complete output is in '(?#
+    Filename                                )(?P<filename>[^']+)(?#
+    Suffix                                  )' >>>>>>>>>>$(?#
+    )""",
+    re.MULTILINE,
+)
+
+
+# ----------------------------------------------------------------------
+class _TimeoutMonitor(object):
+    """Terminates a process tree if the process does not exit before the timeout."""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        timeout: float,
+        grace_period: float,
+        on_timeout_func: Callable[[], None],
+    ):
+        self.timed_out                      = False
+
+        self._process                       = process
+        self._grace_period                  = grace_period
+        self._on_timeout_func               = on_timeout_func
+
+        self._lock                          = threading.Lock()
+        self._exited                        = threading.Event()
+
+        self._timer                         = threading.Timer(timeout, self._OnTimeout)
+        self._timer.daemon = True
+        self._timer.start()
+
+    # ----------------------------------------------------------------------
+    def OnProcessExit(self) -> None:
+        """Called after the process has exited."""
+
+        with self._lock:
+            self._exited.set()
+            self._timer.cancel()
+
+            timed_out = self.timed_out
+
+        if os.name == "nt":
+            return
+
+        if timed_out:
+            # Give the remaining processes in the tree a chance to finish writing their stacks
+            deadline = time.perf_counter() + self._grace_period
+
+            while time.perf_counter() < deadline and self._SignalProcessGroup(0):
+                time.sleep(0.05)
+
+        # Kill any descendants that outlived the process so that they don't hold on to the
+        # output pipe.
+        self._SignalProcessGroup(signal.SIGKILL)
+
+    # ----------------------------------------------------------------------
+    def _OnTimeout(self) -> None:
+        with self._lock:
+            if self._exited.is_set():
+                return
+
+            self.timed_out = True
+
+            self._on_timeout_func()
+
+            if os.name == "nt":
+                subprocess.run(
+                    "taskkill /F /T /PID {}".format(self._process.pid),
+                    shell=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=False,
+                )
+
+                return
+
+            self._SignalProcessGroup(signal.SIGABRT)
+
+        if not self._exited.wait(self._grace_period):
+            with self._lock:
+                if not self._exited.is_set():
+                    self._SignalProcessGroup(signal.SIGKILL)
+
+    # ----------------------------------------------------------------------
+    def _SignalProcessGroup(
+        self,
+        signal_value: int,
+    ) -> bool:
+        """Returns False if the process group no longer exists."""
+
+        try:
+            os.killpg(self._process.pid, signal_value)  # pylint: disable=no-member
+            return True
+        except (ProcessLookupError, PermissionError):
+            return False
+
+
+# ----------------------------------------------------------------------
+def _Interrupt(
+    process: subprocess.Popen,
+) -> None:
+    if process.returncode is not None:
+        return
+
+    try:
+        if os.name == "nt":
+            process.terminate()
+        else:
+            os.killpg(process.pid, signal.SIGINT)  # pylint: disable=no-member
+    except (ProcessLookupError, PermissionError):
+        # The process has already exited
+        pass
+
+
+# ----------------------------------------------------------------------
+def _Decode(
+    content: bytes,
+) -> str:
+    return content.decode("utf-8", errors="replace").replace("\r\n", "\n")
@@ -0,0 +1,800 @@
+# ----------------------------------------------------------------------
+# |
+# |  PytestForkServer.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 23:21:31
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Runs pytest in processes forked from a server that has already imported pytest, its plugins, and
+other modules that are expensive to import, so that each invocation doesn't pay the interpreter and
+import startup costs.
+
+Usage:
+
+    python PytestForkServer.py ["--preload=<module>[,<module>...]"] -- <pytest args>
+
+The server is started by the first invocation and exits after it has been idle for IDLE_TIMEOUT
+seconds. pytest is invoked normally when the server can't be used safely: fork isn't supported (or
+isn't safe on the platform), importing the preloaded modules started a thread, or a preloaded module
+has changed since the server imported it.
+
+The server's socket is created in a directory that can only be accessed by the current user (within
+XDG_RUNTIME_DIR when it is defined), and the client and server verify that the process on the other
+end of the connection is running as the current user before any data is exchanged. A server is only
+shared by clients with the same interpreter startup environment (all PYTHON* environment variables),
+as those variables don't have any impact once the server's interpreter has started.
+
+Note that this file is invoked for every test and only imports modules from the standard library
+that are inexpensive to import.
+"""
+
+import hashlib
+import json
+import os
+import re
+import signal
+import socket
+import struct
+import sys
+import time
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+# Seconds without a request before the server exits
+IDLE_TIMEOUT                                = 15 * 60
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def CreateCommandLine(
+    pytest_command_line: str,
+    preload_modules: List[str],
+) -> str:
+    """Converts a command line that begins with 'pytest' into one that runs pytest via the fork server."""
+
+    assert pytest_command_line.startswith("pytest "), pytest_command_line
+
+    return 'python "{}"{} --{}'.format(
+        Path(__file__).resolve(),
+        ' "--preload={}"'.format(",".join(preload_modules)) if preload_modules else "",
+        pytest_command_line[len("pytest"):],
+    )
+
+
+# ----------------------------------------------------------------------
+def ToPytestCommandLine(
+    command_line: str,
+) -> str:
+    """Returns the pytest command line for a command line created by CreateCommandLine (or the original command line)."""
+
+    match = _command_line_regex.match(command_line)
+    if match is None:
+        return command_line
+
+    return "pytest{}".format(command_line[match.end():])
+
+
+# ----------------------------------------------------------------------
+def Main(
+    args: List[str],
+) -> int:
+    if args and args[0] == "serve":
+        return _Serve(Path(args[1]), _SplitModules(args[2]))
+
+    preload_modules: List[str] = []
+
+    while args and args[0] != "--":
+        arg = args.pop(0)
+
+        if arg.startswith("--preload="):
+            preload_modules += _SplitModules(arg[len("--preload="):])
+        else:
+            sys.stderr.write("'{}' is not a valid argument.\n".format(arg))
+            return -1
+
+    return _Run(preload_modules, args[1:])
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_STARTUP_TIMEOUT                            = 60.0
+_READ_CHUNK_SIZE                            = 64 * 1024
+
+# Frame types
+_REQUEST_FRAME                              = b"R"      # client -> server: JSON request
+_SIGNAL_FRAME                               = b"K"      # client -> server: signal number to forward
+_OUTPUT_FRAME                               = b"O"      # server -> client: output
+_EXIT_FRAME                                 = b"X"      # server -> client: exit code
+_REFUSED_FRAME                              = b"F"      # server -> client: the request can't be run safely
+
+_FRAME_HEADER                               = struct.Struct("!cI")
+_EXIT_CODE                                  = struct.Struct("!i")
+
+_FORWARDED_SIGNALS                          = ["SIGINT", "SIGTERM", "SIGHUP", "SIGABRT"]
+
+_SERVER_DIRECTORY_NAME                      = "pytest_fork_server"
+
+# struct ucred (pid, uid, gid) returned by SO_PEERCRED
+_PEER_CREDENTIALS                           = struct.Struct("3i")
+
+_command_line_regex                         = re.compile(
+    r"""(?#
+    Python                                  )python (?#
+    Script                                  )"[^"]*PytestForkServer\.py"(?#
+    Preload                                 )(?: "--preload=[^"]*")?(?#
+    Sep                                     ) --(?= |$)(?#
+    )""",
+)
+
+
+# ----------------------------------------------------------------------
+def _SplitModules(
+    value: str,
+) -> List[str]:
+    return [module.strip() for module in value.split(",") if module.strip()]
+
+
+# ----------------------------------------------------------------------
+def _Run(
+    preload_modules: List[str],
+    pytest_args: List[str],
+) -> int:
+    connection: Optional[socket.socket] = None
+
+    if _IsForkSafe():
+        try:
+            connection = _Connect(preload_modules)
+        except OSError:
+            connection = None
+
+    if connection is None:
+        _RunPytest(pytest_args)
+
+    assert connection is not None
+
+    with connection:
+        _SendFrame(
+            connection,
+            _REQUEST_FRAME,
+            json.dumps(
+                {
+                    "args": pytest_args,
+                    "cwd": os.getcwd(),
+                    "env": dict(os.environ),
+                },
+            ).encode("utf-8"),
+        )
+
+        # The forked process isn't a descendant of this one, so forward the signals that would
+        # otherwise terminate this process.
+
+        # ----------------------------------------------------------------------
+        def OnSignal(signum, frame):  # pylint: disable=unused-argument
+            try:
+                _SendFrame(connection, _SIGNAL_FRAME, struct.pack("!i", signum))
+            except OSError:
+                pass
+
+        # ----------------------------------------------------------------------
+
+        for signal_name in _FORWARDED_SIGNALS:
+            signal_value = getattr(signal, signal_name, None)
+            if signal_value is not None:
+                signal.signal(signal_value, OnSignal)
+
+        while True:
+            frame = _ReceiveFrame(connection)
+            if frame is None:
+                sys.stderr.write("\nThe connection to the pytest fork server was lost.\n")
+                return -1
+
+            frame_type, payload = frame
+
+            if frame_type == _OUTPUT_FRAME:
+                _WriteAll(sys.stdout.fileno(), payload)
+            elif frame_type == _EXIT_FRAME:
+                exit_code = _EXIT_CODE.unpack(payload)[0]
+
+                if exit_code < 0:
+                    # pytest was terminated by a signal, so terminate this process in the same way
+                    signal.signal(-exit_code, signal.SIG_DFL)
+                    os.kill(os.getpid(), -exit_code)
+
+                return exit_code
+            elif frame_type == _REFUSED_FRAME:
+                # Nothing has been run yet
+                _RunPytest(pytest_args)
+            else:
+                assert False, frame_type  # pragma: no cover
+
+
+# ----------------------------------------------------------------------
+def _IsForkSafe() -> bool:
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        return False
+
+    # Forking a process that has initialized system frameworks is not safe on macOS
+    if sys.platform == "darwin":
+        return False
+
+    return True
+
+
+# ----------------------------------------------------------------------
+def _RunPytest(
+    pytest_args: List[str],
+) -> None:
+    """Invokes pytest normally; does not return."""
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    os.execvp("pytest", ["pytest", ] + pytest_args)
+
+
+# ----------------------------------------------------------------------
+def _Connect(
+    preload_modules: List[str],
+) -> Optional[socket.socket]:
+    socket_filename = _GetSocketFilename(preload_modules)
+
+    connection = _TryConnect(socket_filename)
+    if connection is not None:
+        return connection
+
+    import fcntl  # pylint: disable=import-outside-toplevel
+    import subprocess  # pylint: disable=import-outside-toplevel
+
+    # Ensure that only one client starts the server
+    with _OpenPrivateFile(socket_filename.with_suffix(".lock")) as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)  # pylint: disable=no-member
+
+        connection = _TryConnect(socket_filename)
+        if connection is not None:
+            return connection
+
+        # Remove the socket of a server that exited unexpectedly
+        socket_filename.unlink(missing_ok=True)
+
+        with _OpenPrivateFile(socket_filename.with_suffix(".log"), truncate=True) as log_file:
+            process = subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve()), "serve", str(socket_filename), ",".join(preload_modules)],
+                stdin=subprocess.DEVNULL,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+
+        deadline = time.perf_counter() + _STARTUP_TIMEOUT
+
+        while time.perf_counter() < deadline:
+            connection = _TryConnect(socket_filename)
+            if connection is not None:
+                return connection
+
+            # The server exits if it can't be used safely
+            if process.poll() is not None:
+                return None
+
+            time.sleep(0.01)
+
+    return None
+
+
+# ----------------------------------------------------------------------
+def _TryConnect(
+    socket_filename: Path,
+) -> Optional[socket.socket]:
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=no-member
+
+    try:
+        connection.connect(str(socket_filename))
+    except OSError:
+        connection.close()
+        return None
+
+    # The request contains the environment, so don't send it to a process run by a different user
+    if not _IsPeerCurrentUser(connection, socket_filename):
+        connection.close()
+        return None
+
+    return connection
+
+
+# ----------------------------------------------------------------------
+def _GetSocketFilename(
+    preload_modules: List[str],
+) -> Path:
+    # Servers can't be shared by different interpreters, module search paths, interpreter startup
+    # environments, or versions of this file.
+    hash_value = hashlib.sha256(
+        json.dumps(
+            [
+                sys.executable,
+                sorted(preload_modules),
+                sorted((key, value) for key, value in os.environ.items() if key.startswith("PYTHON")),
+                os.getenv("VIRTUAL_ENV", ""),
+                os.stat(__file__).st_mtime_ns,
+            ],
+        ).encode("utf-8"),
+    ).hexdigest()
+
+    return _GetServerDirectory() / "{}.sock".format(hash_value[:16])
+
+
+# ----------------------------------------------------------------------
+def _GetServerDirectory() -> Path:
+    """Returns a directory that can only be accessed by the current user, creating it if necessary; raises OSError if the directory isn't private."""
+
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+
+    if runtime_dir and os.path.isabs(runtime_dir):
+        root = Path(runtime_dir)
+        _VerifyPrivateDirectory(root)
+
+        name = _SERVER_DIRECTORY_NAME
+    else:
+        import tempfile  # pylint: disable=import-outside-toplevel
+
+        root = Path(tempfile.gettempdir())
+        name = "{}_{}".format(_SERVER_DIRECTORY_NAME, os.getuid())  # pylint: disable=no-member
+
+    directory = root / name
+
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+
+    # The directory may have been created by another user before this user created it
+    _VerifyPrivateDirectory(directory)
+
+    return directory
+
+
+# ----------------------------------------------------------------------
+def _VerifyPrivateDirectory(
+    directory: Path,
+) -> None:
+    import stat  # pylint: disable=import-outside-toplevel
+
+    # lstat, as a symlink could point to a directory owned by this user that is accessible by others
+    info = os.lstat(directory)
+
+    if not stat.S_ISDIR(info.st_mode):
+        raise OSError("'{}' is not a directory.".format(directory))
+
+    if info.st_uid != os.getuid():  # pylint: disable=no-member
+        raise OSError("'{}' is not owned by the current user.".format(directory))
+
+    if info.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+        raise OSError("'{}' can be accessed by other users.".format(directory))
+
+
+# ----------------------------------------------------------------------
+def _OpenPrivateFile(
+    filename: Path,
+    *,
+    truncate: bool=False,
+):
+    """Opens a file for writing that is only accessible by the current user, without following symlinks."""
+
+    flags = os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC  # pylint: disable=no-member
+
+    if truncate:
+        flags |= os.O_TRUNC
+
+    return os.fdopen(os.open(filename, flags, 0o600), "w")
+
+
+# ----------------------------------------------------------------------
+def _IsPeerCurrentUser(
+    connection: socket.socket,
+    socket_filename: Optional[Path]=None,
+) -> bool:
+    """\
+    Returns True if the process on the other end of the connection is running as the current user.
+
+    When the peer's credentials aren't available on the platform, the owner of the socket file is
+    verified instead (when provided); the socket is within a private directory in either case (see
+    _GetServerDirectory).
+    """
+
+    peer_cred = getattr(socket, "SO_PEERCRED", None)
+
+    if peer_cred is not None:
+        try:
+            _, uid, _ = _PEER_CREDENTIALS.unpack(
+                connection.getsockopt(socket.SOL_SOCKET, peer_cred, _PEER_CREDENTIALS.size),
+            )
+        except OSError:
+            return False
+
+        return uid == os.getuid()  # pylint: disable=no-member
+
+    if socket_filename is None:
+        return True
+
+    try:
+        return os.lstat(socket_filename).st_uid == os.getuid()  # pylint: disable=no-member
+    except OSError:
+        return False
+
+
+# ----------------------------------------------------------------------
+def _Serve(
+    socket_filename: Path,
+    preload_modules: List[str],
+) -> int:
+    import importlib  # pylint: disable=import-outside-toplevel
+    import importlib.metadata  # pylint: disable=import-outside-toplevel
+    import threading  # pylint: disable=import-outside-toplevel
+
+    # Don't allow the modules in this directory to hide modules used by the tests
+    this_dir = str(Path(__file__).parent)
+    sys.path = [path for path in sys.path if path != this_dir]
+
+    import pytest  # pylint: disable=import-outside-toplevel,unused-import
+
+    for module in preload_modules:
+        try:
+            importlib.import_module(module)
+        except Exception as ex:  # pylint: disable=broad-except
+            print("Unable to preload the module '{}' ({}); the server can't be used.".format(module, ex))
+            return -1
+
+    # pytest loads the plugins registered via entry points on each invocation; importing them
+    # here means that the modules are already loaded in each forked process.
+    preloaded_plugins: List[str] = []
+
+    for entry_point in importlib.metadata.entry_points(group="pytest11"):
+        try:
+            entry_point.load()
+        except Exception as ex:  # pylint: disable=broad-except
+            print("Unable to preload the pytest plugin '{}' ({}).".format(entry_point.name, ex))
+            continue
+
+        preloaded_plugins.append(entry_point.module.partition(".")[0])
+
+    # pytest warns that the assertions in plugins that have already been imported can't be
+    # rewritten. This only impacts the messages of assertions within the plugins themselves.
+    warning_args: List[str] = []
+
+    for plugin in sorted(set(preloaded_plugins)):
+        warning_args += [
+            "-W",
+            "ignore:Module already imported so cannot be rewritten; {}:pytest.PytestAssertRewriteWarning".format(plugin),
+        ]
+
+    # Threads don't survive fork, so a process with threads can't be safely forked
+    if threading.active_count() != 1:
+        print("The preloaded modules started threads; the server can't be used.")
+        return -1
+
+    module_mtimes = _GetModuleMtimes()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=no-member
+
+    # Create the socket so that it is never accessible by other users
+    prev_umask = os.umask(0o177)
+
+    try:
+        _VerifyPrivateDirectory(socket_filename.parent)
+
+        listener.bind(str(socket_filename))
+        os.chmod(socket_filename, 0o600)
+    except OSError as ex:
+        print("Unable to bind to '{}' ({}).".format(socket_filename, ex))
+        listener.close()
+        return -1
+    finally:
+        os.umask(prev_umask)
+
+    try:
+        listener.listen()
+        listener.settimeout(IDLE_TIMEOUT)
+
+        # Automatically reap the session processes
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # pylint: disable=no-member
+
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except socket.timeout:
+                break
+
+            connection.setblocking(True)
+
+            # Requests are run as this user, so only accept them from this user
+            if not _IsPeerCurrentUser(connection):
+                connection.close()
+                continue
+
+            if _GetModuleMtimes() != module_mtimes:
+                # Stop accepting requests before the client restarts the server
+                listener.close()
+                socket_filename.unlink(missing_ok=True)
+
+                # Read the request before refusing it; the client's write fails if the connection is
+                # closed before the request has been sent.
+                _ReceiveFrame(connection)
+
+                _SendFrame(connection, _REFUSED_FRAME, b"A preloaded module has changed.")
+                connection.close()
+
+                print("A preloaded module has changed.")
+                break
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            if os.fork() == 0:
+                listener.close()
+
+                exit_code = 0
+
+                try:
+                    _RunSession(connection, warning_args)
+                except BaseException:  # pylint: disable=broad-except
+                    exit_code = -1
+
+                os._exit(exit_code)  # pylint: disable=protected-access
+
+            connection.close()
+
+    finally:
+        if listener.fileno() != -1:
+            listener.close()
+            socket_filename.unlink(missing_ok=True)
+
+    return 0
+
+
+# ----------------------------------------------------------------------
+def _GetModuleMtimes() -> Dict[str, int]:
+    results: Dict[str, int] = {}
+
+    for module in list(sys.modules.values()):
+        filename = getattr(module, "__file__", None)
+        if not filename:
+            continue
+
+        try:
+            results[filename] = os.stat(filename).st_mtime_ns
+        except OSError:
+            results[filename] = -1
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def _RunSession(
+    connection: socket.socket,
+    warning_args: List[str],
+) -> None:
+    """Runs pytest in a forked process and streams its output to the client (runs in a process forked from the server)."""
+
+    import select  # pylint: disable=import-outside-toplevel
+
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)  # pylint: disable=no-member
+
+    frame = _ReceiveFrame(connection)
+    if frame is None:
+        return
+
+    frame_type, payload = frame
+    assert frame_type == _REQUEST_FRAME, frame_type
+
+    request = json.loads(payload.decode("utf-8"))
+    request["args"] = warning_args + request["args"]
+
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+
+    if pid == 0:
+        connection.close()
+        os.close(read_fd)
+
+        _RunForkedPytest(request, write_fd)
+
+    os.close(write_fd)
+
+    with connection:
+        inputs: List = [read_fd, connection]
+
+        while True:
+            readable, _, _ = select.select(inputs, [], [])
+
+            if connection in readable:
+                frame = _ReceiveFrame(connection)
+
+                if frame is None:
+                    # The client is gone, so there is no one to receive the output
+                    _SignalProcessGroup(pid, signal.SIGKILL)  # pylint: disable=no-member
+                    inputs.remove(connection)
+                else:
+                    frame_type, payload = frame
+                    assert frame_type == _SIGNAL_FRAME, frame_type
+
+                    _SignalProcessGroup(pid, struct.unpack("!i", payload)[0])
+
+            if read_fd in readable:
+                content = os.read(read_fd, _READ_CHUNK_SIZE)
+                if not content:
+                    break
+
+                try:
+                    _SendFrame(connection, _OUTPUT_FRAME, content)
+                except OSError:
+                    _SignalProcessGroup(pid, signal.SIGKILL)  # pylint: disable=no-member
+
+        _, status = os.waitpid(pid, 0)
+
+        try:
+            _SendFrame(connection, _EXIT_FRAME, _EXIT_CODE.pack(os.waitstatus_to_exitcode(status)))
+        except OSError:
+            pass
+
+
+# ----------------------------------------------------------------------
+def _RunForkedPytest(
+    request: Dict,
+    output_fd: int,
+) -> None:
+    """Runs pytest (runs in a process forked from the session process); does not return."""
+
+    exit_code = 1
+
+    try:
+        # Run in a new process group so that signals forwarded by the client reach the entire
+        # process tree.
+        os.setsid()  # pylint: disable=no-member
+
+        input_fd = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(input_fd, 0)
+        os.close(input_fd)
+
+        os.dup2(output_fd, 1)
+        os.dup2(output_fd, 2)
+        os.close(output_fd)
+
+        os.chdir(request["cwd"])
+
+        os.environ.clear()
+        os.environ.update(request["env"])
+
+        if os.environ.get("PYTHONFAULTHANDLER"):
+            import faulthandler  # pylint: disable=import-outside-toplevel
+
+            faulthandler.enable()
+
+        sys.argv = ["pytest", ] + request["args"]
+
+        import pytest  # pylint: disable=import-outside-toplevel
+
+        exit_code = int(pytest.main(request["args"]))
+
+    except SystemExit as ex:
+        if ex.code is None:
+            exit_code = 0
+        elif isinstance(ex.code, int):
+            exit_code = ex.code
+        else:
+            sys.stderr.write("{}\n".format(ex.code))
+            exit_code = 1
+
+    except BaseException:  # pylint: disable=broad-except
+        import traceback  # pylint: disable=import-outside-toplevel
+
+        traceback.print_exc()
+
+    finally:
+        # Run the functions that would have been invoked if pytest had been run normally, but
+        # don't unwind into the server's stack.
+        import atexit  # pylint: disable=import-outside-toplevel
+
+        try:
+            atexit._run_exitfuncs()  # pylint: disable=protected-access
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(exit_code)  # pylint: disable=protected-access
+
+
+# ----------------------------------------------------------------------
+def _SignalProcessGroup(
+    pid: int,
+    signal_value: int,
+) -> None:
+    try:
+        os.killpg(pid, signal_value)  # pylint: disable=no-member
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+# ----------------------------------------------------------------------
+def _SendFrame(
+    connection: socket.socket,
+    frame_type: bytes,
+    payload: bytes,
+) -> None:
+    connection.sendall(_FRAME_HEADER.pack(frame_type, len(payload)) + payload)
+
+
+# ----------------------------------------------------------------------
+def _ReceiveFrame(
+    connection: socket.socket,
+) -> Optional[Tuple[bytes, bytes]]:
+    header = _ReceiveAll(connection, _FRAME_HEADER.size)
+    if header is None:
+        return None
+
+    frame_type, payload_size = _FRAME_HEADER.unpack(header)
+
+    payload = _ReceiveAll(connection, payload_size)
+    if payload is None:
+        return None
+
+    return frame_type, payload
+
+
+# ----------------------------------------------------------------------
+def _ReceiveAll(
+    connection: socket.socket,
+    size: int,
+) -> Optional[bytes]:
+    buffer = bytearray()
+
+    while len(buffer) < size:
+        try:
+            content = connection.recv(size - len(buffer))
+        except ConnectionResetError:
+            return None
+
+        if not content:
+            return None
+
+        buffer += content
+
+    return bytes(buffer)
+
+
+# ----------------------------------------------------------------------
+def _WriteAll(
+    fd: int,
+    content: bytes,
+) -> None:
+    view = memoryview(content)
+
+    while view:
+        view = view[os.write(fd, view):]
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -0,0 +1,415 @@
+# ----------------------------------------------------------------------
+# |
+# |  PytestOutput.py
+# |
+# |  agent <agent@local>
+# |      2026-10-18 23:05:24
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Extracts information from verbose pytest output, either after the fact or as it is produced."""
+
+import mmap
+import re
+
+from typing import Callable, List, Optional, Tuple, Union
+
+
+# ----------------------------------------------------------------------
+class VerboseOutputParser(object):
+    """\
+    Extracts test results from verbose pytest output one line at a time.
+
+    A test begins with a line in the form '<filename>.py::<test> ' and ends with the first line
+    that only contains an upper-case result (or with a result on the same line as the test name),
+    with any output written by the test in between. Skipped tests and expected failures may have
+    a reason after the result (for example, 'SKIPPED (reason)'). Each line is examined once, so
+    parsing is linear in the size of the output.
+
+    When tests are distributed across pytest-xdist workers, results are written on lines in the
+    form '[gw<N>] [ <percent>%] <result> <filename>.py::<test>' (where the percentage is optional)
+    and the test lines written as the tests are scheduled do not have results.
+    """
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Parse(
+        cls,
+        content: Union[str, mmap.mmap],
+    ) -> List[Tuple[str, str]]:
+        """Returns the names and results of the tests in complete output."""
+
+        parser = cls()
+        results: List[Tuple[str, str]] = []
+
+        # Only result lines and lines that contain a test name can change the parser's state, so
+        # those lines are found with a single scan of the content rather than by examining each line
+        # in python. The scan also extracts the name and result of a test from the most common
+        # sequences of lines in the output: a test line with the result on the same line, and a test
+        # line followed by the test's output and a result line.
+        if isinstance(content, str):
+            decode_func = lambda value: value
+            regex = cls._significant_lines_regex
+            newline = "\n"
+        else:
+            decode_func = lambda value: value.decode("utf-8", errors="replace")
+            regex = cls._significant_lines_bytes_regex
+            newline = b"\n"
+
+        # The regex matches the newline before each line, so the first line is processed separately
+        first_line_end = content.find(newline)
+        results += parser.ProcessLine(decode_func(content[:first_line_end if first_line_end != -1 else len(content)]))
+
+        is_idle = parser._pending_test is None and not parser._is_xdist  # pylint: disable=protected-access
+
+        for test, result, next_result, line in regex.findall(content):
+            if result and is_idle:
+                # The result is complete on its own (this is the most common case)
+                results.append((decode_func(test), decode_func(result)))
+                continue
+
+            if result:
+                results += parser._OnTest(decode_func(test), decode_func(result))  # pylint: disable=protected-access
+            elif next_result:
+                results += parser._OnTest(decode_func(test), None)  # pylint: disable=protected-access
+                results += parser._OnResult(decode_func(next_result))  # pylint: disable=protected-access
+            else:
+                results += parser.ProcessLine(decode_func(line))
+
+            is_idle = parser._pending_test is None and not parser._is_xdist  # pylint: disable=protected-access
+
+        results += parser.Finalize()
+
+        return results
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self._is_xdist                                  = False
+        self._pending_test: Optional[str]               = None
+
+        # Results on the same line as the test name that were encountered while waiting for the
+        # pending test's result. These are only valid if the pending test never receives a result.
+        self._deferred_results: List[Tuple[str, str]]   = []
+
+    # ----------------------------------------------------------------------
+    def ProcessLine(
+        self,
+        line: str,
+    ) -> List[Tuple[str, str]]:
+        """Returns the names and results of the tests completed by this line."""
+
+        line = line.rstrip("\r\n")
+
+        if line.startswith("[gw"):
+            match = self.__class__._xdist_result_line_regex.match(line)  # pylint: disable=protected-access
+            if match is not None:
+                self._is_xdist = True
+                self._pending_test = None
+                self._deferred_results = []
+
+                return [(match.group("test"), match.group("result")), ]
+
+        if self._is_xdist:
+            return []
+
+        if self._pending_test is not None and line and "A" <= line[0] <= "Z":
+            match = self.__class__._result_line_regex.match(line)  # pylint: disable=protected-access
+            if match is not None:
+                return self._OnResult(match.group("result"))
+
+        if "::" not in line:
+            return []
+
+        match = self.__class__._test_line_regex.match(line)  # pylint: disable=protected-access
+        if match is None:
+            return []
+
+        result_match = self.__class__._result_line_regex.match(match.group("remainder"))  # pylint: disable=protected-access
+
+        return self._OnTest(match.group("test"), None if result_match is None else result_match.group("result"))
+
+    # ----------------------------------------------------------------------
+    def Finalize(self) -> List[Tuple[str, str]]:
+        """Returns the results that are known once all of the output has been processed."""
+
+        # The pending test will never receive a result, which means that the results encountered
+        # after it are valid.
+        results = self._deferred_results
+
+        self._pending_test = None
+        self._deferred_results = []
+
+        return results
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _OnTest(
+        self,
+        test_name: str,
+        result: Optional[str],
+    ) -> List[Tuple[str, str]]:
+        """Updates the state for a test line (that isn't a pytest-xdist result line), where the result is None if it isn't on the same line."""
+
+        if self._is_xdist:
+            return []
+
+        if self._pending_test is not None:
+            if result is not None:
+                self._deferred_results.append((test_name, result))
+
+            return []
+
+        if result is None:
+            self._pending_test = test_name
+            return []
+
+        return [(test_name, result), ]
+
+    # ----------------------------------------------------------------------
+    def _OnResult(
+        self,
+        result: str,
+    ) -> List[Tuple[str, str]]:
+        """Updates the state for a result line."""
+
+        if self._is_xdist or self._pending_test is None:
+            return []
+
+        test_name = self._pending_test
+
+        self._pending_test = None
+        self._deferred_results = []
+
+        return [(test_name, result), ]
+
+    # ----------------------------------------------------------------------
+    _test_line_regex                        = re.compile(
+        r"""(?#
+        Filename                            )(?P<filename>.+\.py)(?#
+        Sep                                 )::(?#
+        Test                                )(?P<test>\S+) +(?#
+        Remainder                           )(?P<remainder>.*)(?#
+        )""",
+    )
+
+    # "Clearing the cache" is suddenly appearing in the standard output of some tests in some
+    # scenarios but not in all. I'm adding the content to this regular expression, but this
+    # could end up being a brittle solution.
+
+    _result_line_regex                      = re.compile(
+        r"""(?#
+        Result                              )(?P<result>[A-Z]+)(?#
+        Reason                              )(?:(?:(?<=SKIPPED)|(?<=XFAIL)|(?<=XPASS)) \(.*\))?(?#
+        "Clearing the cache"                )(:?Clearing the cache)?(?#
+        End of line                         )$(?#
+        )""",
+    )
+
+    _xdist_result_line_regex                = re.compile(
+        r"""(?#
+        Worker                              )\[gw\d+\] (?#
+        Optional percentage                 )(?:\[ *\d+%\] )?(?#
+        Result                              )(?P<result>[A-Z]+) (?#
+        Filename                            )(?P<filename>.+?\.py)(?#
+        Sep                                 )::(?#
+        Test                                )(?P<test>.+?)(?#
+        Shard group suffix                  )(?:@\S*tester_shard_\d+)?(?#
+        End of line                         ) *$(?#
+        )""",
+    )
+
+    # Lines that can change the state of the parser (other lines are ignored by ProcessLine). The
+    # newline before each line is matched rather than the start of the line so that the regex engine
+    # can quickly skip to the next line. Groups:
+    #
+    #   test, result:       A test line with the result on the same line.
+    #   test, next_result:  A test line without a result, followed by lines that can't change the
+    #                       state of the parser and then a result line.
+    #   line:               Any other line that can change the state of the parser.
+    #
+    # The test and result groups have the values that _test_line_regex and _result_line_regex would
+    # extract from a test line, as the regexes attempt the same matches in the same order.
+    _significant_lines_regex                = re.compile(
+        r"""(?#
+        Start of line                       )\n(?:(?#
+        +Test                               )(?:(?#
+            Not pytest-xdist                )(?!\[gw)(?#
+            Filename                        ).+\.py(?#
+            Sep                             )::(?#
+            Test                            )(?P<test>\S+) +(?:(?#
+            +Result on the same line        )(?:(?#
+                Result                      )(?P<result>[A-Z]+)(?#
+                Reason                      )(?:(?:(?<=SKIPPED)|(?<=XFAIL)|(?<=XPASS)) \(.*\))?(?#
+                "Clearing the cache"        )(?::?Clearing the cache)?(?#
+                End of line                 )\r?$(?#
+            -Result on the same line        ))(?#
+            +Result on a subsequent line    )|(?:(?#
+                Remainder                   ).*(?#
+                Output                      )(?:\n(?!(?#
+                    Result                  )[A-Z]+(?:(?:(?<=SKIPPED)|(?<=XFAIL)|(?<=XPASS)) \(.*\))?(?::?Clearing the cache)?\r?$|(?#
+                    Test                    ).+\.py::(?#
+                ))(?#
+                    Line                    ).*(?#
+                ))*(?#
+                Newline                     )\n(?#
+                Result                      )(?P<next_result>[A-Z]+)(?#
+                Reason                      )(?:(?:(?<=SKIPPED)|(?<=XFAIL)|(?<=XPASS)) \(.*\))?(?#
+                "Clearing the cache"        )(?::?Clearing the cache)?(?#
+                End of line                 )\r?$(?#
+            -Result on a subsequent line    ))(?#
+        -Test                               )))(?#
+        +Other                              )|(?P<line>(?#
+            +Result                         )(?:(?#
+                Result                      )[A-Z]+(?#
+                Reason                      )(?:(?:(?<=SKIPPED)|(?<=XFAIL)|(?<=XPASS)) \(.*\))?(?#
+                "Clearing the cache"        )(?::?Clearing the cache)?(?#
+                End of line                 )\r?$(?#
+            -Result                         ))(?#
+            +Test or pytest-xdist result    )|(?:(?#
+                Filename                    ).+\.py(?#
+                Sep                         )::(?#
+                Remainder                   ).*(?#
+            -Test or pytest-xdist result    ))(?#
+        -Other                              ))(?#
+        ))""",
+        re.MULTILINE,
+    )
+
+    _significant_lines_bytes_regex          = re.compile(_significant_lines_regex.pattern.encode("utf-8"), re.MULTILINE)
+
+
+# ----------------------------------------------------------------------
+class ProgressMonitor(object):
+    """\
+    Reports the progress of a pytest invocation as its verbose output is produced.
+
+    The expected number of tests is extracted from pytest's 'collected N items' line (unless it is
+    provided). Results that have already been extracted from the output can be reported with
+    `OnResult`.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        on_progress_func: Callable[
+            [
+                int,                        # Step (0-based)
+                str,                        # Status
+            ],
+            bool,                           # True to continue, False to terminate
+        ],
+        num_expected: Optional[int]=None,
+    ):
+        self.num_expected: Optional[int]    = num_expected
+        self.num_passed                     = 0
+        self.num_failed                     = 0
+        self.num_completed                  = 0
+
+        self.is_canceled                    = False
+
+        self._on_progress_func              = on_progress_func
+
+        self._parser                        = VerboseOutputParser()
+        self._partial_line                  = bytearray()
+
+    # ----------------------------------------------------------------------
+    def Write(
+        self,
+        content: bytes,
+    ) -> bool:
+        """Returns False if the invocation should be terminated."""
+
+        self._partial_line += content
+
+        if b"\n" not in content:
+            # Only the beginning of a line is significant, so don't allow the buffer to grow
+            # without bound when a test writes a lot of output without a newline.
+            if len(self._partial_line) > _MAX_LINE_SIZE:
+                del self._partial_line[_MAX_LINE_SIZE:]
+
+            return not self.is_canceled
+
+        lines = self._partial_line.split(b"\n")
+
+        self._partial_line = lines.pop()
+
+        for line in lines:
+            if self.is_canceled:
+                break
+
+            self._ProcessLine(line[:_MAX_LINE_SIZE].decode("utf-8", errors="replace"))
+
+        return not self.is_canceled
+
+    # ----------------------------------------------------------------------
+    def OnResult(
+        self,
+        result: str,                        # Verbose result (for example, 'PASSED')
+    ) -> bool:
+        """Reports the completion of a test; returns False if the invocation should be terminated."""
+
+        if self.is_canceled:
+            return False
+
+        self.num_completed += 1
+
+        if result in ["PASSED", "XPASS"]:
+            self.num_passed += 1
+        elif result in ["FAILED", "ERROR"]:
+            self.num_failed += 1
+
+        if not self._on_progress_func(
+            self.num_completed - 1,
+            "{}{} passed, {} failed".format(
+                self.num_passed,
+                "" if self.num_expected is None else "/{}".format(self.num_expected),
+                self.num_failed,
+            ),
+        ):
+            self.is_canceled = True
+
+        return not self.is_canceled
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _ProcessLine(
+        self,
+        line: str,
+    ) -> None:
+        if self.num_expected is None and " item" in line:
+            match = self.__class__._collected_regex.search(line)  # pylint: disable=protected-access
+            if match is not None:
+                self.num_expected = int(match.group("selected") or match.group("collected") or match.group("xdist"))
+
+        for _, result in self._parser.ProcessLine(line):
+            if not self.OnResult(result):
+                break
+
+    # ----------------------------------------------------------------------
+    _collected_regex                        = re.compile(
+        r"""(?#
+        +Standard                           )(?:(?#
+            Collected                       )collected (?P<collected>\d+) items?(?#
+            Deselected                      )(?: / \d+ deselected)?(?#
+            Selected                        )(?: / (?P<selected>\d+) selected)?(?#
+        -Standard                           ))(?#
+        +pytest-xdist                       )|(?:(?#
+            Workers                         )\d+ workers? (?#
+            Items                           )\[(?P<xdist>\d+) items?\](?#
+        -pytest-xdist                       ))(?#
+        )""",
+    )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_MAX_LINE_SIZE                              = 64 * 1024
@@ -0,0 +1,117 @@
+# ----------------------------------------------------------------------
+# |
+# |  BenchmarkHistory_UnitTest.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:55:13
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for BenchmarkHistory"""
+
+import os
+import sys
+
+from pathlib import Path
+from typing import Any, Dict
+
+from Common_Foundation.ContextlibEx import ExitStack
+
+
+# ----------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent))
+with ExitStack(lambda: sys.path.pop(0)):
+    assert os.path.isdir(sys.path[0]), sys.path[0]
+
+    import BenchmarkHistory
+
+
+# ----------------------------------------------------------------------
+def test_Regression(tmp_path):
+    history_filename = tmp_path / "history.db"
+
+    # Regressions aren't reported until there is a baseline
+    for _ in range(BenchmarkHistory.MIN_BASELINE_SIZE):
+        assert _Update(history_filename, _CreateBenchmark("Bench", 1.0)) == []
+
+    regressions = _Update(history_filename, _CreateBenchmark("Bench", 1.5))
+
+    assert [regression.name for regression in regressions] == ["Bench"]
+    assert regressions[0].baseline_median == 1.0
+    assert regressions[0].percentage == 50.0
+    assert regressions[0].ToString() == "Bench (+50.0%)"
+
+    # Within the threshold
+    assert _Update(history_filename, _CreateBenchmark("Bench", 1.05)) == []
+
+
+# ----------------------------------------------------------------------
+def test_Noise(tmp_path):
+    history_filename = tmp_path / "history.db"
+
+    for _ in range(BenchmarkHistory.MIN_BASELINE_SIZE):
+        _Update(history_filename, _CreateBenchmark("Quiet", 1.0), _CreateBenchmark("Noisy", 1.0))
+
+    # The noise level of each benchmark only impacts that benchmark
+    regressions = _Update(
+        history_filename,
+        _CreateBenchmark("Quiet", 1.3),
+        _CreateBenchmark("Noisy", 1.3),
+        noise_percentages={"Quiet": 5.0, "Noisy": 40.0},
+    )
+
+    assert [regression.name for regression in regressions] == ["Quiet"]
+
+    # The noise recorded with the baseline is used when it is larger than the current noise level
+    regressions = _Update(
+        history_filename,
+        _CreateBenchmark("Quiet", 1.3),
+        _CreateBenchmark("Noisy", 1.3),
+        noise_percentages={"Quiet": 5.0, "Noisy": 5.0},
+    )
+
+    assert [regression.name for regression in regressions] == ["Quiet"]
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateBenchmark(
+    name: str,
+    median: float,
+) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "stats": {
+            "min": median,
+            "max": median,
+            "mean": median,
+            "stddev": 0.0,
+            "median": median,
+            "iqr": 0.0,
+            "rounds": 10,
+            "iterations": 1,
+        },
+    }
+
+
+# ----------------------------------------------------------------------
+def _Update(
+    history_filename: Path,
+    *benchmarks: Dict[str, Any],
+    **kwargs,
+):
+    return BenchmarkHistory.Update(
+        history_filename,
+        Path("test_File.py"),
+        "3.11 / pytest / benchmark",
+        None,
+        list(benchmarks),
+        **kwargs,
+    )
@@ -0,0 +1,242 @@
+# ----------------------------------------------------------------------
+# |
+# |  PytestForkServer_UnitTest.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:50:37
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for PytestForkServer"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import threading
+
+from pathlib import Path
+
+import pytest
+
+from Common_Foundation.ContextlibEx import ExitStack
+
+
+# ----------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent))
+with ExitStack(lambda: sys.path.pop(0)):
+    assert os.path.isdir(sys.path[0]), sys.path[0]
+
+    import PytestForkServer
+
+
+# ----------------------------------------------------------------------
+def test_CommandLine():
+    pytest_command_line = 'pytest --verbose "test_File.py"'
+
+    command_line = PytestForkServer.CreateCommandLine(pytest_command_line, [])
+    assert command_line != pytest_command_line
+    assert PytestForkServer.ToPytestCommandLine(command_line) == pytest_command_line
+
+    command_line = PytestForkServer.CreateCommandLine(pytest_command_line, ["one", "two"])
+    assert '"--preload=one,two"' in command_line
+    assert PytestForkServer.ToPytestCommandLine(command_line) == pytest_command_line
+
+    # Command lines that weren't created by CreateCommandLine aren't modified
+    assert PytestForkServer.ToPytestCommandLine(pytest_command_line) == pytest_command_line
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not available")
+class TestFrames(object):
+    # ----------------------------------------------------------------------
+    def test_RoundTrip(self):
+        client, server = socket.socketpair()
+
+        with client, server:
+            PytestForkServer._SendFrame(client, PytestForkServer._REQUEST_FRAME, b'{"args": []}')
+            PytestForkServer._SendFrame(client, PytestForkServer._SIGNAL_FRAME, b"")
+            PytestForkServer._SendFrame(server, PytestForkServer._EXIT_FRAME, PytestForkServer._EXIT_CODE.pack(-15))
+
+            assert PytestForkServer._ReceiveFrame(server) == (PytestForkServer._REQUEST_FRAME, b'{"args": []}')
+            assert PytestForkServer._ReceiveFrame(server) == (PytestForkServer._SIGNAL_FRAME, b"")
+
+            frame_type, payload = PytestForkServer._ReceiveFrame(client)
+            assert frame_type == PytestForkServer._EXIT_FRAME
+            assert PytestForkServer._EXIT_CODE.unpack(payload)[0] == -15
+
+    # ----------------------------------------------------------------------
+    def test_LargePayload(self):
+        # The payload is larger than the socket buffers, so it is received in multiple chunks
+        payload = bytes(range(256)) * 16 * 1024
+
+        client, server = socket.socketpair()
+
+        with client, server:
+            thread = threading.Thread(
+                target=lambda: PytestForkServer._SendFrame(client, PytestForkServer._OUTPUT_FRAME, payload),
+            )
+
+            thread.start()
+            try:
+                assert PytestForkServer._ReceiveFrame(server) == (PytestForkServer._OUTPUT_FRAME, payload)
+            finally:
+                thread.join()
+
+    # ----------------------------------------------------------------------
+    def test_ConnectionLost(self):
+        client, server = socket.socketpair()
+
+        with server:
+            with client:
+                # Only part of the frame is sent before the connection is closed
+                client.sendall(PytestForkServer._FRAME_HEADER.pack(PytestForkServer._OUTPUT_FRAME, 100) + b"partial")
+
+            assert PytestForkServer._ReceiveFrame(server) is None
+
+        client, server = socket.socketpair()
+
+        with server:
+            client.close()
+            assert PytestForkServer._ReceiveFrame(server) is None
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.skipif(not PytestForkServer._IsForkSafe(), reason="The fork server is not supported on this platform")
+class TestServer(object):
+    # ----------------------------------------------------------------------
+    @pytest.fixture
+    def workspace(self, tmp_path, monkeypatch):
+        runtime_dir = tmp_path / "runtime"
+        runtime_dir.mkdir(0o700)
+        runtime_dir.chmod(0o700)
+
+        modules_dir = tmp_path / "modules"
+        modules_dir.mkdir()
+
+        (modules_dir / "preloaded_module.py").write_text("VALUE = 1\n", encoding="utf-8")
+
+        tests_dir = tmp_path / "tests"
+        tests_dir.mkdir()
+
+        (tests_dir / "test_Generated.py").write_text(
+            textwrap.dedent(
+                """\
+                import sys
+
+                PRELOADED = "preloaded_module" in sys.modules
+
+                import preloaded_module
+
+                def test_Preloaded():
+                    print("preloaded: {}".format(PRELOADED))
+
+                def test_Failed():
+                    assert preloaded_module.VALUE == 2
+                """,
+            ),
+            encoding="utf-8",
+        )
+
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(runtime_dir))
+        monkeypatch.setenv("PYTHONPATH", str(modules_dir))
+
+        yield modules_dir, tests_dir
+
+        # Terminate any servers that are still running
+        for socket_filename in (runtime_dir / PytestForkServer._SERVER_DIRECTORY_NAME).glob("*.sock"):
+            connection = PytestForkServer._TryConnect(socket_filename)
+            if connection is None:
+                continue
+
+            with connection:
+                pid, _, _ = PytestForkServer._PEER_CREDENTIALS.unpack(
+                    connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, PytestForkServer._PEER_CREDENTIALS.size),  # pylint: disable=no-member
+                )
+
+            os.kill(pid, signal.SIGTERM)
+
+    # ----------------------------------------------------------------------
+    def test_Standard(self, workspace):
+        _, tests_dir = workspace
+
+        # The first invocation starts the server; the module is imported by the server and the
+        # failure is reported via the exit code.
+        exit_code, output = _Run(tests_dir)
+        assert exit_code == 1, output
+        assert "preloaded: True" in output
+        assert "1 failed, 1 passed" in output
+
+        # The second invocation uses the server started by the first
+        exit_code, output = _Run(tests_dir)
+        assert exit_code == 1, output
+        assert "preloaded: True" in output
+
+        # Exit codes other than 1 are returned
+        exit_code, output = _Run(tests_dir, "-k", "test_Preloaded")
+        assert exit_code == 0, output
+        assert "1 passed" in output
+
+    # ----------------------------------------------------------------------
+    def test_ModifiedModule(self, workspace):
+        modules_dir, tests_dir = workspace
+
+        exit_code, output = _Run(tests_dir)
+        assert exit_code == 1, output
+        assert "preloaded: True" in output
+
+        module_filename = modules_dir / "preloaded_module.py"
+
+        module_filename.write_text("VALUE = 2\n", encoding="utf-8")
+
+        # Ensure that the modification time changes on file systems with a coarse resolution
+        info = module_filename.stat()
+        os.utime(module_filename, ns=(info.st_atime_ns, info.st_mtime_ns + 2_000_000_000))
+
+        # The server refuses the request and exits, so pytest is invoked normally (and sees the
+        # modified module).
+        exit_code, output = _Run(tests_dir)
+        assert exit_code == 0, output
+        assert "preloaded: False" in output
+        assert "2 passed" in output
+
+        # A new server is started with the modified module
+        exit_code, output = _Run(tests_dir)
+        assert exit_code == 0, output
+        assert "preloaded: True" in output
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Run(
+    tests_dir: Path,
+    *args: str,
+):
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(Path(PytestForkServer.__file__).resolve()),
+            "--preload=preloaded_module",
+            "--",
+            "--capture=no",
+            "-p",
+            "no:cacheprovider",
+            "test_Generated.py",
+        ] + list(args),
+        cwd=tests_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        check=False,
+        timeout=120,
+    )
+
+    return result.returncode, result.stdout.decode("utf-8")
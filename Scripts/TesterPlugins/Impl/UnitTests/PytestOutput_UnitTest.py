@@ -0,0 +1,327 @@
+# ----------------------------------------------------------------------
+# |
+# |  PytestOutput_UnitTest.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:46:21
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for PytestOutput"""
+
+import mmap
+import os
+import subprocess
+import sys
+import textwrap
+
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from Common_Foundation.ContextlibEx import ExitStack
+
+
+# ----------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent))
+with ExitStack(lambda: sys.path.pop(0)):
+    assert os.path.isdir(sys.path[0]), sys.path[0]
+
+    from PytestOutput import ProgressMonitor, VerboseOutputParser
+
+
+# ----------------------------------------------------------------------
+class TestVerboseOutputParser(object):
+    # ----------------------------------------------------------------------
+    @pytest.mark.parametrize(
+        "content, expected",
+        [
+            # Results on the same line
+            (
+                """\
+                test_File.py::test_One PASSED
+                test_File.py::test_Two FAILED
+                test_File.py::TestClass::test_Method[param-1] ERROR
+                """,
+                [("test_One", "PASSED"), ("test_Two", "FAILED"), ("TestClass::test_Method[param-1]", "ERROR")],
+            ),
+            # Output written by the test before its result
+            (
+                """\
+                test_File.py::test_One Output
+                More output
+                PASSED
+                test_File.py::test_Two FAILED
+                """,
+                [("test_One", "PASSED"), ("test_Two", "FAILED")],
+            ),
+            # Reasons written after results
+            (
+                """\
+                test_File.py::test_One SKIPPED (unconditional skip)
+                test_File.py::test_Two XFAIL (known problem)
+                test_File.py::test_Three XPASS (expected to fail)
+                test_File.py::test_Four Output
+                SKIPPED (skipped while running)
+                test_File.py::test_Five PASSED
+                """,
+                [("test_One", "SKIPPED"), ("test_Two", "XFAIL"), ("test_Three", "XPASS"), ("test_Four", "SKIPPED"), ("test_Five", "PASSED")],
+            ),
+            # Only skipped tests and expected failures have reasons
+            (
+                """\
+                test_File.py::test_One Output
+                PASSED (not a result)
+                PASSED
+                """,
+                [("test_One", "PASSED")],
+            ),
+            # "Clearing the cache" written after the result
+            (
+                """\
+                test_File.py::test_One PASSEDClearing the cache
+                test_File.py::test_Two PASSED
+                """,
+                [("test_One", "PASSED"), ("test_Two", "PASSED")],
+            ),
+            # A test line (with a result) written by a test is ignored when the test has a result
+            (
+                """\
+                test_File.py::test_One Output
+                test_Other.py::test_Inner PASSED
+                FAILED
+                test_File.py::test_Two PASSED
+                """,
+                [("test_One", "FAILED"), ("test_Two", "PASSED")],
+            ),
+            # ...but is a result when the test never has a result (for example, when the process crashes)
+            (
+                """\
+                test_File.py::test_One Output
+                test_Other.py::test_Inner PASSED
+                Fatal Python error: Aborted
+                """,
+                [("test_Inner", "PASSED")],
+            ),
+            # pytest-xdist
+            (
+                """\
+                2 workers [3 items]
+
+                test_File.py::test_One
+                test_File.py::test_Two
+                test_File.py::test_Three@tester_shard_1
+                [gw0] [ 33%] PASSED test_File.py::test_Two
+                [gw1] FAILED test_File.py::test_One
+                [gw1] [100%] SKIPPED test_File.py::test_Three@tester_shard_1
+                """,
+                [("test_Two", "PASSED"), ("test_One", "FAILED"), ("test_Three", "SKIPPED")],
+            ),
+        ],
+    )
+    def test_Parse(self, content, expected, tmp_path):
+        content = textwrap.dedent(content)
+
+        assert VerboseOutputParser.Parse(content) == expected
+        assert VerboseOutputParser.Parse(content.replace("\n", "\r\n")) == expected
+
+        # Content that is too large to retain in memory is parsed from a memory map
+        filename = tmp_path / "output.txt"
+        filename.write_bytes(content.encode("utf-8"))
+
+        with filename.open("rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content_map:
+                assert VerboseOutputParser.Parse(content_map) == expected
+
+        # Parse (which scans for significant lines) and ProcessLine produce the same results
+        parser = VerboseOutputParser()
+        results: List[Tuple[str, str]] = []
+
+        for line in content.splitlines(True):
+            results += parser.ProcessLine(line)
+
+        results += parser.Finalize()
+
+        assert results == expected
+
+    # ----------------------------------------------------------------------
+    @pytest.mark.parametrize("use_xdist", [False, True])
+    def test_PytestOutput(self, use_xdist, tmp_path):
+        if use_xdist:
+            pytest.importorskip("xdist")
+
+        (tmp_path / "test_Generated.py").write_text(
+            textwrap.dedent(
+                """\
+                import pytest
+
+                def test_Passed():
+                    pass
+
+                def test_Output():
+                    print("Output written by the test")
+
+                def test_Failed():
+                    assert False
+
+                @pytest.mark.skip(reason="a reason")
+                def test_Skipped():
+                    pass
+
+                def test_SkippedWhileRunning():
+                    print("Output written by the test")
+                    pytest.skip("a reason")
+
+                @pytest.mark.xfail(reason="a reason")
+                def test_Xfail():
+                    assert False
+
+                @pytest.mark.xfail
+                def test_Xpass():
+                    pass
+
+                @pytest.mark.parametrize("value", [1, 2])
+                def test_Parametrized(value):
+                    pass
+                """,
+            ),
+            encoding="utf-8",
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "--verbose", "-vv", "--capture=no", "-p", "no:cacheprovider"]
+            + (["--numprocesses=2"] if use_xdist else [])
+            + ["test_Generated.py"],
+            cwd=tmp_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            check=False,
+        )
+
+        assert sorted(VerboseOutputParser.Parse(result.stdout.decode("utf-8"))) == [
+            ("test_Failed", "FAILED"),
+            ("test_Output", "PASSED"),
+            ("test_Parametrized[1]", "PASSED"),
+            ("test_Parametrized[2]", "PASSED"),
+            ("test_Passed", "PASSED"),
+            ("test_Skipped", "SKIPPED"),
+            ("test_SkippedWhileRunning", "SKIPPED"),
+            ("test_Xfail", "XFAIL"),
+            ("test_Xpass", "XPASS"),
+        ]
+
+
+# ----------------------------------------------------------------------
+class TestProgressMonitor(object):
+    # ----------------------------------------------------------------------
+    def test_Standard(self):
+        progress: List[Tuple[int, str]] = []
+
+        monitor = ProgressMonitor(lambda step, status: progress.append((step, status)) or True)
+
+        assert monitor.Write(_VERBOSE_OUTPUT.encode("utf-8")) is True
+
+        assert progress == [
+            (0, "1/3 passed, 0 failed"),
+            (1, "1/3 passed, 1 failed"),
+            (2, "1/3 passed, 1 failed"),
+        ]
+
+        assert monitor.num_expected == 3
+        assert monitor.num_completed == 3
+
+    # ----------------------------------------------------------------------
+    def test_PartialWrites(self):
+        progress: List[Tuple[int, str]] = []
+
+        monitor = ProgressMonitor(lambda step, status: progress.append((step, status)) or True)
+
+        content = _VERBOSE_OUTPUT.encode("utf-8")
+
+        # Lines are split across writes
+        for index in range(0, len(content), 7):
+            assert monitor.Write(content[index:index + 7]) is True
+
+        assert [step for step, _ in progress] == [0, 1, 2]
+        assert progress[-1] == (2, "1/3 passed, 1 failed")
+
+    # ----------------------------------------------------------------------
+    def test_Xdist(self):
+        progress: List[Tuple[int, str]] = []
+
+        monitor = ProgressMonitor(lambda step, status: progress.append((step, status)) or True)
+
+        monitor.Write(
+            textwrap.dedent(
+                """\
+                created: 2/2 workers
+                2 workers [2 items]
+
+                test_File.py::test_One
+                test_File.py::test_Two
+                [gw1] [ 50%] PASSED test_File.py::test_Two
+                [gw0] [100%] FAILED test_File.py::test_One
+                """,
+            ).encode("utf-8"),
+        )
+
+        assert progress == [
+            (0, "1/2 passed, 0 failed"),
+            (1, "1/2 passed, 1 failed"),
+        ]
+
+    # ----------------------------------------------------------------------
+    def test_Cancel(self):
+        progress: List[Tuple[int, str]] = []
+
+        monitor = ProgressMonitor(lambda step, status: progress.append((step, status)) or step < 1)
+
+        assert monitor.Write(_VERBOSE_OUTPUT.encode("utf-8")) is False
+        assert monitor.is_canceled
+
+        # Nothing is reported once canceled
+        assert monitor.Write(b"test_File.py::test_Four PASSED\n") is False
+        assert len(progress) == 2
+
+    # ----------------------------------------------------------------------
+    def test_OnResult(self):
+        progress: List[Tuple[int, str]] = []
+
+        monitor = ProgressMonitor(lambda step, status: progress.append((step, status)) or True, 4)
+
+        for result in ["PASSED", "ERROR", "XPASS", "SKIPPED"]:
+            assert monitor.OnResult(result) is True
+
+        assert progress == [
+            (0, "1/4 passed, 0 failed"),
+            (1, "1/4 passed, 1 failed"),
+            (2, "2/4 passed, 1 failed"),
+            (3, "2/4 passed, 1 failed"),
+        ]
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_VERBOSE_OUTPUT                             = textwrap.dedent(
+    """\
+    ============================= test session starts ==============================
+    platform linux -- Python 3.11.7, pytest-9.1.1, pluggy-1.6.0
+    collecting ... collected 3 items
+
+    test_File.py::test_One PASSED
+    test_File.py::test_Two Output written by the test
+    more output
+    FAILED
+    test_File.py::test_Three SKIPPED
+
+    =================================== FAILURES ===================================
+    """,
+)
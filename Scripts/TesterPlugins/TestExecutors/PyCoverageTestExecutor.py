@@ -15,21 +15,31 @@
 # ----------------------------------------------------------------------
 """Extracts code coverage information using coverage."""
 
+import bisect
+import dataclasses
 import datetime
+import json
 import os
 import re
 import shlex
+import shutil
+import subprocess
 import sys
 import textwrap
 import time
 
+from enum import Enum
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
 from xml.etree import ElementTree as ET
 
+import typer
+
+from typer.core import TyperGroup
+
 from Common_Foundation.ContextlibEx import ExitStack
 from Common_Foundation.Shell.All import CurrentShell
-from Common_Foundation.Streams.DoneManager import DoneManager
+from Common_Foundation.Streams.DoneManager import DoneManager, DoneManagerFlags
 from Common_Foundation import SubprocessEx
 from Common_Foundation.Types import EnsureValid, overridemethod
 
@@ -44,6 +54,28 @@ with ExitStack(lambda: sys.path.pop(0)):
     assert os.path.isdir(sys.path[0])
     from StandardTestExecutor import TestExecutor as StandardTestExecutor  # type: ignore  # pylint: disable=import-error
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "Impl"))
+with ExitStack(lambda: sys.path.pop(0)):
+    assert os.path.isdir(sys.path[0])
+    import CapturedProcess  # pylint: disable=import-error
+    import PytestForkServer  # pylint: disable=import-error
+    import PytestOutput  # pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+class NaturalOrderGrouper(TyperGroup):
+    # ----------------------------------------------------------------------
+    def list_commands(self, *args, **kwargs):  # pylint: disable=unused-argument
+        return self.commands.keys()
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    cls=NaturalOrderGrouper,
+    no_args_is_help=True,
+    pretty_exceptions_show_locals=False,
+)
+
 
 # ----------------------------------------------------------------------
 class TestExecutor(TestExecutorImpl):
@@ -65,11 +97,49 @@ class TestExecutor(TestExecutorImpl):
         # ...
         # code_coverage: exclude = <Relative or full path to Python File #N>
 
+        # code_coverage: subprocesses
+
+    'subprocesses' measures code executed in processes spawned by the test (for example, via
+    `multiprocessing`, `concurrent.futures.ProcessPoolExecutor`, or `subprocess`). This behavior
+    can also be enabled for all test files via the command line.
+
+    When a git ref is provided on the command line, diff coverage (the coverage of lines that have
+    changed since that ref, including the lines in files that aren't tracked by git) is calculated in
+    addition to the total coverage. The diff coverage of each file is written to the test output and
+    to 'diff_coverage.json' in the output directory. If it can't be calculated (for example, because
+    the ref doesn't exist in a shallow clone), the error is written to the test output and the total
+    coverage is still reported.
+
+    HTML coverage reports are not generated while the test is running. Depending on the command
+    line, reports are generated by a background process once coverage information has been
+    extracted or on demand via this script's 'GenerateHtml' command. coverage.py only re-renders
+    files whose coverage data has changed since the report was last generated.
+
     Note that in no comment values are extracted from the source, the code will make a best-
     guess to find the production code based on the compiler being used.
     """
 
     # ----------------------------------------------------------------------
+    # |  Public Types
+    SUBPROCESSES_ATTRIBUTE_NAME             = "coverage_subprocesses"
+    DIFF_REF_ATTRIBUTE_NAME                 = "coverage_diff_ref"
+    HTML_REPORT_ATTRIBUTE_NAME              = "coverage_html"
+    OUTPUT_HEAD_SIZE_ATTRIBUTE_NAME         = "output_head_size"
+    OUTPUT_TAIL_SIZE_ATTRIBUTE_NAME         = "output_tail_size"
+    TIMEOUT_ATTRIBUTE_NAME                  = "test_file_timeout"
+
+    OUTPUT_FILENAME                         = "test_output.txt"
+    RESOURCE_USAGE_FILENAME                 = "resource_usage.json"
+    DIFF_COVERAGE_FILENAME                  = "diff_coverage.json"
+
+    # ----------------------------------------------------------------------
+    class HtmlReport(str, Enum):
+        Disabled                            = "disabled"
+        Background                          = "background"  # Generated by a background process
+        Lazy                                = "lazy"        # Generated on demand via 'GenerateHtml'
+
+    # ----------------------------------------------------------------------
+    # |  Public Methods
     def __init__(self):
         super(TestExecutor, self).__init__(
             "PyCoverage",
@@ -80,8 +150,47 @@ class TestExecutor(TestExecutorImpl):
     # ----------------------------------------------------------------------
     @overridemethod
     def GetCustomCommandLineArgs(self) -> TyperEx.TypeDefinitionsType:
-        # No custom argument support
-        return {}
+        return {
+            self.__class__.SUBPROCESSES_ATTRIBUTE_NAME: (
+                bool,
+                {
+                    "help": "Measure code coverage in processes spawned by the test (multiprocessing, subprocess, etc.).",
+                },
+            ),
+            self.__class__.DIFF_REF_ATTRIBUTE_NAME: (
+                str,
+                {
+                    "help": "Git ref used to calculate diff coverage (the coverage of lines changed since the ref).",
+                },
+            ),
+            self.__class__.HTML_REPORT_ATTRIBUTE_NAME: (
+                self.__class__.HtmlReport,
+                {
+                    "help": "Generate HTML coverage reports in the background or on demand (via this script's 'GenerateHtml' command).",
+                },
+            ),
+            self.__class__.OUTPUT_HEAD_SIZE_ATTRIBUTE_NAME: (
+                int,
+                {
+                    "min": 0,
+                    "help": "Number of bytes at the beginning of the test output retained in memory; the complete output is written to '{}' in the output directory.".format(self.__class__.OUTPUT_FILENAME),
+                },
+            ),
+            self.__class__.OUTPUT_TAIL_SIZE_ATTRIBUTE_NAME: (
+                int,
+                {
+                    "min": 0,
+                    "help": "Number of bytes at the end of the test output retained in memory; the complete output is written to '{}' in the output directory.".format(self.__class__.OUTPUT_FILENAME),
+                },
+            ),
+            self.__class__.TIMEOUT_ATTRIBUTE_NAME: (
+                float,
+                {
+                    "min": 0.0,
+                    "help": "Write the stacks of all threads and terminate the test process tree if the test file takes longer than this number of seconds.",
+                },
+            ),
+        }
 
     # ----------------------------------------------------------------------
     @overridemethod
@@ -116,6 +225,9 @@ class TestExecutor(TestExecutorImpl):
             bool,                           # True to continue, False to terminate
         ],
     ) -> Tuple[ExecuteResult, str]:
+        # Coverage doesn't measure processes forked from the fork server, so invoke pytest normally
+        command_line = PytestForkServer.ToPytestCommandLine(command_line)
+
         includes: List[str] = []
         excludes: List[str] = []
 
@@ -128,6 +240,11 @@ class TestExecutor(TestExecutorImpl):
 
         # Attempt to extract include and exclude information from the source
         disable_code_coverage = False
+        measure_subprocesses = bool(context.get(self.__class__.SUBPROCESSES_ATTRIBUTE_NAME, False))
+
+        # Tests distributed by pytest-xdist run in worker processes
+        if re.search(r"(?:^|\s)(?:-n|--numprocesses)[\s=]", command_line):
+            measure_subprocesses = True
 
         if not disable_code_coverage:
             regex = re.compile(
@@ -155,6 +272,9 @@ class TestExecutor(TestExecutorImpl):
                 if action == "disable":
                     disable_code_coverage = True
 
+                elif action == "subprocesses":
+                    measure_subprocesses = True
+
                 elif action in ["include", "exclude"]:
                     referenced_filename = (filename.parent / match.group("name")).resolve()
 
@@ -200,6 +320,20 @@ class TestExecutor(TestExecutorImpl):
 
                 includes.append("*/{}".format("/".join(reversed(path_parts))))
 
+        output_dir = Path(context["output_dir"])
+
+        # Configure coverage for child processes
+        rcfile_arg = ""
+        test_env: Optional[Dict[str, str]] = None
+
+        raw_coverage_data_filename = Path(os.getenv("COVERAGE_FILE") or ".coverage")
+
+        if measure_subprocesses:
+            rcfile, test_env = _CreateSubprocessConfiguration(output_dir, includes, excludes)
+            rcfile_arg = ' "--rcfile={}"'.format(rcfile)
+
+            raw_coverage_data_filename = rcfile.parent / ".coverage"
+
         # Run the process and calculate code coverage
         if command_line.startswith("python"):
             temp_filename = CurrentShell.CreateTempFilename(".py")
@@ -215,33 +349,70 @@ class TestExecutor(TestExecutorImpl):
                     ),
                 )
 
-            coverage_command_line_template = 'python "{}" run{{include}}{{omit}} "{}"'.format(temp_filename, filename)
+            coverage_command_line_template = 'python "{}" run{{rcfile}}{{include}}{{omit}} "{}"'.format(temp_filename, filename)
             cleanup_func = temp_filename.unlink
         else:
-            coverage_command_line_template = 'coverage run{{include}}{{omit}} -m {}'.format(command_line)
+            coverage_command_line_template = 'coverage run{{rcfile}}{{include}}{{omit}} -m {}'.format(command_line)
             cleanup_func = lambda: None
 
         # Execute the test
         test_execution_time: Optional[datetime.timedelta] = None
         test_result: Optional[int] = None
         test_output: Optional[str] = None
+        test_resource_usage: Optional[CapturedProcess.ResourceUsage] = None
+        test_timed_out = False
+        test_canceled = False
 
         with ExitStack(cleanup_func):
             # Run the process
             test_start_time = time.time()
 
             test_command_line = coverage_command_line_template.format(
+                rcfile=rcfile_arg,
                 include=' "--include={}"'.format(",".join(includes)) if includes else "",
                 omit=' "--omit={}"'.format(",".join(excludes)) if excludes else "",
             )
 
             dm.WriteLine("Decorated Command Line: {}\n\n".format(test_command_line))
 
-            result = SubprocessEx.Run(test_command_line)
+            # Chatty tests can generate an enormous amount of output, so write it to disk and only
+            # retain the beginning and end in memory.
+            with CapturedProcess.OutputCapture(
+                output_dir / self.__class__.OUTPUT_FILENAME,
+                _GetOptionalInt(context, self.__class__.OUTPUT_HEAD_SIZE_ATTRIBUTE_NAME, CapturedProcess.DEFAULT_HEAD_SIZE),
+                _GetOptionalInt(context, self.__class__.OUTPUT_TAIL_SIZE_ATTRIBUTE_NAME, CapturedProcess.DEFAULT_TAIL_SIZE),
+            ) as capture:
+                on_output_func: Callable[[bytes], Optional[bool]] = capture.Write
+
+                if command_line.startswith("pytest"):
+                    # Report progress as each test completes, rather than waiting for the process
+                    # to exit.
+                    progress_monitor = PytestOutput.ProgressMonitor(on_progress)
+
+                    # ----------------------------------------------------------------------
+                    def OnOutput(
+                        content: bytes,
+                    ) -> bool:
+                        capture.Write(content)
+                        return progress_monitor.Write(content)
+
+                    # ----------------------------------------------------------------------
+
+                    on_output_func = OnOutput
+
+                result = CapturedProcess.Run(
+                    test_command_line,
+                    on_output_func,
+                    env=test_env,
+                    timeout=context.get(self.__class__.TIMEOUT_ATTRIBUTE_NAME, None) or None,
+                )
 
             test_execution_time = datetime.timedelta(seconds=time.time() - test_start_time)
             test_result = result.returncode
-            test_output = result.output
+            test_output = capture.GetOutput()
+            test_resource_usage = result.resource_usage
+            test_timed_out = result.timed_out
+            test_canceled = result.canceled
 
         assert test_execution_time is not None
         assert test_result is not None
@@ -250,19 +421,35 @@ class TestExecutor(TestExecutorImpl):
         # Generate the coverage data
         coverage_start_time = time.time()
 
-        coverage_data_filename = Path(context["output_dir"]) / "coverage.xml"
+        coverage_data_filename = output_dir / "coverage.xml"
+        coverage_resource_usages: List[Optional[CapturedProcess.ResourceUsage]] = []
+
+        if measure_subprocesses:
+            # The data files written by the test process and its children must be combined before
+            # the percentages are calculated.
+            result = CapturedProcess.Run("coverage combine{}".format(rcfile_arg))
+
+            test_output += "\n\n{}".format(result.output)
+            coverage_resource_usages.append(result.resource_usage)
+
+        if not measure_subprocesses or result.returncode == 0:
+            coverage_command_line = 'coverage xml{} -o "{}"'.format(rcfile_arg, coverage_data_filename)
 
-        coverage_command_line = 'coverage xml -o "{}"'.format(coverage_data_filename)
+            result = CapturedProcess.Run(coverage_command_line)
 
-        result = SubprocessEx.Run(coverage_command_line)
+            test_output += "\n\n{}".format(result.output)
+            coverage_resource_usages.append(result.resource_usage)
 
         coverage_execution_time = datetime.timedelta(seconds=time.time() - coverage_start_time)
 
+        coverage_resource_usage: Optional[CapturedProcess.ResourceUsage] = None
+
+        if coverage_resource_usages and all(coverage_resource_usages):
+            coverage_resource_usage = sum(coverage_resource_usages[1:], coverage_resource_usages[0])  # type: ignore
+
         if not coverage_data_filename.is_file() and result.returncode == 0:
             result.returncode = -1
 
-        test_output += "\n\n{}".format(result.output)
-
         if result.returncode != 0:
             coverage_result = CoverageResult(
                 result.returncode,
@@ -285,23 +472,555 @@ class TestExecutor(TestExecutorImpl):
 
             coverage_percentage = float(root.attrib["line-rate"])
 
+            short_desc = "Coverage: {}".format(coverage_percentage)
+
+            diff_ref = context.get(self.__class__.DIFF_REF_ATTRIBUTE_NAME, None)
+            if diff_ref:
+                try:
+                    diff_coverage_percentage, diff_coverage_percentages = _CalculateDiffCoverage(root, diff_ref)
+                except Exception as ex:  # pylint: disable=broad-except
+                    # The tests have already run, so report the problem (for example, an invalid ref or
+                    # a shallow clone) without losing their results.
+                    short_desc += " (Diff: error)"
+                    test_output += "\n\nDiff coverage (lines changed since '{}') could not be calculated:\n{}\n".format(
+                        diff_ref,
+                        textwrap.indent(str(ex).rstrip(), "    "),
+                    )
+
+                else:
+                    if diff_coverage_percentage is None:
+                        short_desc += " (Diff: no changed lines)"
+                    else:
+                        short_desc += " (Diff: {})".format(diff_coverage_percentage)
+
+                    # The coverage percentages are keyed by the files measured, so the diff coverage of
+                    # each file is reported separately.
+                    test_output += "\n\nDiff Coverage (lines changed since '{}'):\n{}".format(
+                        diff_ref,
+                        "".join(
+                            "    {}: {}\n".format(diff_filename, diff_percentage)
+                            for diff_filename, diff_percentage in sorted(diff_coverage_percentages.items())
+                        ) or "    No measured lines have changed.\n",
+                    )
+
+                    with (output_dir / self.__class__.DIFF_COVERAGE_FILENAME).open("w") as f:
+                        json.dump(
+                            {
+                                "ref": diff_ref,
+                                "percentage": diff_coverage_percentage,
+                                "percentages": diff_coverage_percentages,
+                            },
+                            f,
+                            indent=2,
+                        )
+
+            html_report = self.__class__.HtmlReport(
+                context.get(self.__class__.HTML_REPORT_ATTRIBUTE_NAME, None) or self.__class__.HtmlReport.Disabled,
+            )
+
+            if html_report != self.__class__.HtmlReport.Disabled:
+                # The coverage data will be overwritten by the next test, so preserve it for use
+                # when the report is generated.
+                shutil.copyfile(raw_coverage_data_filename, output_dir / _HTML_REPORT_DATA_FILENAME)
+
+                if html_report == self.__class__.HtmlReport.Background:
+                    _GenerateHtmlReportInBackground(output_dir)
+
+                    test_output += "\n\nThe HTML coverage report is being generated in '{}'.\n".format(
+                        output_dir / _HTML_REPORT_DIRNAME,
+                    )
+                elif html_report == self.__class__.HtmlReport.Lazy:
+                    test_output += "\n\nGenerate the HTML coverage report by running 'python \"{}\" GenerateHtml \"{}\"'.\n".format(
+                        Path(__file__).resolve(),
+                        output_dir,
+                    )
+                else:
+                    assert False, html_report  # pragma: no cover
+
             coverage_result = CoverageResult(
                 result.returncode,
                 coverage_execution_time,
-                "Coverage: {}".format(coverage_percentage),
+                short_desc,
                 coverage_data_filename,
                 coverage_percentage,
                 coverage_percentages or None,
             )
 
+        # Report the resources consumed by the processes
+        if test_timed_out:
+            test_result = min(test_result, -1)
+
+            execute_short_desc = "Test timed out after {} seconds".format(context[self.__class__.TIMEOUT_ATTRIBUTE_NAME])
+        elif test_canceled:
+            test_result = min(test_result, -1)
+
+            execute_short_desc = "Test canceled"
+        else:
+            execute_short_desc = "Test {}".format(
+                "failed" if test_result < 0 else "has warnings" if test_result > 0 else "passed",
+            )
+
+        if test_resource_usage is not None:
+            execute_short_desc += " ({})".format(test_resource_usage.ToShortString())
+
+            test_output += textwrap.dedent(
+                """\
+
+
+                Resource Usage:
+                    Test:     {}
+                    Coverage: {}
+                """,
+            ).format(
+                test_resource_usage.ToString(),
+                "N/A" if coverage_resource_usage is None else coverage_resource_usage.ToString(),
+            )
+
+            with (output_dir / self.__class__.RESOURCE_USAGE_FILENAME).open("w") as f:
+                json.dump(
+                    {
+                        "test": dataclasses.asdict(test_resource_usage),
+                        "coverage": None if coverage_resource_usage is None else dataclasses.asdict(coverage_resource_usage),
+                    },
+                    f,
+                    indent=2,
+                )
+
         return (
             ExecuteResult(
                 test_result,
                 test_execution_time,
-                "Test {}".format(
-                    "failed" if test_result < 0 else "has warnings" if test_result > 0 else "passed",
-                ),
+                execute_short_desc,
                 coverage_result,
             ),
             test_output,
         )
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+@app.command("GenerateHtml", no_args_is_help=True)
+def GenerateHtml(
+    output_dir: Path=typer.Argument(..., exists=True, file_okay=False, resolve_path=True, help="Tester output directory; reports are generated for all tests within this directory that preserved coverage data."),
+    force: bool=typer.Option(False, "--force", help="Generate reports even if they are up to date."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write additional debug information to the terminal."),
+) -> None:
+    """Generates HTML coverage reports for tests invoked with the 'lazy' HTML report option."""
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm:
+        data_filenames = sorted(output_dir.rglob(_HTML_REPORT_DATA_FILENAME))
+
+        if not data_filenames:
+            dm.WriteInfo("No coverage data was found in '{}'.\n".format(output_dir))
+            return
+
+        for data_filename in data_filenames:
+            report_dir = data_filename.parent / _HTML_REPORT_DIRNAME
+
+            with dm.Nested("Generating '{}'...".format(report_dir)) as this_dm:
+                index_filename = report_dir / "index.html"
+
+                if (
+                    not force
+                    and index_filename.is_file()
+                    and index_filename.stat().st_mtime >= data_filename.stat().st_mtime
+                ):
+                    this_dm.WriteInfo("The report is up to date.\n")
+                    continue
+
+                result = SubprocessEx.Run(_CreateHtmlReportCommandLine(data_filename.parent))
+
+                this_dm.result = result.returncode
+
+                if this_dm.result != 0:
+                    this_dm.WriteError(result.output)
+                else:
+                    this_dm.WriteVerbose(result.output)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_HTML_REPORT_DATA_FILENAME                  = "coverage.data"
+_HTML_REPORT_DIRNAME                        = "htmlcov"
+
+_hunk_regex                                 = re.compile(r"^@@ -\d+(?:,\d+)? \+(?P<start>\d+)(?:,(?P<count>\d+))? @@")
+
+# A character within a path quoted by git: an octal escape, another escape, or a literal character
+_git_path_char_regex                        = re.compile(r"\\(?:(?P<octal>[0-7]{3})|(?P<escape>.))|(?P<char>.)", re.DOTALL)
+
+
+# ----------------------------------------------------------------------
+class _IntervalIndex(object):
+    """Sorted, non-overlapping line ranges that support O(log n) membership queries."""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        intervals: List[Tuple[int, int]],   # Inclusive (start, end) line numbers
+    ):
+        starts: List[int] = []
+        ends: List[int] = []
+
+        for start, end in sorted(intervals):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+                continue
+
+            starts.append(start)
+            ends.append(end)
+
+        self._starts                        = starts
+        self._ends                          = ends
+
+    # ----------------------------------------------------------------------
+    def __contains__(
+        self,
+        line_number: int,
+    ) -> bool:
+        index = bisect.bisect_right(self._starts, line_number) - 1
+        return index >= 0 and line_number <= self._ends[index]
+
+
+# ----------------------------------------------------------------------
+def _GetOptionalInt(
+    context: Dict[str, Any],
+    attribute_name: str,
+    default_value: int,
+) -> int:
+    value = context.get(attribute_name, None)
+    return default_value if value is None else int(value)
+
+
+# ----------------------------------------------------------------------
+def _CreateSubprocessConfiguration(
+    output_dir: Path,
+    includes: List[str],
+    excludes: List[str],
+) -> Tuple[
+    Path,                                   # coverage configuration filename
+    Dict[str, str],                         # Environment for the test process
+]:
+    """Creates the configuration necessary to measure code coverage in child processes."""
+
+    coverage_dir = output_dir / "coverage_subprocesses"
+    coverage_dir.mkdir(parents=True, exist_ok=True)
+
+    # Remove data generated during previous invocations so that it isn't combined with the
+    # data generated during this invocation.
+    for child in coverage_dir.glob(".coverage*"):
+        child.unlink()
+
+    rcfile = coverage_dir / "coveragerc"
+
+    with rcfile.open("w") as f:
+        f.write(
+            textwrap.dedent(
+                """\
+                [run]
+                concurrency = multiprocessing
+                parallel = True
+                data_file = {data_file}
+                {include}
+                {omit}
+                """,
+            ).format(
+                data_file=(coverage_dir / ".coverage").as_posix(),
+                include="include =\n    {}".format("\n    ".join(includes)) if includes else "",
+                omit="omit =\n    {}".format("\n    ".join(excludes)) if excludes else "",
+            ),
+        )
+
+    # Processes that aren't started by 'coverage run' (for example, those launched via 'subprocess')
+    # begin measurement when this module is imported during interpreter startup.
+    site_dir = coverage_dir / "site"
+    site_dir.mkdir(exist_ok=True)
+
+    with (site_dir / "sitecustomize.py").open("w") as f:
+        f.write(
+            textwrap.dedent(
+                """\
+                import coverage
+
+                coverage.process_startup()
+                """,
+            ),
+        )
+
+    env = dict(os.environ)
+
+    env["COVERAGE_PROCESS_START"] = str(rcfile)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(site_dir), ] + ([env["PYTHONPATH"], ] if env.get("PYTHONPATH") else []),
+    )
+
+    return rcfile, env
+
+
+# ----------------------------------------------------------------------
+def _CalculateDiffCoverage(
+    root: ET.Element,
+    diff_ref: str,
+) -> Tuple[
+    Optional[float],                        # Diff coverage percentage (None if no measured lines have changed)
+    Dict[str, float],                       # Diff coverage percentage for each file with changed lines
+]:
+    """Calculates coverage for the measured lines that have changed since the provided git ref."""
+
+    sources = [Path(source.text) for source in root.findall("sources/source") if source.text]
+
+    # Get the measured lines for each file
+    measured_lines: Dict[Path, Tuple[str, Dict[int, bool]]] = {}
+
+    for class_ in root.findall("packages/package/classes/class"):
+        filename = class_.attrib["filename"]
+
+        fullpath = next(
+            (source / filename for source in sources if (source / filename).is_file()),
+            Path(filename),
+        ).resolve()
+
+        measured_lines[fullpath] = (
+            filename,
+            {
+                int(line.attrib["number"]): int(line.attrib["hits"]) != 0
+                for line in class_.findall("lines/line")
+            },
+        )
+
+    changed_lines = _GetChangedLines(diff_ref, list(measured_lines.keys()))
+
+    # Intersect the changed lines with the measured lines
+    diff_coverage_percentages: Dict[str, float] = {}
+
+    total_lines = 0
+    total_covered = 0
+
+    for fullpath, (filename, lines) in measured_lines.items():
+        index = changed_lines.get(fullpath, None)
+        if index is None:
+            continue
+
+        num_lines = 0
+        num_covered = 0
+
+        for line_number, is_covered in lines.items():
+            if line_number not in index:
+                continue
+
+            num_lines += 1
+
+            if is_covered:
+                num_covered += 1
+
+        if num_lines == 0:
+            continue
+
+        diff_coverage_percentages[filename] = num_covered / num_lines
+
+        total_lines += num_lines
+        total_covered += num_covered
+
+    return (
+        total_covered / total_lines if total_lines else None,
+        diff_coverage_percentages,
+    )
+
+
+# ----------------------------------------------------------------------
+def _GetChangedLines(
+    diff_ref: str,
+    filenames: List[Path],
+) -> Dict[Path, _IntervalIndex]:
+    """Returns the lines in the provided files that have changed since the git ref."""
+
+    # Group the files by repository, as the files may span multiple repositories
+    repo_roots: Dict[Path, Path] = {}
+    repo_filenames: Dict[Path, List[Path]] = {}
+
+    for filename in filenames:
+        repo_root = repo_roots.get(filename.parent, None)
+
+        if repo_root is None:
+            returncode, output = _RunGit(filename.parent, ["rev-parse", "--show-toplevel"])
+            if returncode != 0:
+                continue
+
+            repo_root = Path(output.strip()).resolve()
+            repo_roots[filename.parent] = repo_root
+
+        repo_filenames.setdefault(repo_root, []).append(filename)
+
+    results: Dict[Path, _IntervalIndex] = {}
+
+    for repo_root, these_filenames in repo_filenames.items():
+        # The prefixes are provided explicitly so that the output doesn't depend on the user's
+        # configuration ('diff.noprefix' and 'diff.mnemonicPrefix'), and paths are only quoted when
+        # they contain special characters.
+        returncode, output = _RunGit(
+            repo_root,
+            [
+                "-c", "core.quotepath=off",
+                "diff", "--unified=0", "--no-color", "--no-ext-diff", "--src-prefix=a/", "--dst-prefix=b/",
+                diff_ref,
+                "--",
+            ] + [str(filename) for filename in these_filenames],
+        )
+
+        if returncode != 0:
+            raise Exception("Changes since '{}' could not be calculated.\n\n{}".format(diff_ref, output))
+
+        for relative_filename, intervals in _ParseChangedLines(output).items():
+            results[(repo_root / relative_filename).resolve()] = _IntervalIndex(intervals)
+
+        # Files that aren't tracked by git don't appear in the diff; all of their lines have changed
+        returncode, output = _RunGit(
+            repo_root,
+            ["ls-files", "-z", "--others", "--exclude-standard", "--"] + [str(filename) for filename in these_filenames],
+        )
+
+        if returncode != 0:
+            raise Exception("Untracked files in '{}' could not be determined.\n\n{}".format(repo_root, output))
+
+        for untracked_filename in output.split("\0"):
+            if untracked_filename:
+                results[(repo_root / untracked_filename).resolve()] = _IntervalIndex([(1, sys.maxsize)])
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def _RunGit(
+    working_dir: Path,
+    args: List[str],
+) -> Tuple[int, str]:
+    """Runs git without a shell, as the paths may contain characters that a shell would interpret."""
+
+    result = subprocess.run(
+        ["git", "-C", str(working_dir)] + args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        check=False,
+    )
+
+    return result.returncode, result.stdout.decode("utf-8", errors="surrogateescape")
+
+
+# ----------------------------------------------------------------------
+def _ParseChangedLines(
+    diff_output: str,
+) -> Dict[str, List[Tuple[int, int]]]:
+    """Returns the added lines (as inclusive intervals) for each file in the output of 'git diff --unified=0 --dst-prefix=b/', keyed by the path relative to the repository."""
+
+    results: Dict[str, List[Tuple[int, int]]] = {}
+
+    intervals: Optional[List[Tuple[int, int]]] = None
+
+    for line in diff_output.splitlines():
+        if line.startswith("+++ "):
+            # Deleted files are '/dev/null'
+            filename = _UnquoteGitPath(line[len("+++ "):])
+
+            if filename.startswith("b/"):
+                intervals = results.setdefault(filename[len("b/"):], [])
+            else:
+                intervals = None
+
+            continue
+
+        if intervals is None:
+            continue
+
+        match = _hunk_regex.match(line)
+        if not match:
+            continue
+
+        count = int(match.group("count") or 1)
+        if count == 0:
+            # Lines were removed but not added
+            continue
+
+        start = int(match.group("start"))
+        intervals.append((start, start + count - 1))
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def _UnquoteGitPath(
+    value: str,
+) -> str:
+    """Returns a path written by git, which quotes paths that contain special characters (as C strings)."""
+
+    # git appends a tab to paths that contain spaces
+    value = value.rstrip("\t")
+
+    if not (len(value) >= 2 and value.startswith('"') and value.endswith('"')):
+        return value
+
+    escapes = {
+        "a": b"\a",
+        "b": b"\b",
+        "f": b"\f",
+        "n": b"\n",
+        "r": b"\r",
+        "t": b"\t",
+        "v": b"\v",
+        "\\": b"\\",
+        '"': b'"',
+    }
+
+    # Octal escapes are bytes of the UTF-8 encoded path
+    result = bytearray()
+
+    for match in _git_path_char_regex.finditer(value[1:-1]):
+        if match.group("octal"):
+            result.append(int(match.group("octal"), 8))
+        elif match.group("escape"):
+            result += escapes.get(match.group("escape"), match.group("escape").encode("utf-8"))
+        else:
+            result += match.group("char").encode("utf-8")
+
+    return result.decode("utf-8", errors="surrogateescape")
+
+
+# ----------------------------------------------------------------------
+def _CreateHtmlReportCommandLine(
+    output_dir: Path,
+) -> str:
+    # coverage.py only renders the files whose source or coverage data has changed since the report
+    # was last generated in this directory.
+    return 'coverage html "--data-file={}" -d "{}"'.format(
+        output_dir / _HTML_REPORT_DATA_FILENAME,
+        output_dir / _HTML_REPORT_DIRNAME,
+    )
+
+
+# ----------------------------------------------------------------------
+def _GenerateHtmlReportInBackground(
+    output_dir: Path,
+) -> None:
+    with (output_dir / "{}.log".format(_HTML_REPORT_DIRNAME)).open("w") as f:
+        # The process is not waited on; it continues to run after the test results are returned.
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            _CreateHtmlReportCommandLine(output_dir),
+            shell=True,
+            stdin=subprocess.DEVNULL,
+            stdout=f,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
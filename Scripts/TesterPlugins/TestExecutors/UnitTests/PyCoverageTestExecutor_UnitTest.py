@@ -0,0 +1,231 @@
+# ----------------------------------------------------------------------
+# |
+# |  PyCoverageTestExecutor_UnitTest.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:44:27
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for PyCoverageTestExecutor (diff coverage)"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+import pytest
+
+from Common_Foundation.ContextlibEx import ExitStack
+
+
+# ----------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent))
+with ExitStack(lambda: sys.path.pop(0)):
+    assert os.path.isdir(sys.path[0]), sys.path[0]
+
+    from PyCoverageTestExecutor import _CalculateDiffCoverage, _GetChangedLines, _IntervalIndex, _ParseChangedLines, _UnquoteGitPath
+
+
+# ----------------------------------------------------------------------
+def test_IntervalIndex():
+    index = _IntervalIndex([(10, 12), (1, 2), (3, 4), (20, 20)])
+
+    assert [line for line in range(0, 25) if line in index] == [1, 2, 3, 4, 10, 11, 12, 20]
+    assert 0 not in _IntervalIndex([])
+
+
+# ----------------------------------------------------------------------
+class TestUnquoteGitPath(object):
+    # ----------------------------------------------------------------------
+    def test_Unquoted(self):
+        assert _UnquoteGitPath("b/dir/file.py") == "b/dir/file.py"
+
+    # ----------------------------------------------------------------------
+    def test_Space(self):
+        # git appends a tab to paths that contain spaces
+        assert _UnquoteGitPath("b/with space.py\t") == "b/with space.py"
+
+    # ----------------------------------------------------------------------
+    def test_Escapes(self):
+        assert _UnquoteGitPath(r'"b/quo\"te\\tab\tx.py"') == 'b/quo"te\\tab\tx.py'
+
+    # ----------------------------------------------------------------------
+    def test_Octal(self):
+        assert _UnquoteGitPath(r'"b/\303\274n\303\257.py"') == "b/ünï.py"
+
+
+# ----------------------------------------------------------------------
+def test_ParseChangedLines():
+    diff_output = textwrap.dedent(
+        r"""        diff --git a/one.py b/one.py
+        index 1111111..2222222 100644
+        --- a/one.py
+        +++ b/one.py
+        @@ -2 +2 @@ def Func():
+        -    return 1
+        +    return 2
+        @@ -10,0 +11,3 @@ def Other():
+        +    a = 1
+        +    b = 2
+        +    c = 3
+        diff --git a/removed_lines.py b/removed_lines.py
+        index 1111111..2222222 100644
+        --- a/removed_lines.py
+        +++ b/removed_lines.py
+        @@ -5,2 +4,0 @@
+        -a
+        -b
+        diff --git a/deleted.py b/deleted.py
+        deleted file mode 100644
+        index 1111111..0000000
+        --- a/deleted.py
+        +++ /dev/null
+        @@ -1,2 +0,0 @@
+        -a
+        -b
+        diff --git "a/dir/quo\"te.py" "b/dir/quo\"te.py"
+        index 1111111..2222222 100644
+        --- "a/dir/quo\"te.py"
+        +++ "b/dir/quo\"te.py"
+        @@ -1 +1,2 @@
+        -a
+        +a
+        +b
+        """,
+    )
+
+    assert _ParseChangedLines(diff_output) == {
+        "one.py": [(2, 2), (11, 13)],
+        "removed_lines.py": [],
+        'dir/quo"te.py': [(1, 2)],
+    }
+
+
+# ----------------------------------------------------------------------
+class TestGetChangedLines(object):
+    # ----------------------------------------------------------------------
+    @pytest.fixture
+    def repo(self, tmp_path):
+        _Git(tmp_path, "init", "--quiet")
+        _Git(tmp_path, "config", "user.name", "Test")
+        _Git(tmp_path, "config", "user.email", "test@example.com")
+
+        # Configuration that changes the prefixes and quoting of the paths written by 'git diff'
+        _Git(tmp_path, "config", "diff.noprefix", "true")
+        _Git(tmp_path, "config", "diff.mnemonicPrefix", "true")
+        _Git(tmp_path, "config", "core.quotepath", "true")
+
+        for filename in self.__class__._FILENAMES:
+            (tmp_path / filename).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / filename).write_text("a\nb\nc\nd\n", encoding="utf-8")
+
+        _Git(tmp_path, "add", "--all")
+        _Git(tmp_path, "commit", "--quiet", "-m", "Initial")
+
+        for filename in self.__class__._FILENAMES:
+            (tmp_path / filename).write_text("a\nB\nc\nd\ne\n", encoding="utf-8")
+
+        (tmp_path / "untracked.py").write_text("a\nb\n", encoding="utf-8")
+
+        return tmp_path
+
+    # ----------------------------------------------------------------------
+    def test_Standard(self, repo):
+        filenames = [(repo / filename).resolve() for filename in self.__class__._FILENAMES]
+        untracked_filename = (repo / "untracked.py").resolve()
+
+        results = _GetChangedLines("HEAD", filenames + [untracked_filename])
+
+        assert set(results.keys()) == set(filenames + [untracked_filename])
+
+        for filename in filenames:
+            assert [line for line in range(1, 7) if line in results[filename]] == [2, 5], filename
+
+        assert 1 in results[untracked_filename]
+        assert 100000 in results[untracked_filename]
+
+    # ----------------------------------------------------------------------
+    def test_InvalidRef(self, repo):
+        with pytest.raises(Exception, match="Changes since 'does_not_exist' could not be calculated"):
+            _GetChangedLines("does_not_exist", [(repo / "plain.py").resolve()])
+
+    # ----------------------------------------------------------------------
+    _FILENAMES                              = [
+        "plain.py",
+        "with space.py",
+        "ünï.py",
+        "dir/sub.py",
+    ] + ([] if os.name == "nt" else ['quo"te.py'])
+
+
+# ----------------------------------------------------------------------
+def test_CalculateDiffCoverage(tmp_path):
+    _Git(tmp_path, "init", "--quiet")
+    _Git(tmp_path, "config", "user.name", "Test")
+    _Git(tmp_path, "config", "user.email", "test@example.com")
+
+    (tmp_path / "changed.py").write_text("a\nb\nc\nd\n", encoding="utf-8")
+    (tmp_path / "unchanged.py").write_text("a\nb\n", encoding="utf-8")
+
+    _Git(tmp_path, "add", "--all")
+    _Git(tmp_path, "commit", "--quiet", "-m", "Initial")
+
+    # Lines 2-4 have changed; line 4 isn't covered
+    (tmp_path / "changed.py").write_text("a\nB\nC\nD\n", encoding="utf-8")
+
+    root = ET.fromstring(
+        textwrap.dedent(
+            """\
+            <coverage line-rate="0.5">
+                <sources>
+                    <source>{}</source>
+                </sources>
+                <packages>
+                    <package>
+                        <classes>
+                            <class filename="changed.py" line-rate="0.75">
+                                <lines>
+                                    <line number="1" hits="0"/>
+                                    <line number="2" hits="1"/>
+                                    <line number="3" hits="1"/>
+                                    <line number="4" hits="0"/>
+                                </lines>
+                            </class>
+                            <class filename="unchanged.py" line-rate="0">
+                                <lines>
+                                    <line number="1" hits="0"/>
+                                    <line number="2" hits="0"/>
+                                </lines>
+                            </class>
+                        </classes>
+                    </package>
+                </packages>
+            </coverage>
+            """,
+        ).format(tmp_path),
+    )
+
+    percentage, percentages = _CalculateDiffCoverage(root, "HEAD")
+
+    assert percentage == pytest.approx(2 / 3)
+    assert percentages == {"changed.py": pytest.approx(2 / 3)}
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Git(
+    repo: Path,
+    *args: str,
+) -> None:
+    subprocess.run(["git", "-C", str(repo)] + list(args), check=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
@@ -16,13 +16,19 @@
 """Parses content produced by Python's pytest library."""
 
 import datetime
+import importlib.util
+import json
+import mmap
+import os
 import re
+import shutil
 import sys
 import time
 
 from pathlib import Path
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple, Union
 
+from Common_Foundation.ContextlibEx import ExitStack
 from Common_Foundation.Types import overridemethod
 
 from Common_FoundationEx.CompilerImpl.CompilerImpl import CompilerImpl
@@ -32,6 +38,16 @@ from Common_FoundationEx.TesterPlugins.TestParserImpl import BenchmarkStat, Subt
 from Common_FoundationEx import TyperEx
 
 
+# ----------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "Impl"))
+with ExitStack(lambda: sys.path.pop(0)):
+    assert os.path.isdir(sys.path[0])
+    import BenchmarkHistory  # pylint: disable=import-error
+    import CapturedProcess  # pylint: disable=import-error
+    import PytestForkServer  # pylint: disable=import-error
+    import PytestOutput  # pylint: disable=import-error
+
+
 # ----------------------------------------------------------------------
 class TestParser(TestParserImpl):
     # ----------------------------------------------------------------------
@@ -40,6 +56,44 @@ class TestParser(TestParserImpl):
     # |
     # ----------------------------------------------------------------------
     COMMAND_LINE_ARG_PREFIX                 = "pytest"
+    TEST_TIMEOUT_ATTRIBUTE_NAME             = "pytest_test_timeout"
+    WORKERS_ATTRIBUTE_NAME                  = "pytest_workers"
+    SHARDS_ATTRIBUTE_NAME                   = "pytest_shards"
+    FAIL_FAST_ATTRIBUTE_NAME                = "pytest_fail_fast"
+    LEAN_ATTRIBUTE_NAME                     = "pytest_lean"
+    PROFILE_ATTRIBUTE_NAME                  = "pytest_profile_slower_than"
+    BENCHMARK_HISTORY_ATTRIBUTE_NAME        = "pytest_benchmark_history"
+    BENCHMARK_THRESHOLD_ATTRIBUTE_NAME      = "pytest_benchmark_threshold"
+    BENCHMARK_FAIL_ATTRIBUTE_NAME           = "pytest_benchmark_regressions_fail"
+    BENCHMARK_STABLE_ATTRIBUTE_NAME         = "pytest_benchmark_stable"
+    FORK_SERVER_ATTRIBUTE_NAME              = "pytest_fork_server"
+    PRELOAD_ATTRIBUTE_NAME                  = "pytest_preload"
+
+    PLUGIN_NAME                             = "Common_PythonDevelopment.TesterPytestPlugin"
+
+    # Plugins loaded by the lean profile (when installed): (distribution package, plugin module)
+    LEAN_PLUGINS                            = [
+        ("pytest_asyncio", "pytest_asyncio.plugin"),
+        ("pytest_benchmark", "pytest_benchmark.plugin"),
+        ("pytest_cov", "pytest_cov.plugin"),
+        ("pyfakefs", "pyfakefs.pytest_plugin"),
+    ]
+
+    LEAN_XDIST_PLUGIN                       = ("xdist", "xdist.plugin")
+
+    # Result for a test (and the test file) that did not complete within the timeout
+    TIMEOUT_RESULT                          = -3
+
+    # Result for a test (and the test file) that was not run because pytest stopped early (for
+    # example, after the first failure when 'pytest_fail_fast' is set); a test that wasn't run can't
+    # have succeeded.
+    NOT_RUN_RESULT                          = -4
+
+    TIMEOUT_STACKS_FILENAME                 = "timeout_stacks.txt"
+    RESULTS_FILENAME                        = "pytest_results.jsonl"
+    BENCHMARKS_FILENAME                     = "benchmarks.json"
+    MEMORY_BENCHMARKS_FILENAME              = "memory_benchmarks.jsonl"
+    PROFILES_DIRNAME                        = "profiles"
 
     # ----------------------------------------------------------------------
     # |
@@ -59,6 +113,83 @@ class TestParser(TestParserImpl):
                     "help": "Options to pass to the command line when invoking typer",
                 },
             ),
+            self.__class__.TEST_TIMEOUT_ATTRIBUTE_NAME: (
+                float,
+                {
+                    "min": 0.0,
+                    "help": "Write the stacks of all threads and terminate pytest if a single test takes longer than this number of seconds.",
+                },
+            ),
+            self.__class__.WORKERS_ATTRIBUTE_NAME: (
+                int,
+                {
+                    "min": 0,
+                    "help": "Run the tests within a file in parallel using this number of pytest-xdist workers (limited to the number of CPUs); 0 to use pytest-xdist's 'auto' (one worker per CPU).",
+                },
+            ),
+            self.__class__.SHARDS_ATTRIBUTE_NAME: (
+                int,
+                {
+                    "min": 2,
+                    "help": "Split the tests within a file into this number of shards with balanced durations (based on previous runs) and run each shard in its own pytest-xdist worker; takes precedence over '{}'.".format(self.__class__.WORKERS_ATTRIBUTE_NAME),
+                },
+            ),
+            self.__class__.FAIL_FAST_ATTRIBUTE_NAME: (
+                bool,
+                {
+                    "help": "Run the tests that failed during the previous run first and stop after the first failure; the remaining tests are only run once the previously failing tests pass.",
+                },
+            ),
+            self.__class__.LEAN_ATTRIBUTE_NAME: (
+                bool,
+                {
+                    "help": "Don't load the pytest plugins registered by installed distributions; only pytest-asyncio, pytest-benchmark, pytest-cov, pyfakefs, and pytest-xdist (when needed) are loaded (requires pytest 8.4 or later).",
+                },
+            ),
+            self.__class__.PROFILE_ATTRIBUTE_NAME: (
+                float,
+                {
+                    "min": 0.0,
+                    "help": "Run tests that take longer than this number of seconds (and didn't fail) again while profiling them, and write the profile (.pstats) and collapsed stacks for flame graphs to the output directory.",
+                },
+            ),
+            self.__class__.BENCHMARK_HISTORY_ATTRIBUTE_NAME: (
+                Path,
+                {
+                    "help": "SQLite database used to store benchmark results and detect regressions.",
+                },
+            ),
+            self.__class__.BENCHMARK_THRESHOLD_ATTRIBUTE_NAME: (
+                float,
+                {
+                    "min": 0.0,
+                    "help": "Percentage that a benchmark's median must be slower than the baseline to be considered a regression (default: {}).".format(BenchmarkHistory.DEFAULT_THRESHOLD_PERCENTAGE),
+                },
+            ),
+            self.__class__.BENCHMARK_FAIL_ATTRIBUTE_NAME: (
+                bool,
+                {
+                    "help": "Fail the test when a benchmark regresses (rather than reporting a warning).",
+                },
+            ),
+            self.__class__.BENCHMARK_STABLE_ATTRIBUTE_NAME: (
+                bool,
+                {
+                    "help": "Reduce the variance of benchmarks by running them pinned to isolated CPUs, with GC disabled, and after warmup rounds; the noise level of each benchmark's rounds is used when detecting regressions. Tests are run in a single process (without pytest-xdist). Set PYTHONHASHSEED to a fixed value in the environment as well, as it can only be set when the interpreter starts.",
+                },
+            ),
+            self.__class__.FORK_SERVER_ATTRIBUTE_NAME: (
+                bool,
+                {
+                    "help": "Run pytest in a process forked from a server that has already imported pytest and its plugins; pytest is invoked normally when fork isn't available. Tests run with code coverage are always invoked normally.",
+                },
+            ),
+            self.__class__.PRELOAD_ATTRIBUTE_NAME: (
+                list[str],
+                {
+                    "help": "Modules that are expensive to import that are imported by the fork server before pytest is invoked (requires '{}').".format(self.__class__.FORK_SERVER_ATTRIBUTE_NAME),
+                },
+            ),
         }
 
     # ----------------------------------------------------------------------
@@ -106,12 +237,107 @@ class TestParser(TestParserImpl):
         # work with PyCoverageTestExecutor.
         command_line_prefix = 'pytest --verbose -vv --capture=no'
 
+        plugin_args: List[str] = []
+
+        # Results (including the duration of each test) are written to a file by the plugin so that
+        # they don't have to be scraped from the verbose output.
+        results_filename = self.__class__._GetResultsFilename(context)  # pylint: disable=protected-access
+        if results_filename is not None:
+            # Remove the results from a previous invocation so that they aren't mistaken for the
+            # results of this one.
+            results_filename.unlink(missing_ok=True)
+
+            plugin_args.append('"--tester-results={}"'.format(results_filename))
+
+        # pytest-benchmark's JSON output contains the complete statistics for each benchmark, which
+        # is preferable to scraping them from the table written to the output. It is only requested
+        # for files that use the 'benchmark' fixture (pytest-benchmark warns when there is nothing to
+        # save), and the plugin only requests it when pytest-benchmark is installed in the test
+        # environment.
+        benchmarks_filename = self.__class__._GetBenchmarksFilename(context)  # pylint: disable=protected-access
+        if benchmarks_filename is not None:
+            benchmarks_filename.unlink(missing_ok=True)
+
+            if self.__class__._UsesBenchmarkFixture(context[IndividualInputProcessorMixin.ATTRIBUTE_NAME]):  # pylint: disable=protected-access
+                plugin_args.append('"--tester-benchmarks={}"'.format(benchmarks_filename))
+            else:
+                benchmarks_filename = None
+
+        # Written by the plugin for each 'memory_benchmark' fixture
+        memory_benchmarks_filename = self.__class__._GetMemoryBenchmarksFilename(context)  # pylint: disable=protected-access
+        if memory_benchmarks_filename is not None:
+            memory_benchmarks_filename.unlink(missing_ok=True)
+
+            plugin_args.append('"--tester-memory-benchmarks={}"'.format(memory_benchmarks_filename))
+
+        # pytest-benchmark disables benchmarks when tests are distributed by pytest-xdist (and
+        # tests running concurrently would add noise), so stable benchmarks are run in a single
+        # process.
+        benchmark_stable = benchmarks_filename is not None and context.get(self.__class__.BENCHMARK_STABLE_ATTRIBUTE_NAME, False)
+        if benchmark_stable:
+            plugin_args.append("--tester-benchmark-stable")
+
+        profiles_dir = self.__class__._GetProfilesDir(context)  # pylint: disable=protected-access
+        if profiles_dir is not None:
+            shutil.rmtree(profiles_dir, ignore_errors=True)
+
+            plugin_args.append('"--tester-profile-slower-than={}"'.format(context[self.__class__.PROFILE_ATTRIBUTE_NAME]))
+            plugin_args.append('"--tester-profile-dir={}"'.format(profiles_dir))
+
+        test_timeout = context.get(self.__class__.TEST_TIMEOUT_ATTRIBUTE_NAME, None)
+        if test_timeout:
+            plugin_args.append('"--tester-test-timeout={}"'.format(test_timeout))
+
+        num_shards = None if benchmark_stable else context.get(self.__class__.SHARDS_ATTRIBUTE_NAME, None)
+        if num_shards:
+            # The plugin assigns the tests to pytest-xdist groups based on the durations that it
+            # recorded during previous runs.
+            plugin_args.append('"--tester-shards={}"'.format(num_shards))
+
+        if plugin_args:
+            command_line_prefix += " -p {} {}".format(self.__class__.PLUGIN_NAME, " ".join(plugin_args))
+
+        if context.get(self.__class__.FAIL_FAST_ATTRIBUTE_NAME, False):
+            # pytest's cacheprovider plugin records the tests that failed during the previous run
+            command_line_prefix += " --failed-first --maxfail=1"
+
+        num_workers = None if benchmark_stable else context.get(self.__class__.WORKERS_ATTRIBUTE_NAME, None)
+        uses_xdist = False
+
+        if num_shards:
+            command_line_prefix += " --numprocesses={} --dist=loadgroup".format(num_shards)
+            uses_xdist = True
+        elif num_workers is not None:
+            num_cpus = os.cpu_count() or 1
+
+            # Workers beyond the number of CPUs only add overhead
+            if num_workers != 1 and num_cpus > 1:
+                command_line_prefix += " --numprocesses={}".format(min(num_workers, num_cpus) if num_workers else "auto")
+                uses_xdist = True
+
+        if context.get(self.__class__.LEAN_ATTRIBUTE_NAME, False):
+            plugins = list(self.__class__.LEAN_PLUGINS)
+
+            if uses_xdist:
+                plugins.append(self.__class__.LEAN_XDIST_PLUGIN)
+
+            # The command line option (rather than PYTEST_DISABLE_PLUGIN_AUTOLOAD) only impacts this
+            # invocation; it isn't inherited by processes started by the tests, and pytest-xdist
+            # passes it to its workers.
+            command_line_prefix += " --disable-plugin-autoload{}".format(
+                "".join(
+                    " -p {}".format(plugin_module)
+                    for package_name, plugin_module in plugins
+                    if importlib.util.find_spec(package_name) is not None
+                ),
+            )
+
         if self.__class__.COMMAND_LINE_ARG_PREFIX in context:
             command_line_prefix += " {}".format(
                 " ".join('"{}"'.format(arg) for arg in context[self.__class__.COMMAND_LINE_ARG_PREFIX]),
             )
 
-        return '{} "{}"'.format(
+        command_line = '{} "{}"'.format(
             command_line_prefix,
             super(TestParser, self).CreateInvokeCommandLine(
                 compiler,
@@ -120,6 +346,14 @@ class TestParser(TestParserImpl):
             ),
         )
 
+        if context.get(self.__class__.FORK_SERVER_ATTRIBUTE_NAME, False):
+            command_line = PytestForkServer.CreateCommandLine(
+                command_line,
+                context.get(self.__class__.PRELOAD_ATTRIBUTE_NAME, None) or [],
+            )
+
+        return command_line
+
     # ----------------------------------------------------------------------
     @overridemethod
     def Parse(
@@ -127,7 +361,7 @@ class TestParser(TestParserImpl):
         compiler: CompilerImpl,             # pylint: disable=unused-argument
         compiler_context: Dict[str, Any],
         test_data: str,
-        on_progress_func: Callable[         # pylint: disable=unused-argument
+        on_progress_func: Callable[
             [
                 int,                        # Step (0-based)
                 str,                        # Status
@@ -139,39 +373,116 @@ class TestParser(TestParserImpl):
 
         filename = compiler_context[IndividualInputProcessorMixin.ATTRIBUTE_NAME]
 
+        # Output that was too large to retain in memory is parsed from a memory map of the file
+        # that contains the complete output.
+        content = CapturedProcess.LoadOutput(test_data)
+
         # Get the individual results
         individual_results: Dict[str, SubtestResult] = {}
+        verbose_results: List[str] = []
         num_failures = 0
+        num_not_run = 0
+
+        results_filename = self.__class__._GetResultsFilename(compiler_context)  # pylint: disable=protected-access
+
+        if results_filename is not None and results_filename.is_file():
+            with results_filename.open(encoding="utf-8") as f:
+                for line in f:
+                    data = json.loads(line)
+
+                    outcome = data["outcome"]
+
+                    if outcome == "passed":
+                        result = 0
+                    elif outcome in ["failed", "error"]:
+                        result = -1
+                        num_failures += 1
+                    elif outcome == "skipped":
+                        result = 1
+                    elif outcome == "not run":
+                        result = self.__class__.NOT_RUN_RESULT
+                        num_not_run += 1
+                    else:
+                        assert False, outcome  # pragma: no cover
+
+                    if outcome != "not run":
+                        verbose_results.append(outcome.upper())
+
+                    individual_results[data["nodeid"].partition("::")[2]] = SubtestResult(
+                        result,
+                        datetime.timedelta(seconds=data["duration"]),
+                    )
 
-        for match in self.__class__._parse_individual_regex.finditer(test_data):  # pylint: disable=protected-access
-            result = match.group("result")
-
-            if result == "PASSED":
-                result = 0
-            elif result in ["FAILED", "ERROR"]:
-                result = -1
-                num_failures += 1
-            else:
-                assert False, result  # pragma: no cover
-
-            individual_results[match.group("test")] = SubtestResult(result, datetime.timedelta())
+        else:
+            for test_name, result in PytestOutput.VerboseOutputParser.Parse(content):
+                verbose_results.append(result)
+
+                if result in ["PASSED", "XPASS"]:
+                    result = 0
+                elif result in ["FAILED", "ERROR"]:
+                    result = -1
+                    num_failures += 1
+                elif result in ["SKIPPED", "XFAIL"]:
+                    result = 1
+                else:
+                    assert False, result  # pragma: no cover
+
+                individual_results[test_name] = SubtestResult(result, datetime.timedelta())
+
+        # Executors that stream the output (PyCoverageTestExecutor) report progress as each test
+        # completes. Other executors (StandardTestExecutor) only provide the output once the process
+        # has exited, so progress can't be reported while the tests are running; the results are
+        # reported here instead.
+        progress_monitor = PytestOutput.ProgressMonitor(on_progress_func, len(individual_results))
+
+        for result in verbose_results:
+            if not progress_monitor.OnResult(result):
+                break
 
         benchmarks: List[BenchmarkStat] = []
+        benchmark_regressions: List[BenchmarkHistory.Regression] = []
+
+        benchmarks_filename = self.__class__._GetBenchmarksFilename(compiler_context)  # pylint: disable=protected-access
+
+        if benchmarks_filename is not None and benchmarks_filename.is_file():
+            with benchmarks_filename.open(encoding="utf-8") as f:
+                benchmarks_data = json.load(f)
+
+            benchmarks = self.__class__._LoadBenchmarks(benchmarks_data, filename, content)  # pylint: disable=protected-access
+
+            history_filename = compiler_context.get(self.__class__.BENCHMARK_HISTORY_ATTRIBUTE_NAME, None)
+            if history_filename and benchmarks:
+                benchmark_regressions = BenchmarkHistory.Update(
+                    Path(history_filename),
+                    filename,
+                    benchmarks[0].extractor,
+                    benchmarks_data["commit_info"].get("id", None),
+                    benchmarks_data["benchmarks"],
+                    compiler_context.get(self.__class__.BENCHMARK_THRESHOLD_ATTRIBUTE_NAME, None) or BenchmarkHistory.DEFAULT_THRESHOLD_PERCENTAGE,
+                    noise_percentages={
+                        benchmark["name"]: benchmark[_NOISE_PERCENTAGE_JSON_KEY]
+                        for benchmark in benchmarks_data["benchmarks"]
+                        if _NOISE_PERCENTAGE_JSON_KEY in benchmark
+                    },
+                )
+
+            match = None
+        else:
+            match = _GetRegex(self.__class__._parse_benchmark_content_regex, content).search(content)  # pylint: disable=protected-access
 
-        match = self.__class__._parse_benchmark_content_regex.search(test_data)  # pylint: disable=protected-access
         if match:
             # Get the pytest and benchmark versions
-            pytest_version = self.__class__._pytest_version_regex.search(test_data)  # pylint: disable=protected-access
+            pytest_version = _GetRegex(self.__class__._pytest_version_regex, content).search(content)  # pylint: disable=protected-access
             assert pytest_version
-            pytest_version = pytest_version.group("value")
+            pytest_version = _Decode(pytest_version.group("value"))
 
-            benchmark_version = self.__class__._benchmark_version_regex.search(test_data)  # pylint: disable=protected-access
+            benchmark_version = _GetRegex(self.__class__._benchmark_version_regex, content).search(content)  # pylint: disable=protected-access
             assert benchmark_version
-            benchmark_version = benchmark_version.group("value")
+            benchmark_version = _Decode(benchmark_version.group("value"))
 
             # Parse the match for individual benchmarks
-            units = match.group("units")
-            match = match.group("content")
+            units = _Decode(match.group("units"))
+            match = _Decode(match.group("content"))
 
             version_info = "{}.{}.{} / {} / {}".format(
                 sys.version_info.major,
@@ -203,16 +514,125 @@ class TestParser(TestParserImpl):
                     ),
                 )
 
-        if not individual_results:
+        # The values of memory benchmarks are numbers of bytes or blocks rather than units of time, so
+        # they aren't returned as BenchmarkStats. The plugin writes their statistics to the output,
+        # and they are tracked in the history (where the name of each one includes the metric
+        # measured, for example 'peak_bytes').
+        memory_benchmarks_filename = self.__class__._GetMemoryBenchmarksFilename(compiler_context)  # pylint: disable=protected-access
+        history_filename = compiler_context.get(self.__class__.BENCHMARK_HISTORY_ATTRIBUTE_NAME, None)
+
+        if history_filename and memory_benchmarks_filename is not None and memory_benchmarks_filename.is_file():
+            memory_benchmarks: List[Dict[str, Any]] = []
+
+            with memory_benchmarks_filename.open(encoding="utf-8") as f:
+                for line in f:
+                    data = json.loads(line)
+
+                    data["name"] = "{}::{}".format(data["name"], data["metric"])
+                    memory_benchmarks.append(data)
+
+            if memory_benchmarks:
+                benchmark_regressions += BenchmarkHistory.Update(
+                    Path(history_filename),
+                    filename,
+                    "{} / memory".format(memory_benchmarks[0]["python_version"]),
+                    None,
+                    memory_benchmarks,
+                    compiler_context.get(self.__class__.BENCHMARK_THRESHOLD_ATTRIBUTE_NAME, None) or BenchmarkHistory.DEFAULT_THRESHOLD_PERCENTAGE,
+                )
+
+        # Detect tests that were terminated due to a timeout: the plugin writes "Timeout (...)!" when
+        # a single test takes too long, and CapturedProcess writes a marker before it terminates a
+        # file that takes too long. faulthandler writes the stacks of all threads after either one.
+        timeout_match = _GetRegex(self.__class__._test_timeout_regex, content).search(content)  # pylint: disable=protected-access
+        if timeout_match is None:
+            timeout_match = _GetRegex(CapturedProcess.TIMEOUT_MARKER_REGEX, content).search(content)
+
+        # A timeout while a test that has already completed is run again to profile it (see
+        # 'pytest_profile_slower_than') isn't a timeout of the test or the file; it is reported as a
+        # warning, as the tests after it weren't run.
+        profiled_test: Optional[str] = None
+
+        if timeout_match:
+            profiled_test = self.__class__._GetProfiledTest(content, timeout_match.start())  # pylint: disable=protected-access
+
+        profile_timeout_match = None
+
+        if profiled_test is not None:
+            profile_timeout_match = timeout_match
+            timeout_match = None
+
+        # A fatal error that isn't preceded by a timeout is a crash
+        crash_match = None if timeout_match or profile_timeout_match else _GetRegex(self.__class__._fatal_error_regex, content).search(content)  # pylint: disable=protected-access
+
+        if timeout_match:
+            timed_out_test = self.__class__._GetRunningTest(content, timeout_match.start(), individual_results)  # pylint: disable=protected-access
+            if timed_out_test is not None:
+                individual_results[timed_out_test] = SubtestResult(self.__class__.TIMEOUT_RESULT, datetime.timedelta())
+
+            short_desc = "{} timed out".format("'{}'".format(timed_out_test) if timed_out_test else "Test")
+
+            stacks_filename = self.__class__._WriteTimeoutStacks(compiler_context, content, timeout_match.start())  # pylint: disable=protected-access
+            if stacks_filename is not None:
+                short_desc += " (stacks: {})".format(stacks_filename)
+
+            result = self.__class__.TIMEOUT_RESULT
+
+        elif crash_match:
+            crashed_test = self.__class__._GetRunningTest(content, crash_match.start(), individual_results)  # pylint: disable=protected-access
+            if crashed_test is not None:
+                individual_results[crashed_test] = SubtestResult(-1, datetime.timedelta())
+
+            result = -1
+            short_desc = "{} crashed ({})".format(
+                "'{}'".format(crashed_test) if crashed_test else "Test",
+                _Decode(crash_match.group("error")).strip(),
+            )
+
+        elif not individual_results:
             result = -2
             short_desc = "Invalid test output"
         elif num_failures != 0:
             result = -1
             short_desc = "{} failed".format(inflect.no("test", num_failures))
+        elif num_not_run != 0:
+            result = self.__class__.NOT_RUN_RESULT
+            short_desc = "{} passed".format(inflect.no("test", len(individual_results) - num_not_run))
         else:
             result = 0
             short_desc = "{} passed".format(inflect.no("test", len(individual_results)))
 
+        if num_not_run != 0:
+            short_desc += "; {} not run".format(inflect.no("test", num_not_run))
+
+        if profile_timeout_match:
+            if result == 0:
+                result = 1
+
+            short_desc += "; profiling '{}' timed out and ended the run".format(profiled_test)
+
+            stacks_filename = self.__class__._WriteTimeoutStacks(compiler_context, content, profile_timeout_match.start())  # pylint: disable=protected-access
+            if stacks_filename is not None:
+                short_desc += " (stacks: {})".format(stacks_filename)
+
+        if benchmark_regressions:
+            if compiler_context.get(self.__class__.BENCHMARK_FAIL_ATTRIBUTE_NAME, False):
+                result = min(result, -1)
+            elif result == 0:
+                result = 1
+
+            short_desc += "; {} regressed: {}".format(
+                inflect.no("benchmark", len(benchmark_regressions)),
+                ", ".join(regression.ToString() for regression in benchmark_regressions),
+            )
+
+        profiles_dir = self.__class__._GetProfilesDir(compiler_context)  # pylint: disable=protected-access
+        if profiles_dir is not None and profiles_dir.is_dir():
+            num_profiles = sum(1 for _ in profiles_dir.glob("*.pstats"))
+
+            if num_profiles:
+                short_desc += "; {} profiled: {}".format(inflect.no("slow test", num_profiles), profiles_dir)
+
         return TestResult(
             result,
             datetime.timedelta(seconds=time.time() - start_time),
@@ -224,21 +644,203 @@ class TestParser(TestParserImpl):
     # ----------------------------------------------------------------------
     # ----------------------------------------------------------------------
     # ----------------------------------------------------------------------
+    @classmethod
+    def _GetResultsFilename(
+        cls,
+        context: Dict[str, Any],
+    ) -> Optional[Path]:
+        output_dir = context.get("output_dir", None)
+        if output_dir is None:
+            return None
+
+        return Path(output_dir) / cls.RESULTS_FILENAME
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _GetBenchmarksFilename(
+        cls,
+        context: Dict[str, Any],
+    ) -> Optional[Path]:
+        output_dir = context.get("output_dir", None)
+        if output_dir is None:
+            return None
+
+        return Path(output_dir) / cls.BENCHMARKS_FILENAME
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _UsesBenchmarkFixture(
+        cls,
+        filename: Path,
+    ) -> bool:
+        with filename.open(encoding="utf-8") as f:
+            return cls._benchmark_fixture_regex.search(f.read()) is not None  # pylint: disable=protected-access
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _GetMemoryBenchmarksFilename(
+        cls,
+        context: Dict[str, Any],
+    ) -> Optional[Path]:
+        output_dir = context.get("output_dir", None)
+        if output_dir is None:
+            return None
+
+        return Path(output_dir) / cls.MEMORY_BENCHMARKS_FILENAME
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _GetProfilesDir(
+        cls,
+        context: Dict[str, Any],
+    ) -> Optional[Path]:
+        output_dir = context.get("output_dir", None)
+        if output_dir is None or context.get(cls.PROFILE_ATTRIBUTE_NAME, None) is None:
+            return None
+
+        return Path(output_dir) / cls.PROFILES_DIRNAME
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _LoadBenchmarks(
+        cls,
+        data: Dict[str, Any],
+        filename: Path,
+        content: Union[str, mmap.mmap],
+    ) -> List[BenchmarkStat]:
+        # The pytest version isn't included in the JSON content
+        pytest_version = _GetRegex(cls._pytest_version_regex, content).search(content)  # pylint: disable=protected-access
+
+        version_info = "{} / {} / benchmark-{}".format(
+            data["machine_info"]["python_version"],
+            _Decode(pytest_version.group("value")) if pytest_version else "pytest",
+            data["version"],
+        )
+
+        # Benchmarks run in stable mode aren't comparable to those that weren't
+        if data["machine_info"].get(_STABLE_JSON_KEY, False):
+            version_info += " / stable"
+
+        benchmarks: List[BenchmarkStat] = []
+
+        for benchmark in data["benchmarks"]:
+            stats = benchmark["stats"]
+
+            benchmarks.append(
+                BenchmarkStat(
+                    benchmark["name"],
+                    filename,
+                    # Written by the plugin; may not be available if the plugin wasn't loaded
+                    benchmark.get("source_line", 1),
+                    version_info,
+                    stats["min"] * _BENCHMARK_UNITS_PER_SECOND,
+                    stats["max"] * _BENCHMARK_UNITS_PER_SECOND,
+                    stats["mean"] * _BENCHMARK_UNITS_PER_SECOND,
+                    stats["stddev"] * _BENCHMARK_UNITS_PER_SECOND,
+                    stats["rounds"],
+                    Units(_BENCHMARK_UNITS),
+                    stats["iterations"],
+                ),
+            )
+
+        return benchmarks
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _GetRunningTest(
+        cls,
+        content: Union[str, mmap.mmap],
+        end: int,
+        individual_results: Dict[str, SubtestResult],
+    ) -> Optional[str]:
+        """Returns the name of the last test started before `end` if it didn't complete"""
+
+        test_name: Optional[str] = None
+
+        for match in _GetRegex(cls._test_start_regex, content).finditer(content, 0, end):  # pylint: disable=protected-access
+            test_name = _Decode(match.group("test"))
 
-    # "Clearing the cache" is suddenly appearing in the standard output of some tests in some
-    # scenarios but not in all. I'm adding the content to this regular expression, but this
-    # could end up being a brittle solution.
+        if test_name in individual_results:
+            return None
+
+        return test_name
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _GetProfiledTest(
+        cls,
+        content: Union[str, mmap.mmap],
+        end: int,
+    ) -> Optional[str]:
+        """Returns the name of the test that was being profiled at `end` (if any)"""
+
+        # Tests may be profiled concurrently by pytest-xdist workers
+        profiling: Dict[str, None] = {}
+
+        for match in _GetRegex(cls._profile_marker_regex, content).finditer(content, 0, end):  # pylint: disable=protected-access
+            nodeid = _Decode(match.group("nodeid"))
+
+            if _Decode(match.group("type")) == "Profiling":
+                profiling[nodeid] = None
+            else:
+                profiling.pop(nodeid, None)
 
-    _parse_individual_regex                 = re.compile(
+        if not profiling:
+            return None
+
+        return next(reversed(profiling)).partition("::")[2]
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _WriteTimeoutStacks(
+        cls,
+        context: Dict[str, Any],
+        content: Union[str, mmap.mmap],
+        start: int,
+    ) -> Optional[Path]:
+        """Writes the stacks written after a timeout to the output directory (if any); returns the filename"""
+
+        output_dir = context.get("output_dir", None)
+        if output_dir is None:
+            return None
+
+        stacks_filename = Path(output_dir) / cls.TIMEOUT_STACKS_FILENAME
+
+        with stacks_filename.open("w") as f:
+            f.write(_Decode(content[start:start + _MAX_TIMEOUT_STACKS_SIZE]))
+
+        return stacks_filename
+
+    # ----------------------------------------------------------------------
+    # A function (test or fixture) with a 'benchmark' parameter; 'memory_benchmark' doesn't match, as
+    # there isn't a word boundary between '_' and 'benchmark'.
+    _benchmark_fixture_regex                = re.compile(r"^\s*(?:async\s+)?def \w+\([^)]*\bbenchmark\b", re.MULTILINE)
+
+    # ----------------------------------------------------------------------
+    _test_start_regex                       = re.compile(
         r"""(?#
         Start of line                       )^(?#
         Filename                            )(?P<filename>.+\.py)(?#
         Sep                                 )::(?#
-        Test                                )(?P<test>\S+) +(?#
-        Potential multiline output          )(?:[^\n]*\n)*?(?#
-        Result                              )(?P<result>[A-Z]+)(?#
-        "Clearing the cache"                )(:?Clearing the cache)?(?#
-        End of line                         )$(?#
+        Test                                )(?P<test>\S+) (?#
+        )""",
+        re.MULTILINE,
+    )
+
+    # Note that the faulthandler output may begin on the same line as the name of the test that was
+    # running, as pytest writes the test name before the test is invoked.
+    _test_timeout_regex                     = re.compile(r"Timeout \([\d:\.]+\)!\r?$", re.MULTILINE)
+
+    _fatal_error_regex                      = re.compile(r"Fatal Python error: (?P<error>[^\r\n]+)\r?$", re.MULTILINE)
+
+    # Written by the plugin before and after a test is run again while it is profiled (see
+    # PROFILE_START_MARKER_TEMPLATE and PROFILE_END_MARKER_TEMPLATE in TesterPytestPlugin.py)
+    _profile_marker_regex                   = re.compile(
+        r"""(?#
+        Prefix                              )^<<<<<<<<<< (?#
+        Type                                )(?P<type>Profiling|Profiled) (?#
+        Node Id                             )'(?P<nodeid>[^\r\n]+)'(?#
+        Suffix                              ) >>>>>>>>>>\r?$(?#
         )""",
         re.MULTILINE,
     )
@@ -285,3 +887,49 @@ class TestParser(TestParserImpl):
             float_regex=r"[\d,]+\.\d+",
         ),
     )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_MAX_TIMEOUT_STACKS_SIZE                    = 1024 * 1024
+
+# pytest-benchmark's JSON content is in seconds; benchmarks loaded from it are always converted to
+# these units so that values can be compared across runs.
+_BENCHMARK_UNITS                            = "ns"
+_BENCHMARK_UNITS_PER_SECOND                 = 1000000000.0
+
+# Keys within each benchmark and within 'machine_info' that the plugin writes when running stable
+# benchmarks (see NOISE_PERCENTAGE_JSON_KEY and STABLE_JSON_KEY in TesterPytestPlugin)
+_NOISE_PERCENTAGE_JSON_KEY                  = "tester_noise_percentage"
+_STABLE_JSON_KEY                            = "tester_stable"
+
+_bytes_regexes: Dict[Pattern, Pattern]      = {}
+
+
+# ----------------------------------------------------------------------
+def _GetRegex(
+    regex: Pattern,
+    content: Union[str, mmap.mmap],
+) -> Pattern:
+    """Returns a version of the regex that can be applied to the content (which may be a memory map)."""
+
+    if isinstance(content, str):
+        return regex
+
+    bytes_regex = _bytes_regexes.get(regex, None)
+    if bytes_regex is None:
+        bytes_regex = re.compile(regex.pattern.encode("utf-8"), regex.flags & ~re.UNICODE)
+        _bytes_regexes[regex] = bytes_regex
+
+    return bytes_regex
+
+
+# ----------------------------------------------------------------------
+def _Decode(
+    value: Union[str, bytes],
+) -> str:
+    if isinstance(value, str):
+        return value
+
+    return value.decode("utf-8", errors="replace")
@@ -0,0 +1,375 @@
+# ----------------------------------------------------------------------
+# |
+# |  PytestTestParser_UnitTest.py
+# |
+# |  agent <agent@local>
+# |      2026-10-19 00:51:58
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for PytestTestParser"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from Common_Foundation.ContextlibEx import ExitStack
+
+from Common_FoundationEx.CompilerImpl.Mixins.InputProcessorMixins.IndividualInputProcessorMixin import IndividualInputProcessorMixin
+
+
+# ----------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent))
+with ExitStack(lambda: sys.path.pop(0)):
+    assert os.path.isdir(sys.path[0]), sys.path[0]
+
+    import PytestTestParser
+
+
+# ----------------------------------------------------------------------
+def test_Results(tmp_path):
+    result, progress = _Execute(
+        tmp_path,
+        """\
+        import time
+
+        import pytest
+
+        @pytest.fixture
+        def setup_error():
+            raise Exception("setup")
+
+        @pytest.fixture
+        def teardown_error():
+            yield
+            raise Exception("teardown")
+
+        def test_Passed():
+            pass
+
+        def test_Slow():
+            time.sleep(0.3)
+
+        def test_Failed():
+            assert False
+
+        def test_SetupError(setup_error):
+            pass
+
+        def test_TeardownError(teardown_error):
+            pass
+
+        @pytest.mark.skip(reason="a reason")
+        def test_Skipped():
+            pass
+
+        @pytest.mark.xfail(reason="a reason")
+        def test_Xfail():
+            assert False
+
+        @pytest.mark.xfail
+        def test_Xpass():
+            pass
+
+        @pytest.mark.parametrize("value", [1, 2])
+        def test_Parametrized(value):
+            pass
+
+        class TestClass(object):
+            def test_Method(self):
+                pass
+        """,
+    )
+
+    assert result.result == -1
+    assert result.short_desc == "3 tests failed"
+
+    assert {name: subtest_result.result for name, subtest_result in result.subtest_results.items()} == {
+        "test_Passed": 0,
+        "test_Slow": 0,
+        "test_Failed": -1,
+        "test_SetupError": -1,
+        "test_TeardownError": -1,
+        "test_Skipped": 1,
+        "test_Xfail": 1,
+        "test_Xpass": 0,
+        "test_Parametrized[1]": 0,
+        "test_Parametrized[2]": 0,
+        "TestClass::test_Method": 0,
+    }
+
+    # The duration of each test (including its setup and teardown) is provided by the plugin
+    assert result.subtest_results["test_Slow"].execution_time.total_seconds() >= 0.3
+    assert result.subtest_results["test_Passed"].execution_time.total_seconds() < 0.3
+
+    assert len(progress) == len(result.subtest_results)
+    assert progress[-1] == (len(result.subtest_results) - 1, "6/11 passed, 3 failed")
+
+    # The results are read from the results file rather than the output
+    context = _CreateContext(tmp_path)
+
+    assert PytestTestParser.TestParser().Parse(None, context, "", lambda step, status: True).subtest_results == result.subtest_results
+
+
+# ----------------------------------------------------------------------
+def test_VerboseOutput(tmp_path):
+    # The results are parsed from the verbose output when the plugin didn't write a results file
+    context = _CreateContext(tmp_path)
+
+    test_filename = context[IndividualInputProcessorMixin.ATTRIBUTE_NAME]
+    test_filename.write_text(
+        textwrap.dedent(
+            """\
+            import pytest
+
+            def test_Passed():
+                print("Output written by the test")
+
+            def test_Failed():
+                assert False
+
+            @pytest.mark.skip(reason="a reason")
+            def test_Skipped():
+                pass
+            """,
+        ),
+        encoding="utf-8",
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-m", "pytest", "--verbose", "-vv", "--capture=no", "-p", "no:cacheprovider", test_filename.name],
+        cwd=tmp_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        check=False,
+    ).stdout.decode("utf-8")
+
+    expected_results = {"test_Passed": 0, "test_Failed": -1, "test_Skipped": 1}
+
+    result = PytestTestParser.TestParser().Parse(None, context, output, lambda step, status: True)
+
+    assert result.short_desc == "1 test failed"
+    assert {name: subtest_result.result for name, subtest_result in result.subtest_results.items()} == expected_results
+
+    # Output that was truncated when it was captured is parsed from the file that contains the complete output
+    output_filename = tmp_path / "output.txt"
+    output_filename.write_text(output, encoding="utf-8")
+
+    truncated_output = output[:100] + PytestTestParser.CapturedProcess._OMITTED_TEMPLATE.format(  # pylint: disable=protected-access
+        num_bytes=len(output) - 100,
+        filename=output_filename,
+    )
+
+    result = PytestTestParser.TestParser().Parse(None, context, truncated_output, lambda step, status: True)
+
+    assert {name: subtest_result.result for name, subtest_result in result.subtest_results.items()} == expected_results
+
+
+# ----------------------------------------------------------------------
+def test_NotRun(tmp_path):
+    # The session stops after the first failure, so the second test isn't run
+    result, _ = _Execute(
+        tmp_path,
+        """\
+        def test_Failed():
+            assert False
+
+        def test_Passed():
+            pass
+        """,
+        "--maxfail=1",
+    )
+
+    assert result.result < 0
+    assert result.short_desc == "1 test failed; 1 test not run"
+
+    assert result.subtest_results["test_Failed"].result == -1
+    assert result.subtest_results["test_Passed"].result == PytestTestParser.TestParser.NOT_RUN_RESULT
+
+
+# ----------------------------------------------------------------------
+def test_NotRunWithoutFailures(tmp_path):
+    # The session was interrupted before all of the tests were run
+    context = _CreateContext(tmp_path)
+
+    _WriteResults(
+        context,
+        [
+            ("test_Generated.py::test_One", "passed"),
+            ("test_Generated.py::test_Two", "not run"),
+        ],
+    )
+
+    result = PytestTestParser.TestParser().Parse(None, context, "", lambda step, status: True)
+
+    assert PytestTestParser.TestParser.NOT_RUN_RESULT < 0
+    assert result.result == PytestTestParser.TestParser.NOT_RUN_RESULT
+    assert result.short_desc == "1 test passed; 1 test not run"
+
+    assert result.subtest_results["test_One"].result == 0
+    assert result.subtest_results["test_Two"].result == PytestTestParser.TestParser.NOT_RUN_RESULT
+
+
+# ----------------------------------------------------------------------
+def test_MemoryBenchmarks(tmp_path):
+    test_content = textwrap.dedent(
+        """\
+        def test_Memory(memory_benchmark):
+            memory_benchmark(lambda: bytearray({}))
+        """,
+    )
+
+    history_filename = tmp_path / "history.db"
+
+    for _ in range(3):
+        result, _ = _Execute(tmp_path, test_content.format(1024 * 1024), context_values={PytestTestParser.TestParser.BENCHMARK_HISTORY_ATTRIBUTE_NAME: history_filename})
+
+        # Numbers of bytes and blocks aren't units of time, so they aren't returned as benchmarks
+        assert result.result == 0, result.short_desc
+        assert result.short_desc == "1 test passed"
+        assert result.benchmarks is None
+
+    # The statistics written by the plugin are tracked in the history
+    with closing(sqlite3.connect(history_filename)) as connection:
+        assert sorted(row[0] for row in connection.execute("SELECT DISTINCT name FROM benchmarks")) == [
+            "test_Memory::allocated_blocks",
+            "test_Memory::peak_bytes",
+            "test_Memory::retained_bytes",
+        ]
+
+        peak_bytes = [row[0] for row in connection.execute("SELECT median FROM benchmarks WHERE name = 'test_Memory::peak_bytes'")]
+
+    assert len(peak_bytes) == 3
+    assert all(value >= 1024 * 1024 for value in peak_bytes), peak_bytes
+
+    # Memory regressions are detected
+    result, _ = _Execute(tmp_path, test_content.format(4 * 1024 * 1024), context_values={PytestTestParser.TestParser.BENCHMARK_HISTORY_ATTRIBUTE_NAME: history_filename})
+
+    assert result.result == 1
+    assert result.short_desc.startswith("1 test passed; 1 benchmark regressed: test_Memory::peak_bytes (+"), result.short_desc
+
+
+# ----------------------------------------------------------------------
+def test_Profile(tmp_path):
+    profiles_dir = tmp_path / "output" / PytestTestParser.TestParser.PROFILES_DIRNAME
+
+    result, _ = _Execute(
+        tmp_path,
+        """\
+        import time
+
+        def test_Slow():
+            time.sleep(0.5)
+
+        def test_SlowFailed():
+            time.sleep(0.5)
+            assert False
+
+        def test_Fast():
+            pass
+        """,
+        "--tester-profile-slower-than=0.2",
+        "--tester-profile-dir={}".format(profiles_dir),
+        context_values={PytestTestParser.TestParser.PROFILE_ATTRIBUTE_NAME: 0.2},
+    )
+
+    # Only the slow test that passed is profiled
+    assert result.short_desc == "1 test failed; 1 slow test profiled: {}".format(profiles_dir)
+    assert sorted(path.name for path in profiles_dir.iterdir()) == ["test_Slow.collapsed.txt", "test_Slow.pstats"]
+
+    # The results of the test are those of its original run, which doesn't include the time spent profiling it
+    assert result.subtest_results["test_Slow"].result == 0
+    assert result.subtest_results["test_Slow"].execution_time.total_seconds() < 0.9
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateContext(
+    tmp_path: Path,
+) -> Dict[str, Any]:
+    return {
+        IndividualInputProcessorMixin.ATTRIBUTE_NAME: tmp_path / "test_Generated.py",
+        "output_dir": tmp_path / "output",
+    }
+
+
+# ----------------------------------------------------------------------
+def _WriteResults(
+    context: Dict[str, Any],
+    results: List[Tuple[str, str]],
+) -> None:
+    results_filename = Path(context["output_dir"]) / PytestTestParser.TestParser.RESULTS_FILENAME
+
+    results_filename.parent.mkdir(parents=True, exist_ok=True)
+
+    with results_filename.open("w", encoding="utf-8") as f:
+        for nodeid, outcome in results:
+            f.write("{}\n".format(json.dumps({"nodeid": nodeid, "outcome": outcome, "duration": 0.0, "worker": None})))
+
+
+# ----------------------------------------------------------------------
+def _Execute(
+    tmp_path: Path,
+    test_content: str,
+    *args: str,
+    context_values: Optional[Dict[str, Any]]=None,
+):
+    """Runs pytest with the plugin on the test content and parses the results; returns the test result and the progress reported."""
+
+    context = _CreateContext(tmp_path)
+
+    context.update(context_values or {})
+
+    test_filename = context[IndividualInputProcessorMixin.ATTRIBUTE_NAME]
+    test_filename.write_text(textwrap.dedent(test_content), encoding="utf-8")
+
+    output_dir = Path(context["output_dir"])
+
+    # The plugin appends to the memory benchmarks file (CreateInvokeCommandLine removes it as well)
+    (output_dir / PytestTestParser.TestParser.MEMORY_BENCHMARKS_FILENAME).unlink(missing_ok=True)
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pytest",
+            "--verbose",
+            "-vv",
+            "--capture=no",
+            "-p",
+            "no:cacheprovider",
+            "-p",
+            PytestTestParser.TestParser.PLUGIN_NAME,
+            "--tester-results={}".format(output_dir / PytestTestParser.TestParser.RESULTS_FILENAME),
+            "--tester-memory-benchmarks={}".format(output_dir / PytestTestParser.TestParser.MEMORY_BENCHMARKS_FILENAME),
+        ] + list(args) + [test_filename.name],
+        cwd=tmp_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        check=False,
+    )
+
+    progress: List[Tuple[int, str]] = []
+
+    test_result = PytestTestParser.TestParser().Parse(
+        None,
+        context,
+        result.stdout.decode("utf-8"),
+        lambda step, status: progress.append((step, status)) or True,
+    )
+
+    return test_result, progress
@@ -61,6 +61,7 @@ def GetConfigurations() -> Union[
                         Configuration.VersionInfo("pytest", SemVer("7.1.2")),
                         Configuration.VersionInfo("pytest_asyncio", SemVer("0.19.0")),
                         Configuration.VersionInfo("pytest_benchmark", SemVer("3.4.1")),
+                        Configuration.VersionInfo("pytest_xdist", SemVer("2.5.0")),
                         Configuration.VersionInfo("twine", SemVer("4.0.1")),
                     ],
                 },